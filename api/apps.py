@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        from . import signals  # noqa: F401 — connects the cache invalidation receivers
+        from . import changelog  # noqa: F401 — connects the employee changelog receivers
+        from . import counters  # noqa: F401 — connects the blog comment counter receivers
+        from . import metrics  # noqa: F401 — instruments every new DB connection
@@ -0,0 +1,233 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from blogs.models import Blog, Comment
+from blogs.serializers import BlogSerializer, CommentSerializer
+from employees.models import Employee
+from .deletion import delete_blog
+from .mixins import plan_annotations, plan_columns, plan_queryset
+from .paginations import KeysetPagination
+from .renderers import dumps
+from .serializers import EmployeeSerializer, compile_serializer
+
+# ------------------------------------------------------------------------------
+# api/async_views.py — native async endpoints for ASGI servers (uvicorn, daphne)
+# ------------------------------------------------------------------------------
+# DRF views are synchronous. Under ASGI, Django runs each one in a worker
+# thread (sync_to_async) and that thread is held while it waits on the DB.
+#
+# These are plain Django `async def` views using the async ORM
+# (aget / acreate / asave / adelete / `async for`), mounted side by side with
+# the DRF views under /api/v1/async/...:
+#
+#   /async/blogs/           /async/blogs/<pk>/
+#   /async/comments/        /async/comments/<pk>/
+#   /async/employees/       /async/employees/<pk>/
+#
+# They reuse the DRF serializers: validation for writes (run in a thread,
+# because validators such as UniqueValidator query the database) and
+# compile_serializer() for output. Same JSON (including ?fields= / ?omit= /
+# ?expand=), but without the browsable API, response cache or ETags of the
+# DRF views.
+#
+# Real-life analogy:
+# - A sync view is a waiter who stands at the kitchen door until the dish is
+#   ready. An async view takes the next table's order while the kitchen cooks.
+# ------------------------------------------------------------------------------
+
+
+def json_response(data, status=200):
+    return HttpResponse(dumps(data), status=status, content_type='application/json')
+
+
+class AsyncAPIView(View):
+    model = None
+    serializer_class = None
+    filterset_fields = ()
+    expandable_fields = ()
+    sparse_load_fields = ()
+    pagination_class = api_settings.DEFAULT_PAGINATION_CLASS
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # API clients don't send CSRF tokens (DRF's APIView is exempt too)
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            return await super().dispatch(request, *args, **kwargs)
+        except APIException as exc:  # e.g. ?fields=unknown, ?offset= past the cap
+            detail = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+            return json_response(detail, status=exc.status_code)
+
+    def get_serializer(self):
+        # the request in the context applies ?fields= / ?omit= / ?expand= on GET
+        return self.serializer_class(context={'request': self.request, 'view': self})
+
+    def get_queryset(self):
+        queryset = self.model._default_manager.order_by('pk')
+        serializer = self.get_serializer()
+        select, prefetch = plan_queryset(serializer)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        annotations = plan_annotations(serializer)
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        params = self.request.GET
+        if self.request.method == 'GET' and ('fields' in params or 'omit' in params):
+            columns = plan_columns(serializer)
+            if columns is not None:
+                queryset = queryset.only(*columns, *self.sparse_load_fields)
+        return queryset
+
+    def to_representation(self):
+        return compile_serializer(self.get_serializer())
+
+    def parse_body(self, request):
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError as exc:
+            return None, json_response({'detail': f'JSON parse error - {exc}'}, status=400)
+        if not isinstance(data, dict):
+            return None, json_response({'detail': 'Expected a JSON object.'}, status=400)
+        return data, None
+
+    async def validate(self, instance=None, data=None, partial=False):
+        serializer = self.serializer_class(instance, data=data, partial=partial)
+        valid = await sync_to_async(serializer.is_valid)()
+        return serializer, valid
+
+
+
+class AsyncListCreateView(AsyncAPIView):
+    """
+    GET: one page from the same paginator class as the matching DRF view (so the
+    same shape, links that keep every query param, and 404 past the offset cap).
+    POST: create.
+    """
+
+    async def get(self, request):
+        queryset = self.get_queryset().filter(
+            **{field: request.GET[field] for field in self.filterset_fields if field in request.GET}
+        )
+        paginator = self.pagination_class()
+        page, links = await sync_to_async(self.paginate)(paginator, queryset, Request(request))
+        to_representation = self.to_representation()
+        return json_response({**links, 'results': [to_representation(obj) for obj in page]})
+
+    def paginate(self, paginator, queryset, request):
+        """Run in a thread: the page query, COUNT and cursor links all touch the database."""
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        links = paginator.get_paginated_response([]).data
+        del links['results']
+        return page, links
+
+    async def post(self, request):
+        data, error = self.parse_body(request)
+        if error:
+            return error
+        serializer, valid = await self.validate(data=data)
+        if not valid:
+            return json_response(serializer.errors, status=400)
+        obj = await self.model._default_manager.acreate(**serializer.validated_data)
+        obj = await self.get_queryset().aget(pk=obj.pk)  # reload with its relations
+        return json_response(self.to_representation()(obj), status=201)
+
+
+class AsyncDetailView(AsyncAPIView):
+    """GET / PUT / PATCH / DELETE one object by primary key."""
+
+    def not_found(self):
+        return json_response(
+            {'detail': f'No {self.model.__name__} matches the given query.'}, status=404
+        )
+
+    async def get_object(self, pk):
+        try:
+            return await self.get_queryset().aget(pk=pk)
+        except self.model.DoesNotExist:
+            return None
+
+    async def get(self, request, pk):
+        obj = await self.get_object(pk)
+        if obj is None:
+            return self.not_found()
+        return json_response(self.to_representation()(obj))
+
+    async def put(self, request, pk, partial=False):
+        obj = await self.get_object(pk)
+        if obj is None:
+            return self.not_found()
+        data, error = self.parse_body(request)
+        if error:
+            return error
+        serializer, valid = await self.validate(obj, data, partial)
+        if not valid:
+            return json_response(serializer.errors, status=400)
+        for attr, value in serializer.validated_data.items():
+            setattr(obj, attr, value)
+        await obj.asave()
+        obj = await self.get_queryset().aget(pk=obj.pk)
+        return json_response(self.to_representation()(obj))
+
+    async def patch(self, request, pk):
+        return await self.put(request, pk, partial=True)
+
+    async def delete(self, request, pk):
+        obj = await self.get_object(pk)
+        if obj is None:
+            return self.not_found()
+        await self.perform_destroy(obj)
+        return HttpResponse(status=204)
+
+    async def perform_destroy(self, obj):
+        await obj.adelete()
+
+
+# -----------------------------
+# Concrete async endpoints
+# -----------------------------
+class AsyncBlogsView(AsyncListCreateView):
+    model = Blog
+    serializer_class = BlogSerializer
+    expandable_fields = ('comments',)  # like BlogsView: ?expand=comments
+
+
+class AsyncBlogDetailView(AsyncDetailView):
+    model = Blog
+    serializer_class = BlogSerializer
+
+    async def perform_destroy(self, obj):
+        await sync_to_async(delete_blog)(obj)
+
+
+class AsyncCommentsView(AsyncListCreateView):
+    model = Comment
+    serializer_class = CommentSerializer
+
+
+class AsyncCommentDetailView(AsyncDetailView):
+    model = Comment
+    serializer_class = CommentSerializer
+
+
+class AsyncEmployeesView(AsyncListCreateView):
+    model = Employee
+    serializer_class = EmployeeSerializer
+    filterset_fields = ('designation',)
+    pagination_class = KeysetPagination        # like EmployeeViewset: cursors, no COUNT(*)
+    sparse_load_fields = ('designation',)      # keyset cursors read it even if it's trimmed
+
+
+class AsyncEmployeeDetailView(AsyncDetailView):
+    model = Employee
+    serializer_class = EmployeeSerializer
@@ -0,0 +1,233 @@
+import contextvars
+import io
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connection
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .middleware import IDEMPOTENCY_HEADER, IdempotencyMiddleware
+from .renderers import dumps
+
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------------------
+# api/batch.py — many API calls in one HTTP round trip
+# ------------------------------------------------------------------------------
+# A dashboard screen loads an employee page, a blog list and a few blog
+# details: several requests, each paying the network round trip plus the
+# whole middleware stack (session, auth, CSRF...).
+#
+#   POST /api/v1/batch/
+#   [{"method": "GET",  "path": "/api/v1/employees/?page_size=10"},
+#    {"method": "GET",  "path": "/api/v1/blogs/5/"},
+#    {"method": "POST", "path": "/api/v1/comments/", "body": {"blog": 5, "comment": "hi"}}]
+#
+#   -> [{"status": 200, "headers": {...}, "body": {...}}, ...]   (same order)
+#
+# Every sub-request is resolved against the URLconf and handed straight to
+# its view, in-process: no extra HTTP, and the session and user are looked up
+# once (on the batch request) and shared. Only paths under the batch's own
+# prefix (/api/v1/) are allowed.
+#
+# Order matters for writes, so items run in order — except that a run of
+# consecutive GET/HEAD items is fanned out over a bounded thread pool
+# (BATCH['MAX_WORKERS']). Writes run on the batch request's own thread and
+# DB connection; inside an open transaction (e.g. in tests) everything runs
+# there too, because worker connections could not see its uncommitted rows.
+# Django connections can't be shared between threads, so each pool thread
+# keeps ONE connection of its own across batches (at most MAX_WORKERS extra).
+#
+# Middleware: the batch request goes through the normal stack ONCE, and its
+# sub-requests are covered by it — read-your-writes stickiness, and the
+# request metrics + QUERY_BUDGETS, which also count the pool threads' queries
+# (they run in a copy of the batch's context, see api/metrics.py).
+# Sub-requests are not sent through the stack again, except that write items
+# go through IdempotencyMiddleware: give an item its own key with
+#   {"method": "POST", "path": ..., "body": ..., "headers": {"Idempotency-Key": "..."}}
+# (a key on the batch request itself covers the batch as a whole, and is not
+# passed down to its items).
+#
+# Real-life analogy:
+# - Handing the waiter the whole table's order at once instead of calling
+#   them back for every dish.
+# ------------------------------------------------------------------------------
+
+CONCURRENT_METHODS = ('GET', 'HEAD')
+IDEMPOTENCY_META = 'HTTP_' + IDEMPOTENCY_HEADER.upper().replace('-', '_')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(workers):
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api-batch')
+    return _pool
+
+
+class SubRequestError:
+    """A batch item that can't be dispatched; answered without calling a view."""
+
+    def __init__(self, status_code, detail):
+        self.status_code = status_code
+        self.detail = detail
+
+
+class BatchView(APIView):
+    """POST a JSON list of {method, path, body?}; get a list of {status, headers, body}."""
+
+    def post(self, request):
+        options = getattr(settings, 'BATCH', {})
+        items = request.data
+        if not isinstance(items, list):
+            return Response({'detail': 'Expected a list of requests.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = options.get('MAX_REQUESTS', 25)
+        if len(items) > limit:
+            return Response(
+                {'detail': f'At most {limit} requests per batch.'}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        prepared = [self.prepare(request, item) for item in items]
+        results = [None] * len(items)
+        workers = options.get('MAX_WORKERS', 4)
+        concurrent = workers > 1 and not connection.in_atomic_block
+        index = 0
+        while index < len(prepared):
+            end = index + 1
+            if concurrent and self.method(prepared[index]) in CONCURRENT_METHODS:
+                while end < len(prepared) and self.method(prepared[end]) in CONCURRENT_METHODS:
+                    end += 1
+            if end - index == 1:
+                results[index] = self.run(prepared[index])
+            else:
+                pool = get_pool(workers)
+                futures = [
+                    # each task gets its own copy of the request's context vars
+                    (i, pool.submit(contextvars.copy_context().run, self.run_in_worker, prepared[i]))
+                    for i in range(index, end)
+                ]
+                for i, future in futures:
+                    results[i] = future.result()
+            index = end
+        return Response(results)
+
+    def method(self, prepared):
+        return prepared.method if isinstance(prepared, WSGIRequest) else None
+
+    # ------------------------------------------------------------
+    # Building sub-requests
+    # ------------------------------------------------------------
+    def prepare(self, request, item):
+        """A ready-to-dispatch WSGIRequest, or a SubRequestError for a bad item."""
+        if not isinstance(item, dict) or not isinstance(item.get('path'), str):
+            return SubRequestError(400, 'Each request needs a "path".')
+        method = str(item.get('method', 'GET')).upper()
+        url = urlsplit(item['path'])
+        prefix = request.path[:request.path.rindex('batch/')]
+        if url.scheme or url.netloc or not url.path.startswith(prefix):
+            return SubRequestError(400, f'Only paths under {prefix} can be batched.')
+        try:
+            match = resolve(url.path)
+        except Resolver404:
+            return SubRequestError(404, 'Not found.')
+        if getattr(match.func, 'view_class', None) is type(self):
+            return SubRequestError(400, 'Batches cannot be nested.')
+
+        headers = item.get('headers', {})
+        if not isinstance(headers, dict) or not all(
+            isinstance(name, str) and isinstance(value, str) for name, value in headers.items()
+        ):
+            return SubRequestError(400, '"headers" must map header names to strings.')
+
+        parent = request._request
+        body = b'' if item.get('body') is None else dumps(item['body'])
+        environ = {
+            **{
+                key: value for key, value in parent.META.items()
+                if key.isupper() and key != IDEMPOTENCY_META
+            },
+            **{f'HTTP_{name.upper().replace("-", "_")}': value for name, value in headers.items()},
+            'REQUEST_METHOD': method,
+            'PATH_INFO': url.path,
+            'SCRIPT_NAME': '',
+            'QUERY_STRING': url.query,
+            'CONTENT_TYPE': 'application/json' if body else '',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.url_scheme': parent.scheme,
+        }
+        sub = WSGIRequest(environ)
+        sub.resolver_match = match
+        # one session/user lookup for the whole batch
+        for attr in ('user', 'session', '_dont_enforce_csrf_checks'):
+            if hasattr(parent, attr):
+                setattr(sub, attr, getattr(parent, attr))
+        return sub
+
+    # ------------------------------------------------------------
+    # Running them
+    # ------------------------------------------------------------
+    def run_in_worker(self, sub):
+        try:
+            return self.run(sub)
+        finally:
+            # keep this thread's connection for the next batch, unless it broke
+            if connection.connection is not None and connection.errors_occurred and not connection.is_usable():
+                connection.close()
+
+    def run(self, sub):
+        if isinstance(sub, SubRequestError):
+            return {'status': sub.status_code, 'headers': {}, 'body': {'detail': sub.detail}}
+        match = sub.resolver_match
+        view = match.func
+        if iscoroutinefunction(view):
+            view = async_to_sync(view)
+
+        def get_response(sub):
+            response = view(sub, *match.args, **match.kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response.render()
+            return response
+
+        try:
+            if sub.method in CONCURRENT_METHODS:
+                response = get_response(sub)
+            else:
+                response = IdempotencyMiddleware(get_response)(sub)
+        except Exception:
+            logger.exception('Batched %s %s failed', sub.method, sub.get_full_path())
+            return {'status': 500, 'headers': {}, 'body': {'detail': 'Server error.'}}
+        return self.result(response)
+
+    def result(self, response):
+        headers = {
+            header: value for header, value in response.items()
+            if header.lower() not in ('content-length', 'content-type')
+        }
+        if response.streaming:
+            response.close()
+            return {
+                'status': 400,
+                'headers': headers,
+                'body': {'detail': 'Streaming responses (exports) cannot be batched.'},
+            }
+        body = getattr(response, 'data', None)  # DRF: reuse the data, no re-parse
+        if body is None and response.content:
+            content_type = response.get('Content-Type', '')
+            if 'json' in content_type:
+                body = json.loads(response.content)
+            else:
+                body = response.content.decode(response.charset, errors='replace')
+        return {'status': response.status_code, 'headers': headers, 'body': body}
@@ -0,0 +1,241 @@
+import hashlib
+import math
+import random
+import threading
+import time
+from concurrent.futures import Future
+from urllib.parse import urlencode
+
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from .db_routers import reads_from_replica
+
+# ------------------------------------------------------------------------------
+# api/caching.py — versioned ("generation counter") response cache
+# ------------------------------------------------------------------------------
+# Reads vastly outnumber writes on the blog endpoints, so GET responses are
+# kept in Django's cache framework (see CACHES in settings.py).
+#
+# Instead of hunting down and deleting every cached page after a write, each
+# cache key embeds a GENERATION number:
+#   - one per model for list pages      e.g. api:gen:blogs.blog
+#   - one per object for detail pages   e.g. api:gen:blogs.blog:5
+# A write just bumps the generation (api/signals.py). Old entries are never
+# read again and age out through the cache's TTL / LRU eviction.
+#
+# Real-life analogy:
+# - A newspaper edition number: when the edition changes, nobody reads
+#   yesterday's copies — you don't have to collect them from every doorstep.
+# ------------------------------------------------------------------------------
+
+
+def generation_key(label, pk=None):
+    """`label` is a model's `_meta.label_lower`, `pk` narrows it to one object."""
+    if pk is None:
+        return f'api:gen:{label}'
+    return f'api:gen:{label}:{pk}'
+
+
+def _initial_generation():
+    # Time based, so a generation that was evicted restarts ABOVE any value
+    # still embedded in live cache keys.
+    return time.time_ns() // 1000
+
+
+def get_generations(keys):
+    generations = cache.get_many(keys)
+    for key in keys:
+        if key not in generations:
+            cache.add(key, _initial_generation(), timeout=None)
+            generations[key] = cache.get(key)
+    return [generations[key] for key in keys]
+
+
+def bump_generations(*keys):
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:  # never read or evicted — start a fresh one
+            cache.add(key, _initial_generation(), timeout=None)
+
+
+def reset_generations(keys):
+    """
+    Invalidate many generations in ONE cache call: dropped counters restart
+    (time based) above every value still embedded in cache keys.
+    """
+    cache.delete_many(list(keys))
+
+
+# ============================================================
+# 🐘 Stampede protection
+# ============================================================
+# When a hot page's entry disappears (TTL, or a write bumped its generation),
+# hundreds of concurrent GETs all miss at once and ALL rebuild the same
+# payload — the "thundering herd". Three layers keep that to one rebuild:
+#
+# 1. Single flight (per process): concurrent misses for the same key wait
+#    for the first request's result instead of computing it again.
+# 2. Stale-while-revalidate (across processes): an entry lives on for
+#    `cache_stale_timeout` seconds past its expiry. The first request to see
+#    it expired takes a cache.add() lock and rebuilds; everyone else keeps
+#    getting the stale copy (X-Cache: STALE) meanwhile. On a cold miss, a
+#    process that can't get the lock waits up to `cache_lock_wait` for the
+#    lock holder's result before computing it anyway.
+# 3. Probabilistic early expiry ("XFetch"): each hit near the end of an
+#    entry's life may volunteer to rebuild it early, with a probability that
+#    grows as expiry approaches and with how slow the page was to build
+#    (`cache_early_expiry_beta` scales it; 0 turns it off). Usually exactly
+#    one request refreshes before anyone sees a miss.
+#
+# After a write the generation changes and the old entry is NOT served
+# stale: layers 1 and 2's lock still coalesce the rebuild.
+#
+# Real-life analogy:
+# - One person phones the pizza place while the others wait, instead of
+#   everybody in the office ordering the same pizza.
+
+class SingleFlight:
+    """Concurrent do() calls with the same key share one run of `func`."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, func):
+        """Return `(result, shared)`; `shared` is True for callers that waited."""
+        with self.lock:
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.calls[key] = Future()
+        if not leader:
+            return future.result(), True
+        try:
+            result = func()
+        except BaseException as exc:
+            future.set_exception(exc)  # waiters raise it too (e.g. a 404)
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            with self.lock:
+                del self.calls[key]
+
+
+_flights = SingleFlight()
+
+
+def should_refresh_early(entry, now, beta):
+    """XFetch: True with a probability that rises as `entry` nears expiry."""
+    if beta <= 0:
+        return False
+    return now - entry['delta'] * beta * math.log(1.0 - random.random()) >= entry['expires']
+
+
+# Conditional-request validators (set by ConditionalGetMixin) are cached with
+# the data, so a HIT can still be answered with 304 Not Modified.
+VALIDATOR_HEADERS = ('ETag', 'Last-Modified')
+
+
+def cached_copy(entry, state):
+    return Response(entry['data'], headers={**entry.get('headers', {}), 'X-Cache': state})
+
+
+class CachedResponseMixin:
+    """
+    Cache GET list/retrieve responses per URL + query params + generation.
+
+    - list()     depends on the model's list generation
+    - retrieve() depends on the object's own generation
+    Responses carry `X-Cache`: HIT, MISS, STALE (served while another request
+    rebuilds it) or COALESCED (shared with a concurrent identical request).
+
+    The cache key does not include the user, so only use this on views whose
+    output is the same for every client (true for the blog endpoints).
+    """
+    cache_timeout = 60            # seconds an entry is fresh
+    cache_stale_timeout = 30      # seconds it may still be served while being rebuilt
+    cache_lock_timeout = 10       # seconds a rebuild lock is held at most
+    cache_lock_wait = 2           # seconds a cold miss waits for another process's rebuild
+    cache_early_expiry_beta = 1.0
+    cache_poll_interval = 0.02
+    etag_short_circuit = False    # a MISS is stored, so it must always carry the body
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def get_cache_generation_keys(self):
+        label = self.queryset.model._meta.label_lower
+        lookup = self.kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        return [generation_key(label, lookup)]
+
+    def get_response_cache_key(self, request):
+        params = urlencode(sorted(request.query_params.lists()), doseq=True)
+        generations = get_generations(self.get_cache_generation_keys())
+        self.cache_generations = generations  # ConditionalGetMixin folds them into the ETag
+        # Replica reads may lag, so they get their own entries: a client pinned
+        # to the primary after a write must never be served a replica's copy.
+        source = 'replica' if reads_from_replica() else 'primary'
+        raw = f'{request.build_absolute_uri(request.path)}?{params}|{generations}|{source}'
+        return 'api:resp:' + hashlib.md5(raw.encode()).hexdigest()
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        key = self.get_response_cache_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            now = time.time()
+            fresh = now < entry['expires'] and not should_refresh_early(
+                entry, now, self.cache_early_expiry_beta
+            )
+            if fresh or not cache.add(f'{key}:lock', 1, self.cache_lock_timeout):
+                expired = now >= entry['expires']
+                return cached_copy(entry, 'STALE' if expired else 'HIT')
+            return self.rebuild(key, handler, request, *args, **kwargs)
+
+        response, shared = _flights.do(
+            key, lambda: self.rebuild_cold(key, handler, request, *args, **kwargs)
+        )
+        if shared:
+            headers = {name: response[name] for name in VALIDATOR_HEADERS if response.has_header(name)}
+            return Response(
+                response.data, status=response.status_code, headers={**headers, 'X-Cache': 'COALESCED'}
+            )
+        return response
+
+    def rebuild_cold(self, key, handler, request, *args, **kwargs):
+        deadline = time.monotonic() + self.cache_lock_wait
+        while not cache.add(f'{key}:lock', 1, self.cache_lock_timeout):
+            entry = cache.get(key)  # another process is building it
+            if entry is not None:
+                return cached_copy(entry, 'HIT')
+            if time.monotonic() >= deadline:
+                return self.rebuild(key, handler, request, *args, locked=False, **kwargs)
+            time.sleep(self.cache_poll_interval)
+        return self.rebuild(key, handler, request, *args, **kwargs)
+
+    def rebuild(self, key, handler, request, *args, locked=True, **kwargs):
+        """Run `handler` and cache its 200 response, then release our rebuild lock."""
+        try:
+            start = time.perf_counter()
+            response = handler(request, *args, **kwargs)
+            if response.status_code == 200:
+                entry = {
+                    'data': response.data,
+                    'delta': time.perf_counter() - start,  # how long a rebuild takes
+                    'expires': time.time() + self.cache_timeout,
+                    'headers': {
+                        name: response[name] for name in VALIDATOR_HEADERS if response.has_header(name)
+                    },
+                }
+                cache.set(key, entry, self.cache_timeout + self.cache_stale_timeout)
+        finally:
+            if locked:
+                cache.delete(f'{key}:lock')
+        response['X-Cache'] = 'MISS'
+        return response
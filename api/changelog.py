@@ -0,0 +1,138 @@
+import base64
+import binascii
+import json
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.pagination import _positive_int
+
+from employees.models import Employee, EmployeeChange
+from .signals import post_bulk_save
+
+# ------------------------------------------------------------------------------
+# api/changelog.py — delta sync for employees (/employees/changes/?since=)
+# ------------------------------------------------------------------------------
+# Downstream systems used to re-pull the whole employee list every few minutes
+# to spot the handful of rows that changed: O(table) per sync.
+#
+# Every create, update and delete of an Employee appends a row to
+# EmployeeChange (deletes leave a "tombstone", since the employee row itself
+# is gone). The log's id is a sequence number, and a sync token is just a
+# position in it:
+#
+#   GET /employees/changes/              -> {"changes": [], "next": <token>}
+#                                           (the current position: take it
+#                                           BEFORE the initial full pull)
+#   GET /employees/changes/?since=<token> -> the changes after that position,
+#                                           oldest first, plus the next token
+#
+#   {"changes": [{"op": "update", "id": 7, "data": {...employee...}},
+#                {"op": "delete", "id": 9, "data": null}],
+#    "next": "<token>", "has_more": false}
+#
+# Several changes to one employee within a page collapse into one item with
+# the employee's CURRENT data, so clients should upsert by id. Each sync
+# reads only the log rows after the token (a primary-key range) plus the
+# changed employees: O(changes), not O(table).
+#
+# Written by post_save/post_delete, and post_bulk_save for the bulk endpoint
+# and `manage.py generate_data`, inside the same transaction as the write.
+# QuerySet.delete() is covered (Django sends post_delete per row while a
+# receiver is connected), but QuerySet.update(), bulk_create()/bulk_update()
+# and raw SQL send nothing: code that writes employees that way must send
+# post_bulk_save itself (see BulkListSerializer), or syncing clients never see
+# the change. SQLite has one writer at a time,
+# so log ids are handed out in commit order and a token never skips a change
+# that commits later. `manage.py prune_employee_changes` trims old entries;
+# tokens from before the trimmed range get 410 Gone (re-pull and start over).
+# ------------------------------------------------------------------------------
+
+MAX_PAGE_SIZE = 1000
+DEFAULT_PAGE_SIZE = 500
+
+
+@receiver(post_save, sender=Employee)
+def log_employee_save(sender, instance, created, **kwargs):
+    op = EmployeeChange.CREATE if created else EmployeeChange.UPDATE
+    EmployeeChange.objects.create(employee_id=instance.pk, op=op)
+
+
+@receiver(post_delete, sender=Employee)
+def log_employee_delete(sender, instance, **kwargs):
+    EmployeeChange.objects.create(employee_id=instance.pk, op=EmployeeChange.DELETE)
+
+
+@receiver(post_bulk_save, sender=Employee)
+def log_employee_bulk_save(sender, instances, created, **kwargs):
+    EmployeeChange.objects.bulk_create(
+        EmployeeChange(
+            employee_id=instance.pk,
+            op=EmployeeChange.CREATE if new else EmployeeChange.UPDATE,
+        )
+        for instance, new in zip(instances, created)
+    )
+
+
+class SyncTokenExpired(APIException):
+    status_code = status.HTTP_410_GONE
+    default_detail = 'This sync token is older than the kept changelog; re-pull the full list.'
+    default_code = 'sync_token_expired'
+
+
+# Tokens are opaque to clients (base64 JSON, like the keyset cursors), so the
+# format can change without breaking anyone who just echoes them back.
+def encode_token(seq):
+    return base64.urlsafe_b64encode(json.dumps({'s': seq}).encode()).decode('ascii')
+
+
+def decode_token(token):
+    try:
+        seq = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))['s']
+        if not isinstance(seq, int) or seq < 0:
+            raise ValueError
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+        raise ValidationError({'since': ['Invalid sync token.']})
+    return seq
+
+
+def head_seq():
+    return EmployeeChange.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+
+
+def read_changes(params):
+    """
+    Parse ?since= / ?page_size= and return `(changes, next_token, has_more)`:
+    `changes` is `[(op, employee_id, employee or None)]`, one per employee,
+    ordered by its latest entry.
+    """
+    token = params.get('since')
+    if token is None:
+        return [], encode_token(head_seq()), False
+    since = decode_token(token)
+    try:
+        limit = _positive_int(params['page_size'], strict=True, cutoff=MAX_PAGE_SIZE)
+    except (KeyError, ValueError):
+        limit = DEFAULT_PAGE_SIZE
+
+    oldest = EmployeeChange.objects.order_by('pk').values_list('pk', flat=True).first()
+    if oldest is not None and since < oldest - 1:
+        raise SyncTokenExpired()
+
+    entries = list(EmployeeChange.objects.filter(pk__gt=since).order_by('pk')[:limit + 1])
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    if not entries:
+        return [], encode_token(since), False
+
+    latest = {entry.employee_id: entry for entry in entries}  # later entries win
+    live = [pk for pk, entry in latest.items() if entry.op != EmployeeChange.DELETE]
+    rows = Employee.objects.in_bulk(live)
+    changes = []
+    for entry in sorted(latest.values(), key=lambda entry: entry.pk):
+        employee = rows.get(entry.employee_id)
+        # deleted after this page's last entry: the tombstone is on a later page
+        op = EmployeeChange.DELETE if employee is None else entry.op
+        changes.append((op, entry.employee_id, employee))
+    return changes, encode_token(entries[-1].pk), has_more
@@ -0,0 +1,52 @@
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from blogs.models import Blog, Comment
+
+# ------------------------------------------------------------------------------
+# api/counters.py — keep Blog.comment_count / last_comment_* exact on write
+# ------------------------------------------------------------------------------
+# Blog listings used to COUNT each blog's comments on every read (a correlated
+# subquery per row), and could not sort by it without counting them all.
+# Now the blog row carries the numbers and every comment write adjusts them
+# in the SAME transaction, with one relative UPDATE:
+#
+#   comment created   -> comment_count = comment_count + 1, pointer moves if newer
+#   comment deleted   -> comment_count = comment_count - 1, pointer re-read if
+#                        it pointed at the deleted comment
+#   comment moved     -> both blogs recounted
+#   comment edited    -> last_comment_at follows if it is the newest one
+#
+# Comment.objects.bulk_create() does the same per blog (blogs/models.py), and
+# api/deletion.py recounts after its set-based DELETEs. Comments deleted by
+# their blog's cascade are skipped: the blog row goes with them.
+# QuerySet.update() moving comments between blogs is NOT tracked —
+# `manage.py reconcile_comment_counts` puts any drift right.
+#
+# Real-life analogy:
+# - The "42 replies" badge on a forum thread is updated when someone posts,
+#   not recounted every time the thread list is shown.
+# ------------------------------------------------------------------------------
+
+
+@receiver(post_save, sender=Comment)
+def count_comment_save(sender, instance, created, using=None, **kwargs):
+    if created:
+        Blog.comments_added(instance.blog_id, [instance], using=using)
+        return
+    # set by api.signals.remember_previous_blog
+    previous = getattr(instance, '_previous_blog_id', None)
+    if previous is not None and previous != instance.blog_id:
+        Blog.refresh_comment_stats([previous, instance.blog_id], using=using)
+    else:
+        Blog.all_objects.using(using).filter(pk=instance.blog_id, last_comment_id=instance.pk).update(
+            last_comment_at=instance.updated_at
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def count_comment_delete(sender, instance, using=None, origin=None, **kwargs):
+    if isinstance(origin, Blog) or (isinstance(origin, QuerySet) and origin.model is Blog):
+        return  # cascade from deleting the blog itself
+    Blog.comment_removed(instance.blog_id, instance.pk, using=using)
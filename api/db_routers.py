@@ -0,0 +1,56 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+# ------------------------------------------------------------------------------
+# api/db_routers.py — send reads to replicas, writes to the primary
+# ------------------------------------------------------------------------------
+# A database router tells Django which DATABASES alias to use for each query.
+#
+# - Writes always go to 'default' (the primary).
+# - Reads go to a random alias from settings.DATABASE_REPLICAS, but ONLY while
+#   PrimaryStickinessMiddleware (api/middleware.py) has marked the current
+#   request as replica-safe: a GET/HEAD/OPTIONS from a client that hasn't
+#   written anything in the last READ_YOUR_WRITES_SECONDS.
+# - Everything else (writes, reads right after a write, management commands,
+#   reads inside a transaction) stays on the primary.
+#
+# Why the stickiness? Replicas lag behind the primary. Without it, a client
+# that just edited a blog could GET /blogs/<pk>/ from a replica and see the
+# old version of its own post.
+# ------------------------------------------------------------------------------
+
+PRIMARY = 'default'
+
+# True while the current request may read from a replica.
+replica_reads_allowed = ContextVar('replica_reads_allowed', default=False)
+
+
+def reads_from_replica():
+    """Will reads in the current context be routed to a replica?"""
+    return bool(getattr(settings, 'DATABASE_REPLICAS', [])) and replica_reads_allowed.get()
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if not reads_from_replica():
+            return PRIMARY
+        if connections[PRIMARY].in_atomic_block:
+            return PRIMARY  # reads in a transaction must see its own writes
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db  # related rows come from the same copy
+        return random.choice(settings.DATABASE_REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
@@ -0,0 +1,196 @@
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import connection, router, transaction
+from django.db.models.signals import post_delete, pre_delete
+from django.utils import timezone
+
+from blogs.models import Blog, Comment
+from .counters import count_comment_delete
+from .signals import invalidate_blog, invalidate_comment, invalidate_comments
+
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------------------
+# api/deletion.py — deleting a blog without loading its comments
+# ------------------------------------------------------------------------------
+# Comment.blog is on_delete=CASCADE. A plain `blog.delete()` leaves the cascade
+# to Django's deletion Collector, and because api/signals.py listens to Comment
+# deletes, the Collector cannot use a single DELETE: it loads EVERY comment
+# into memory and sends pre_delete/post_delete for each one. For a 50k-comment
+# thread that is seconds of work and a big memory spike.
+#
+# settings.BLOG_DELETE['MODE'] picks one of two faster paths:
+#
+#   'fast'   (default) inside the request: ONE set-based
+#            DELETE FROM blogs_comment WHERE blog_id = ?, then the blog row.
+#            Only the comment ids are read, to invalidate their cached pages
+#            in bulk (invalidate_comments) instead of one signal per comment,
+#            and the affected blogs' comment counters are recounted once.
+#
+#   'purge'  the request only stamps Blog.deleted_at — the blog disappears
+#            from every endpoint at once (Blog.objects hides it) — and a
+#            background thread deletes its comments PURGE_BATCH_SIZE at a time,
+#            each batch in its own short transaction, then the blog row.
+#            For threads so big that even one DELETE would hold SQLite's write
+#            lock too long. Until the purge reaches them, the comments are
+#            still readable under /comments/. `manage.py purge_deleted_blogs`
+#            finishes purges that a restart interrupted.
+#
+# Both paths go back to the Collector when OTHER code has connected a
+# pre_delete/post_delete receiver for Comment: that code expects to see each
+# deleted instance, and a set-based DELETE would silently skip it.
+#
+# Real-life analogy:
+# - Emptying a filing drawer by pulling out the whole drawer, instead of
+#   taking out and signing for every sheet one by one.
+# ------------------------------------------------------------------------------
+
+# Comment receivers whose work delete_comments() does in bulk itself.
+BULK_AWARE_RECEIVERS = {invalidate_comment, count_comment_delete}
+
+# Two private Django APIs are used below, because the public ones cannot do
+# the job here:
+# - Signal.has_listeners() cannot tell OUR bulk-aware receivers (always
+#   connected) from anyone else's, so it would always pick the Collector;
+#   Signal._live_receivers() lists them.
+# - QuerySet.delete() only issues a single DELETE when NO receiver is
+#   connected; _raw_delete() is that same statement.
+# BlogDeleteTests.test_private_django_apis pins both, so a Django upgrade
+# that changes them fails loudly there instead of here.
+
+
+def live_receivers(signal, sender):
+    """The receivers connected to `signal` for `sender`, or None if Django no longer says."""
+    try:
+        sync_receivers, async_receivers = signal._live_receivers(sender)
+    except (AttributeError, TypeError, ValueError):
+        return None
+    return [*sync_receivers, *async_receivers]
+
+
+def comment_receivers_need_instances():
+    """True if a delete receiver for Comment other than BULK_AWARE_RECEIVERS is connected."""
+    for signal in (pre_delete, post_delete):
+        if not signal.has_listeners(Comment):
+            continue
+        receivers = live_receivers(signal, Comment)
+        if receivers is None or any(receiver not in BULK_AWARE_RECEIVERS for receiver in receivers):
+            return True  # unknown receivers: let the Collector send every signal
+    return False
+
+
+def delete_comments(queryset):
+    """Delete the comments in `queryset`, set-based when possible. Returns how many."""
+    if comment_receivers_need_instances():
+        return queryset.delete()[0]
+    rows = list(queryset.values_list('pk', 'blog_id'))
+    if not rows:
+        return 0
+    # the single DELETE the Collector itself issues for "fast deletes": no
+    # signals, no cascades (nothing references Comment)
+    queryset._raw_delete(queryset.db)
+    blog_ids = {blog_id for _, blog_id in rows}
+    Blog.refresh_comment_stats(blog_ids, using=queryset.db)
+    invalidate_comments([pk for pk, _ in rows], blog_ids)
+    return len(rows)
+
+
+def fast_delete_blog(blog):
+    """Delete `blog` and all its comments in two statements."""
+    using = router.db_for_write(Blog, instance=blog)
+    with transaction.atomic(using=using):
+        deleted = delete_comments(Comment._base_manager.using(using).filter(blog_id=blog.pk))
+        blog.delete(using=using)  # the Collector now finds no comments left
+    return deleted
+
+
+def mark_blog_deleted(blog):
+    """Hide `blog` right away; its comments and row are removed by purge_blog()."""
+    now = timezone.now()
+    Blog.all_objects.filter(pk=blog.pk).update(deleted_at=now, updated_at=now)
+    blog.deleted_at = now
+    invalidate_blog(Blog, blog)  # update() sends no post_save
+
+
+def purge_blog(pk, batch_size=1000, using=None):
+    """
+    Delete a blog marked by mark_blog_deleted(): its comments `batch_size` at
+    a time, each batch in its own transaction, then the blog row.
+    Returns the number of comments deleted.
+    """
+    using = using or router.db_for_write(Blog)
+    comments = Comment._base_manager.using(using).filter(blog_id=pk)
+    deleted = 0
+    while True:
+        with transaction.atomic(using=using):
+            # (blog, id) index: each batch is a short range scan
+            batch = list(comments.order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not batch:
+                break
+            deleted += delete_comments(Comment._base_manager.using(using).filter(pk__in=batch))
+    with transaction.atomic(using=using):
+        for blog in Blog.all_objects.using(using).filter(pk=pk, deleted_at__isnull=False):
+            blog.delete(using=using)
+    return deleted
+
+
+class BlogPurger:
+    """One daemon thread that runs purge_blog() for each submitted blog, in order."""
+
+    def __init__(self, batch_size=1000):
+        self.batch_size = batch_size
+        self.jobs = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def submit(self, pk):
+        self.start()
+        self.jobs.put(pk)
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='blog-purger', daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while True:
+            pk = self.jobs.get()
+            try:
+                purge_blog(pk, self.batch_size)
+            except Exception:
+                logger.exception('Purging blog %s failed; `manage.py purge_deleted_blogs` retries it', pk)
+            finally:
+                connection.close_if_unusable_or_obsolete()
+                self.jobs.task_done()
+
+
+_purger = None
+_purger_lock = threading.Lock()
+
+
+def get_blog_purger():
+    global _purger
+    with _purger_lock:
+        if _purger is None:
+            _purger = BlogPurger(batch_size=blog_delete_options().get('PURGE_BATCH_SIZE', 1000))
+    return _purger
+
+
+def blog_delete_options():
+    return getattr(settings, 'BLOG_DELETE', {})
+
+
+def delete_blog(blog):
+    """Delete `blog` the way settings.BLOG_DELETE['MODE'] says ('fast' or 'purge')."""
+    if blog_delete_options().get('MODE', 'fast') != 'purge':
+        fast_delete_blog(blog)
+        return
+    using = router.db_for_write(Blog, instance=blog)
+    with transaction.atomic(using=using):
+        mark_blog_deleted(blog)
+        # the purger's own connection must see the committed mark
+        transaction.on_commit(lambda: get_blog_purger().submit(blog.pk), using=using)
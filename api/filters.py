@@ -0,0 +1,38 @@
+from rest_framework.filters import OrderingFilter
+
+# ------------------------------------------------------------------------------
+# api/filters.py — ?ordering= that an index can answer
+# ------------------------------------------------------------------------------
+# DRF's OrderingFilter accepts any mix of fields and directions. Two things
+# make SQLite sort the whole table in a temp B-tree instead of reading an index:
+# a column with no index, and ties that are broken in a DIFFERENT direction
+# than the column itself (comment_count DESC, id ASC).
+#
+# IndexedOrderingFilter takes ONE field from `ordering_fields` and adds the
+# primary key in the same direction:
+#
+#   ?ordering=-comment_count   ->  ORDER BY comment_count DESC, id DESC
+#
+# which is exactly an (field, id) index read backwards: a page of the "most
+# commented" blogs reads page-size index entries, not every blog. Each field in
+# `ordering_fields` needs such an index (see Blog.Meta.indexes). The pk
+# tie-break also keeps pages stable when many rows share a value.
+#
+# Real-life analogy:
+# - A library card catalogue already filed by author: you read the drawer
+#   front to back (or back to front), you never re-sort the cards.
+# ------------------------------------------------------------------------------
+
+
+class IndexedOrderingFilter(OrderingFilter):
+    """`?ordering=[-]<field>` for one indexed field; ties broken by pk in the same direction."""
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        field = ordering[0]
+        tie_break = '-pk' if field.startswith('-') else 'pk'
+        if field.lstrip('-') in ('pk', queryset.model._meta.pk.name):
+            return [tie_break]
+        return [field, tie_break]
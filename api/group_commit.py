@@ -0,0 +1,142 @@
+import contextvars
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, TimeoutError
+
+from django.conf import settings
+from django.db import connection, transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+# ------------------------------------------------------------------------------
+# api/group_commit.py — batch small concurrent writes into one COMMIT
+# ------------------------------------------------------------------------------
+# SQLite allows ONE writer at a time, and every COMMIT waits for the disk.
+# With many clients POSTing comments at once, requests queue on the write
+# lock (or fail with "database is locked") and each pays its own COMMIT.
+#
+# The WriteCoordinator funnels writes through a single writer thread:
+#   1. a request thread submits its write (e.g. `serializer.save`) and waits,
+#   2. the writer takes everything queued (up to MAX_BATCH, lingering up to
+#      MAX_WAIT_MS for stragglers) and runs it inside ONE transaction — each
+#      write in its own savepoint, so one failing write doesn't sink the rest,
+#   3. one COMMIT, then every waiting request gets its result (or error).
+#
+# Real-life analogy:
+# - A lift that waits a moment for everyone in the lobby instead of making
+#   one trip per person.
+#
+# Configure with settings.WRITE_COORDINATOR (see settings.py). Writes issued
+# inside an open transaction (e.g. in tests) run inline, because the writer
+# thread's connection could not see that transaction's uncommitted rows.
+#
+# A job runs in a copy of its submitter's context (contextvars), so the
+# request's query metrics/budget and replica routing still apply to it.
+# A submitter waits at most TIMEOUT_SECONDS: then its job is dropped if it
+# hasn't started and the request fails with 503 instead of hanging forever
+# behind a wedged writer. A writer thread that died is started again.
+# ------------------------------------------------------------------------------
+
+
+class WriteTimeout(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'The write queue is busy; retry the request.'
+    default_code = 'write_timeout'
+
+
+class WriteCoordinator:
+    liveness_interval = 0.5  # seconds between writer-thread checks while waiting
+
+    def __init__(self, max_batch=64, max_wait_ms=2, timeout=10):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.timeout = timeout
+        self.jobs = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def submit(self, func, *args, **kwargs):
+        """Run `func(*args, **kwargs)` in the next group commit and return its result."""
+        if connection.in_atomic_block:
+            return func(*args, **kwargs)
+        self.start()
+        future = Future()
+        context = contextvars.copy_context()
+        self.jobs.put((future, context, func, args, kwargs))
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                wait = min(self.liveness_interval, max(deadline - time.monotonic(), 0))
+                return future.result(timeout=wait)
+            except TimeoutError:
+                if time.monotonic() >= deadline:
+                    future.cancel()  # skipped if the writer hasn't picked it up yet
+                    raise WriteTimeout()
+                self.start()  # the writer died with our job still queued
+
+    def start(self):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name='write-coordinator', daemon=True
+                )
+                self.thread.start()
+
+    def next_batch(self):
+        batch = [self.jobs.get()]
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self.jobs.get(timeout=self.max_wait))
+            except queue.Empty:
+                break
+        return batch
+
+    def run(self):
+        while True:
+            batch = self.next_batch()
+            results = []
+            try:
+                with transaction.atomic():
+                    for future, context, func, args, kwargs in batch:
+                        if not future.set_running_or_notify_cancel():
+                            continue  # its submitter timed out and gave up
+                        try:
+                            with transaction.atomic():
+                                results.append((future, context.run(func, *args, **kwargs), None))
+                        except Exception as exc:
+                            results.append((future, None, exc))
+            except Exception as exc:  # the COMMIT itself failed
+                for future, *_ in batch:
+                    if not future.cancelled():
+                        try:
+                            future.set_exception(exc)
+                        except InvalidStateError:  # cancelled by its submitter meanwhile
+                            pass
+                connection.close_if_unusable_or_obsolete()
+                continue
+            for future, result, exc in results:
+                if exc is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(exc)
+
+
+_coordinator = None
+_coordinator_lock = threading.Lock()
+
+
+def get_write_coordinator():
+    """The process-wide coordinator, or None when WRITE_COORDINATOR is disabled."""
+    global _coordinator
+    options = getattr(settings, 'WRITE_COORDINATOR', {})
+    if not options.get('ENABLED', False):
+        return None
+    with _coordinator_lock:
+        if _coordinator is None:
+            _coordinator = WriteCoordinator(
+                max_batch=options.get('MAX_BATCH', 64),
+                max_wait_ms=options.get('MAX_WAIT_MS', 2),
+                timeout=options.get('TIMEOUT_SECONDS', 10),
+            )
+    return _coordinator
@@ -0,0 +1,233 @@
+import json
+import math
+import platform
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+
+from api.metrics import registry
+from blogs.models import Blog, Comment
+from employees.models import Employee
+
+DEFAULT_ENDPOINTS = [
+    'employees/', 'employees/{employee}/',
+    'blogs/', 'blogs/{blog}/',
+    'comments/', 'comments/{comment}/',
+    'async/blogs/',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark API endpoints and report p50/p95/p99 latency, throughput and '
+        'SQL queries per request as JSON. Drives the views through the Django '
+        'test client, an in-process WSGI/ASGI server, or an external --url. '
+        'Save a run with --output and compare later runs to it with --compare. '
+        'Fill the database first, e.g. `manage.py generate_data`.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('endpoints', nargs='*', default=DEFAULT_ENDPOINTS,
+                            help='paths under /api/v1/; {blog}, {comment} and {employee} '
+                                 'are replaced by an existing primary key')
+        parser.add_argument('--target', choices=['client', 'wsgi', 'asgi'], default='client')
+        parser.add_argument('--url', help='base URL of a running server, e.g. http://127.0.0.1:8000')
+        parser.add_argument('--requests', type=int, default=200, help='measured requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--warm-cache', action='store_true',
+                            help="don't add a unique query param (lets the response cache answer)")
+        parser.add_argument('--output', help='write the JSON report to this file')
+        parser.add_argument('--compare', help='JSON report of an earlier run to compare with')
+
+    def handle(self, *args, **options):
+        paths = self.resolve_paths(options['endpoints'])
+        target = 'url' if options['url'] else options['target']
+        report = {
+            'meta': {
+                'target': target,
+                'requests': options['requests'],
+                'concurrency': options['concurrency'],
+                'warm_cache': options['warm_cache'],
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            },
+            'endpoints': {},
+        }
+        with self.server(target, options) as base_url:
+            for path in paths:
+                report['endpoints'][path] = self.bench(base_url, path, options)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        self.stdout.write(output)
+        if options['compare']:
+            with open(options['compare']) as f:
+                self.compare(json.load(f), report)
+
+    def resolve_paths(self, endpoints):
+        keys = {
+            'blog': Blog.objects.order_by('pk').values_list('pk', flat=True).first(),
+            'comment': Comment.objects.order_by('pk').values_list('pk', flat=True).first(),
+            'employee': Employee.objects.order_by('pk').values_list('pk', flat=True).first(),
+        }
+        paths = []
+        for endpoint in endpoints:
+            missing = [name for name, pk in keys.items() if pk is None and f'{{{name}}}' in endpoint]
+            if missing:
+                self.stderr.write(f'skipping {endpoint}: no {missing[0]} rows')
+                continue
+            paths.append(endpoint.format(**keys))
+        return paths
+
+    # -----------------------------
+    # Targets
+    # -----------------------------
+    @contextmanager
+    def server(self, target, options):
+        """Yield the base URL to request, or None for the in-process test client."""
+        if target == 'url':
+            yield options['url'].rstrip('/')
+        elif target == 'wsgi':
+            with self.wsgi_server() as url:
+                yield url
+        elif target == 'asgi':
+            with self.asgi_server() as url:
+                yield url
+        else:
+            yield None
+
+    @contextmanager
+    def wsgi_server(self):
+        from django.core.wsgi import get_wsgi_application
+
+        class ThreadingServer(ThreadingMixIn, WSGIServer):
+            daemon_threads = True
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_message(self, *args):
+                pass
+
+        server = make_server('127.0.0.1', 0, get_wsgi_application(),
+                             server_class=ThreadingServer, handler_class=QuietHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield f'http://127.0.0.1:{server.server_port}'
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    @contextmanager
+    def asgi_server(self):
+        try:
+            import uvicorn
+        except ImportError:
+            raise CommandError('--target asgi needs uvicorn: pip install uvicorn')
+        from django.core.asgi import get_asgi_application
+
+        sock = socket.socket()
+        sock.bind(('127.0.0.1', 0))
+        server = uvicorn.Server(uvicorn.Config(
+            get_asgi_application(), lifespan='off', log_level='warning', access_log=False,
+        ))
+        thread = threading.Thread(target=server.run, kwargs={'sockets': [sock]}, daemon=True)
+        thread.start()
+        while not server.started:
+            if not thread.is_alive():
+                raise CommandError('uvicorn failed to start')
+            time.sleep(0.01)
+        try:
+            yield f'http://127.0.0.1:{sock.getsockname()[1]}'
+        finally:
+            server.should_exit = True
+            thread.join(timeout=5)
+            sock.close()
+
+    # -----------------------------
+    # Measuring
+    # -----------------------------
+    def bench(self, base_url, path, options):
+        local = threading.local()
+
+        def fetch(i):
+            url = f'/api/v1/{path}'
+            if not options['warm_cache']:
+                # unique query param so the response cache doesn't answer
+                url += f'{"&" if "?" in url else "?"}_bench={i}'
+            start = time.perf_counter()
+            if base_url is None:
+                if not hasattr(local, 'client'):
+                    local.client = Client(SERVER_NAME='localhost')
+                status = local.client.get(url).status_code
+            else:
+                try:
+                    with urllib.request.urlopen(base_url + url) as response:
+                        response.read()
+                        status = response.status
+                except urllib.error.HTTPError as exc:
+                    status = exc.code
+            return time.perf_counter() - start, status
+
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            list(pool.map(fetch, range(-options['warmup'], 0)))
+            registry.clear()
+            start = time.perf_counter()
+            results = list(pool.map(fetch, range(options['requests'])))
+            elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency for latency, _ in results)
+        queries, observed = registry.totals('api_request_queries')
+        return {
+            'requests': len(results),
+            'errors': sum(1 for _, status in results if status >= 400),
+            'throughput_rps': round(len(results) / elapsed, 1),
+            'mean_ms': round(1000 * sum(latencies) / len(latencies), 3),
+            'p50_ms': round(1000 * percentile(latencies, 50), 3),
+            'p95_ms': round(1000 * percentile(latencies, 95), 3),
+            'p99_ms': round(1000 * percentile(latencies, 99), 3),
+            # counted by RequestMetricsMiddleware, so unknown for an external --url
+            'queries_per_request': round(queries / observed, 2) if observed else None,
+        }
+
+    def compare(self, baseline, report):
+        self.stdout.write('\nchange vs baseline (negative latency / positive throughput = faster):')
+        for path, now in report['endpoints'].items():
+            before = baseline.get('endpoints', {}).get(path)
+            if before is None:
+                self.stdout.write(f'  {path:<28} not in baseline')
+                continue
+            changes = '  '.join(
+                f'{key} {change(before.get(key), now[key])}'
+                for key in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps', 'queries_per_request')
+            )
+            self.stdout.write(f'  {path:<28} {changes}')
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def change(before, now):
+    if before is None or now is None:
+        return 'n/a'
+    if before == 0:
+        return f'{now:+}'
+    return f'{100 * (now - before) / before:+.1f}%'
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient
+
+from blogs.models import Blog, Comment
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare throughput of the sync DRF endpoints and their native async '
+        'counterparts (/api/v1/async/...) under N concurrent connections, '
+        'driven in-process through the ASGI handler.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=50, help='blogs to create if the table is empty')
+        parser.add_argument('--path', default='blogs/', help='resource path under /api/v1/')
+
+    def handle(self, *args, **options):
+        seeded = []
+        if not Blog.objects.exists():
+            seeded = Blog.objects.bulk_create(
+                Blog(blog_title=f'Bench {i}', blog_body='body') for i in range(options['seed'])
+            )
+            Comment.objects.bulk_create(
+                Comment(blog=blog, comment='nice post') for blog in seeded for _ in range(5)
+            )
+        try:
+            for label, prefix in (('sync', '/api/v1/'), ('async', '/api/v1/async/')):
+                elapsed, errors = asyncio.run(self.run(prefix + options['path'], options))
+                self.stdout.write(
+                    f'{label:<6} {options["requests"]} requests x{options["concurrency"]} '
+                    f'concurrent: {options["requests"] / elapsed:8.1f} req/s  '
+                    f'({elapsed:.2f}s, {errors} errors)'
+                )
+        finally:
+            Blog.objects.filter(pk__in=[blog.pk for blog in seeded]).delete()
+
+    async def run(self, url, options):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(options['concurrency'])
+        errors = 0
+
+        async def one(i):
+            nonlocal errors
+            async with semaphore:
+                # unique query param so the sync views' response cache doesn't answer
+                response = await client.get(f'{url}?limit=20&_={i}')
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(options['requests'])))
+        return time.perf_counter() - start, errors
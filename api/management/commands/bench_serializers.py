@@ -0,0 +1,76 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.mixins import plan_annotations, plan_queryset
+from api.serializers import EmployeeSerializer, compile_serializer
+from blogs.models import Blog, Comment
+from blogs.serializers import BlogSerializer, CommentSerializer
+from employees.models import Employee
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare DRF serializers with their compiled read-only versions: checks the '
+        'output is identical and prints the time per row. Works on throwaway rows '
+        'inside a transaction that is rolled back.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000)
+        parser.add_argument('--comments', type=int, default=5, help='comments per blog')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.seed(options['rows'], options['comments'])
+            cases = [
+                ('employee', EmployeeSerializer, Employee.objects.all()),
+                ('comment', CommentSerializer, Comment.objects.all()),
+                ('blog', BlogSerializer, self.planned(Blog.objects.all(), BlogSerializer())),
+            ]
+            for name, serializer_class, queryset in cases:
+                self.bench(name, serializer_class, list(queryset), options['repeat'])
+            transaction.set_rollback(True)
+
+    def planned(self, queryset, serializer):
+        # same latest-comments prefetch as the blog views
+        select, prefetch = plan_queryset(serializer)
+        return queryset.select_related(*select).prefetch_related(*prefetch).annotate(
+            **plan_annotations(serializer)
+        )
+
+    def seed(self, rows, comments):
+        Employee.objects.bulk_create(
+            Employee(emp_id=f'BENCH{i}', emp_name=f'Bench {i}', designation='Dev')
+            for i in range(rows)
+        )
+        blogs = Blog.objects.bulk_create(
+            Blog(blog_title=f'Bench {i}', blog_body='body ' * 50) for i in range(rows)
+        )
+        Comment.objects.bulk_create(
+            Comment(blog=blog, comment='nice post') for blog in blogs for _ in range(comments)
+        )
+
+    def bench(self, name, serializer_class, objects, repeat):
+        serializer = serializer_class()
+        compiled = compile_serializer(serializer)
+        if serializer_class(objects, many=True).data != [compiled(obj) for obj in objects]:
+            self.stderr.write(self.style.ERROR(f'{name}: compiled output differs'))
+            return
+
+        def per_row(func):
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                func()
+                best = min(best, time.perf_counter() - start)
+            return best / len(objects) * 1e6
+
+        drf = per_row(lambda: serializer_class(objects, many=True).data)
+        fast = per_row(lambda: [compiled(obj) for obj in objects])
+        self.stdout.write(
+            f'{name:<10} {len(objects)} rows  drf {drf:7.2f} us/row  '
+            f'compiled {fast:7.2f} us/row  x{drf / fast:.1f}  (output identical)'
+        )
@@ -0,0 +1,64 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+
+from blogs.models import Blog
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure comment write throughput with N concurrent clients POSTing to '
+        '/api/v1/comments/, once with direct commits and once through the '
+        'group-commit WriteCoordinator. Run it against a file database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--writes', type=int, default=50, help='writes per thread')
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode = cursor.fetchone()[0]
+        self.stdout.write(f'journal_mode={journal_mode}')
+
+        blog = Blog.objects.create(blog_title='bench', blog_body='writes')
+        try:
+            for label, enabled in (('direct', False), ('group commit', True)):
+                with override_settings(WRITE_COORDINATOR={'ENABLED': enabled}):
+                    elapsed, errors = self.run(blog.pk, options['threads'], options['writes'])
+                total = options['threads'] * options['writes']
+                self.stdout.write(
+                    f'{label:<13} {total} writes x{options["threads"]} threads: '
+                    f'{total / elapsed:8.1f} writes/s  ({errors} errors)'
+                )
+        finally:
+            blog.delete()
+
+    def run(self, blog_pk, threads, writes):
+        errors = 0
+        lock = threading.Lock()
+
+        def worker():
+            nonlocal errors
+            client = Client()
+            for i in range(writes):
+                response = client.post(
+                    '/api/v1/comments/', {'blog': blog_pk, 'comment': f'bench {i}'},
+                    content_type='application/json',
+                )
+                if response.status_code != 201:
+                    with lock:
+                        errors += 1
+            connection.close()
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return time.perf_counter() - start, errors
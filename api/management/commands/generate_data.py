@@ -0,0 +1,130 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.deletion import delete_comments
+from api.signals import post_bulk_save
+from blogs.models import Blog, Comment
+from employees.models import Employee
+
+FIRST_NAMES = ['Asha', 'Ravi', 'Meera', 'John', 'Priya', 'Arjun', 'Sara', 'Karan', 'Lena', 'Omar']
+LAST_NAMES = ['Menon', 'Sharma', 'Iyer', 'Smith', 'Nair', 'Khan', 'Garcia', 'Rao', 'Chen', 'Das']
+# A few designations hold most of the staff, like in a real company.
+DESIGNATIONS = [
+    ('Software Engineer', 40), ('Senior Software Engineer', 20), ('QA Engineer', 12),
+    ('Designer', 8), ('Manager', 8), ('Data Analyst', 6), ('HR', 4), ('Director', 2),
+]
+WORDS = (
+    'django rest api serializer view query index cache page cursor model field '
+    'request response database python fast slow write read token json'
+).split()
+
+BLOG_MARKER = '[synthetic] '  # prefix of generated blog titles, used by --clear
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with synthetic employees, blogs and comments for '
+        'benchmarking. Designations and comments per blog are skewed: a few '
+        'blogs get most of the comments (Pareto distribution).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--employees', type=int, default=10000)
+        parser.add_argument('--blogs', type=int, default=2000)
+        parser.add_argument('--comments-per-blog', type=float, default=5,
+                            help='average comments per blog')
+        parser.add_argument('--max-comments', type=int, default=500,
+                            help='cap for the most popular blogs')
+        parser.add_argument('--skew', type=float, default=1.5,
+                            help='Pareto shape; smaller = more skewed')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--prefix', default='SYN', help='emp_id prefix of generated employees')
+        parser.add_argument('--clear', action='store_true',
+                            help='delete previously generated rows first')
+
+    def handle(self, *args, **options):
+        if options['skew'] <= 1:
+            raise CommandError('--skew must be greater than 1 (the mean is infinite otherwise)')
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+
+        if options['clear']:
+            employees, _ = Employee.objects.filter(emp_id__startswith=options['prefix']).delete()
+            with transaction.atomic():
+                # comments first in one set-based DELETE (api/deletion.py), so
+                # the blogs' Collector finds none left to load one by one
+                blogs = delete_comments(
+                    Comment._base_manager.filter(blog__blog_title__startswith=BLOG_MARKER)
+                )
+                blogs += Blog.all_objects.filter(blog_title__startswith=BLOG_MARKER).delete()[0]
+            self.stdout.write(f'cleared {employees} employee rows and {blogs} blog/comment rows')
+
+        start = Employee.objects.filter(emp_id__startswith=options['prefix']).count()
+        employees = (
+            Employee(
+                emp_id=f'{options["prefix"]}{start + i:07d}',
+                emp_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                designation=self.designation(rng),
+            )
+            for i in range(options['employees'])
+        )
+        self.insert(Employee, employees, batch_size)
+
+        comments = 0
+        blogs = (
+            Blog(blog_title=BLOG_MARKER + self.sentence(rng, 3, 8), blog_body=self.paragraph(rng))
+            for _ in range(options['blogs'])
+        )
+        for batch in self.batches(blogs, batch_size):
+            with transaction.atomic():
+                created = Blog.objects.bulk_create(batch)
+                rows = [
+                    Comment(blog=blog, comment=self.sentence(rng, 3, 25))
+                    for blog in created
+                    for _ in range(self.comment_count(rng, options))
+                ]
+                Comment.objects.bulk_create(rows, batch_size=batch_size)
+            comments += len(rows)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'created {options["employees"]} employees, {options["blogs"]} blogs, {comments} comments'
+        ))
+
+    def insert(self, model, objs, batch_size):
+        # bulk_create sends no post_save, so announce each batch like the bulk
+        # endpoint does: generated employees must reach the changelog too.
+        for batch in self.batches(objs, batch_size):
+            with transaction.atomic():
+                created = model.objects.bulk_create(batch)
+                post_bulk_save.send(sender=model, instances=created, created=[True] * len(created))
+
+    def batches(self, iterable, size):
+        batch = []
+        for item in iterable:
+            batch.append(item)
+            if len(batch) == size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def designation(self, rng):
+        names, weights = zip(*DESIGNATIONS)
+        return rng.choices(names, weights)[0]
+
+    def comment_count(self, rng, options):
+        # Pareto(shape) has mean shape/(shape-1); scale it to the wanted mean.
+        shape = options['skew']
+        scale = options['comments_per_blog'] * (shape - 1) / shape
+        return min(int(scale * rng.paretovariate(shape)), options['max_comments'])
+
+    def sentence(self, rng, shortest, longest):
+        return ' '.join(rng.choices(WORDS, k=rng.randint(shortest, longest))).capitalize()
+
+    def paragraph(self, rng):
+        # Post lengths are log-normal: mostly short, some very long.
+        sentences = max(1, min(int(rng.lognormvariate(1.5, 0.8)), 200))
+        return '. '.join(self.sentence(rng, 5, 15) for _ in range(sentences)) + '.'
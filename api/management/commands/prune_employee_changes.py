@@ -0,0 +1,35 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from employees.models import EmployeeChange
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete employee changelog entries older than --days (the delta-sync '
+        'window behind /employees/changes/). The newest entry is always kept; '
+        'clients holding a token from before the kept range get 410 Gone and '
+        're-pull the full list.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30)
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=options['days'])
+        newest = EmployeeChange.objects.order_by('-pk').values_list('pk', flat=True).first()
+        old = EmployeeChange.objects.filter(changed_at__lt=cutoff).exclude(pk=newest)
+        deleted = 0
+        while True:
+            # oldest first, so the kept log stays one contiguous id range
+            with transaction.atomic():
+                batch = list(old.order_by('pk').values_list('pk', flat=True)[:options['batch_size']])
+                if not batch:
+                    break
+                EmployeeChange.objects.filter(pk__in=batch).delete()
+            deleted += len(batch)
+        self.stdout.write(f'Deleted {deleted} changelog entries')
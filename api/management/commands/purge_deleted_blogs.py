@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from api.deletion import purge_blog
+from blogs.models import Blog
+
+
+class Command(BaseCommand):
+    help = (
+        "Finish deleting blogs that were deleted in BLOG_DELETE 'purge' mode "
+        '(hidden, but their comments not yet removed, e.g. after a restart). '
+        'Comments go --batch-size at a time, each batch in its own transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        pending = list(
+            Blog.all_objects.using(alias).filter(deleted_at__isnull=False)
+            .order_by('deleted_at').values_list('pk', flat=True)
+        )
+        for pk in pending:
+            comments = purge_blog(pk, max(options['batch_size'], 1), using=alias)
+            if options['verbosity'] > 1:
+                self.stdout.write(f'  blog {pk}: {comments} comments')
+        self.stdout.write(f'Purged {len(pending)} blog(s)')
@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from api.caching import bump_generations, generation_key
+from api.search import SEARCH_INDEXES, fts_available
+from blogs.models import Blog, Comment
+
+MODELS = {'blogs': Blog, 'comments': Comment}
+
+
+class Command(BaseCommand):
+    help = (
+        'Re-fill the full-text search index (?q= on /blogs/ and /comments/) from the '
+        'blog and comment tables, in batches of --batch-size rows so no single write '
+        'transaction holds the database for long. Run it while the tables are not '
+        'being edited; the triggers keep the index in sync afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('models', nargs='*', help=f'any of {", ".join(MODELS)} (default: all)')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        alias = options['database']
+        if not fts_available(alias):
+            raise CommandError(
+                f'No FTS5 search tables in database {alias!r}: it must be SQLite with '
+                'FTS5, migrated past blogs 0004_search_index.'
+            )
+        unknown = set(options['models']) - set(MODELS)
+        if unknown:
+            raise CommandError(f'Unknown model(s): {", ".join(sorted(unknown))}')
+        for name in options['models'] or MODELS:
+            index = SEARCH_INDEXES[MODELS[name]]
+            rows = self.rebuild(connections[alias], index, max(options['batch_size'], 1))
+            # cached ?q= list pages may hold results from the old index
+            bump_generations(generation_key(index.model._meta.label_lower))
+            self.stdout.write(f'{name}: indexed {rows} rows')
+
+    def rebuild(self, connection, index, batch_size):
+        fts, opts = index.table, index.model._meta
+        table, pk = opts.db_table, opts.pk.column
+        columns = ', '.join(index.columns)
+        with connection.cursor() as cursor:
+            with transaction.atomic(using=connection.alias):
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('delete-all')")
+                # rows added after this point are indexed by the insert trigger
+                cursor.execute(f'SELECT MAX({pk}) FROM {table}')
+                last_pk = cursor.fetchone()[0] or 0
+
+            done, after = 0, 0
+            while after < last_pk:
+                with transaction.atomic(using=connection.alias):
+                    cursor.execute(
+                        f'SELECT MAX({pk}) FROM (SELECT {pk} FROM {table} '
+                        f'WHERE {pk} > %s AND {pk} <= %s ORDER BY {pk} LIMIT %s)',
+                        [after, last_pk, batch_size],
+                    )
+                    upto = cursor.fetchone()[0]
+                    if upto is None:
+                        break
+                    cursor.execute(
+                        f'INSERT INTO {fts}(rowid, {columns}) SELECT {pk}, {columns} '
+                        f'FROM {table} WHERE {pk} > %s AND {pk} <= %s',
+                        [after, upto],
+                    )
+                    done += cursor.rowcount
+                after = upto
+                if self.verbosity > 1:
+                    self.stdout.write(f'  {index.table}: {done} rows')
+
+            # merge the per-batch index segments into one for faster queries
+            cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('optimize')")
+        return done
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from api.caching import bump_generations, generation_key
+from blogs.models import COUNTER_FIELDS, Blog, actual_comment_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount every blog's comment_count / last_comment_id / last_comment_at "
+        'from its comments and fix the rows that drifted (e.g. after a raw SQL '
+        'import or a QuerySet.update() that moved comments). Blogs go '
+        '--batch-size at a time, each batch in its own transaction.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--dry-run', action='store_true', help='Only report the drifted blogs.')
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        batch_size = max(options['batch_size'], 1)
+        actual = {f'actual_{name}': expression for name, expression in actual_comment_stats().items()}
+        blogs = Blog.all_objects.using(alias).order_by('pk')
+        checked = fixed = 0
+        last_pk = 0
+        while True:
+            with transaction.atomic(using=alias):
+                # pk ranges, not OFFSET: every batch is an index seek
+                rows = list(
+                    blogs.filter(pk__gt=last_pk).annotate(**actual)
+                    .values('pk', *COUNTER_FIELDS, *actual)[:batch_size]
+                )
+                if not rows:
+                    break
+                last_pk = rows[-1]['pk']
+                drifted = [
+                    row['pk'] for row in rows
+                    if any(row[name] != row[f'actual_{name}'] for name in COUNTER_FIELDS)
+                ]
+                if drifted and not options['dry_run']:
+                    Blog.refresh_comment_stats(drifted, using=alias)
+            checked += len(rows)
+            fixed += len(drifted)
+            if drifted and options['verbosity'] > 1:
+                self.stdout.write(f'  drifted: {", ".join(map(str, drifted))}')
+            if drifted and not options['dry_run']:
+                # QuerySet.update() sends no post_save
+                label = Blog._meta.label_lower
+                bump_generations(
+                    generation_key(label), *(generation_key(label, pk) for pk in drifted)
+                )
+        verb = 'would fix' if options['dry_run'] else 'fixed'
+        self.stdout.write(f'Checked {checked} blog(s), {verb} {fixed}')
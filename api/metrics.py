@@ -0,0 +1,150 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.http import HttpResponse
+
+# ------------------------------------------------------------------------------
+# api/metrics.py — per-view request metrics in Prometheus text format
+# ------------------------------------------------------------------------------
+# RequestMetricsMiddleware (api/middleware.py) measures every request and
+# records it here, per resolved view name:
+#   api_request_duration_seconds     total time in Django
+#   api_request_queries              number of SQL queries
+#   api_request_db_seconds           time spent inside the database driver
+#   api_request_serializer_seconds   time spent turning objects into JSON-ready data
+#                                    (compiled read serializers, see FastReadMixin)
+#
+# Each metric is a histogram with FIXED buckets: one counter per bucket, so
+# memory stays constant however many requests are observed. GET /metrics
+# returns them in Prometheus' text format, ready to be scraped.
+#
+# Real-life analogy:
+# - A tally sheet with columns "under 5ms", "under 10ms", ... — you add a
+#   stroke in a column instead of writing down every single time.
+# ------------------------------------------------------------------------------
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+METRICS = {
+    'api_request_duration_seconds': ('Total request latency.', SECONDS_BUCKETS),
+    'api_request_queries': ('SQL queries per request.', QUERY_BUCKETS),
+    'api_request_db_seconds': ('Time spent in SQL per request.', SECONDS_BUCKETS),
+    'api_request_serializer_seconds': ('Time spent serializing per request.', SECONDS_BUCKETS),
+}
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}  # (metric, view) -> Histogram
+
+    def observe(self, metric, view, value):
+        with self.lock:
+            histogram = self.histograms.get((metric, view))
+            if histogram is None:
+                histogram = self.histograms[metric, view] = Histogram(METRICS[metric][1])
+            histogram.observe(value)
+
+    def totals(self, metric):
+        """(sum, count) of `metric` over every view."""
+        with self.lock:
+            histograms = [h for (name, _), h in self.histograms.items() if name == metric]
+            return sum(h.sum for h in histograms), sum(sum(h.counts) for h in histograms)
+
+    def clear(self):
+        with self.lock:
+            self.histograms.clear()
+
+    def render(self):
+        lines = []
+        with self.lock:
+            for metric, (help_text, buckets) in METRICS.items():
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} histogram')
+                for (name, view), histogram in sorted(self.histograms.items()):
+                    if name != metric:
+                        continue
+                    label = _escape(view)
+                    cumulative = 0
+                    for bound, count in zip(buckets + ('+Inf',), histogram.counts):
+                        cumulative += count
+                        lines.append(f'{metric}_bucket{{view="{label}",le="{bound}"}} {cumulative}')
+                    lines.append(f'{metric}_sum{{view="{label}"}} {histogram.sum}')
+                    lines.append(f'{metric}_count{{view="{label}"}} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = MetricsRegistry()
+
+# Per-request accumulators, set by RequestMetricsMiddleware. Several threads
+# may add to one request's stats at once (batch pool workers), hence the lock.
+current_request_stats = ContextVar('current_request_stats', default=None)
+_stats_lock = threading.Lock()
+
+
+# Every connection, in every thread, carries ONE permanent execute wrapper that
+# adds its queries to whichever request is current in the calling context.
+# Threads that work for a request (sync_to_async, the batch pool, the group
+# commit writer) run in a copy of its context, so their queries count too —
+# even though each of those threads has its own connection object.
+def measure_query(execute, sql, params, many, context):
+    stats = current_request_stats.get()
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if stats is not None:
+            elapsed = time.perf_counter() - start
+            with _stats_lock:
+                stats['queries'] += 1
+                stats['db_seconds'] += elapsed
+
+
+def instrument(connection):
+    if measure_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(measure_query)
+
+
+@receiver(connection_created)
+def instrument_new_connection(sender, connection, **kwargs):
+    instrument(connection)
+
+
+@contextmanager
+def timed(stat):
+    """Add the block's duration to the current request's `stat` (if measured)."""
+    stats = current_request_stats.get()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if stats is not None:
+            elapsed = time.perf_counter() - start
+            with _stats_lock:
+                stats[stat] += elapsed
+
+
+def metrics_view(request):
+    """GET /metrics — Prometheus text exposition format."""
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
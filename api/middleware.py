@@ -0,0 +1,313 @@
+import asyncio
+import hashlib
+import logging
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse, JsonResponse
+
+from .db_routers import replica_reads_allowed
+from .metrics import current_request_stats, instrument, registry
+
+logger = logging.getLogger(__name__)
+
+# ------------------------------------------------------------------------------
+# api/middleware.py — project middleware for the API
+# ------------------------------------------------------------------------------
+# Every middleware here is sync AND async capable (like Django's own): under
+# ASGI the chain stays async, so the `async def` views in api/async_views.py
+# don't get adapted back into a thread per request.
+
+
+class HybridMiddleware:
+    """Base class: __call__ under WSGI, __acall__ when the next layer is async."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    async def __acall__(self, request):
+        raise NotImplementedError
+
+
+##########################################################
+# 📌 READ-YOUR-WRITES — stick to the primary after a write
+##########################################################
+# After a successful write, the response carries
+#   Set-Cookie: read_primary_until=<unix time>   and
+#   X-Read-Primary-Until: <unix time>
+# Until that time, the client's reads go to the primary database. Clients that
+# don't keep cookies can echo the header back as `X-Read-Primary-Until`.
+# See ReplicaRouter in api/db_routers.py.
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STICKY_COOKIE = 'read_primary_until'
+STICKY_HEADER = 'X-Read-Primary-Until'
+
+
+class PrimaryStickinessMiddleware(HybridMiddleware):
+
+    def handle(self, request):
+        token = replica_reads_allowed.set(self.allows_replica(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_reads_allowed.reset(token)
+        return self.mark_sticky(request, response)
+
+    async def __acall__(self, request):
+        token = replica_reads_allowed.set(self.allows_replica(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            replica_reads_allowed.reset(token)
+        return self.mark_sticky(request, response)
+
+    def allows_replica(self, request):
+        return request.method in SAFE_METHODS and not self.is_sticky(request)
+
+    def mark_sticky(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            window = getattr(settings, 'READ_YOUR_WRITES_SECONDS', 5)
+            until = str(int(time.time() + window))
+            response.set_cookie(STICKY_COOKIE, until, max_age=window, samesite='Lax')
+            response[STICKY_HEADER] = until
+        return response
+
+    def is_sticky(self, request):
+        value = request.headers.get(STICKY_HEADER) or request.COOKIES.get(STICKY_COOKIE)
+        try:
+            return float(value) > time.time()
+        except (TypeError, ValueError):
+            return False
+
+
+##########################################################
+# 📌 REQUEST METRICS + QUERY BUDGETS
+##########################################################
+# For every request, per resolved view name (e.g. "employee-list" or
+# "api.views.BlogsView"):
+#   - total latency, SQL query count, SQL time and serializer time are
+#     recorded into fixed-bucket histograms, served at GET /metrics
+#     (see api/metrics.py),
+#   - the query count is checked against a budget:
+#
+#       QUERY_BUDGETS = {'default': 20, 'api.views.BlogsView': 6}
+#       QUERY_BUDGET_ACTION = 'log'     # or 'raise' (use it in tests / CI)
+#
+# A budget catches N+1 regressions: a list page that suddenly issues one
+# query per row blows straight through it.
+#
+# Real-life analogy:
+# - A spending limit on a company card: every purchase is logged, and
+#   going over the limit gets flagged (or declined).
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class RequestMetricsMiddleware(HybridMiddleware):
+
+    def handle(self, request):
+        with self.measured(request):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        # Async views query from sync_to_async threads, which inherit this
+        # context: measure_query (api/metrics.py) adds their queries here too.
+        with self.measured(request):
+            return await self.get_response(request)
+
+    @contextmanager
+    def measured(self, request):
+        stats = {'queries': 0, 'db_seconds': 0.0, 'serializer_seconds': 0.0}
+        token = current_request_stats.set(stats)
+        start = time.perf_counter()
+        for connection in connections.all(initialized_only=True):
+            instrument(connection)  # opened before api.metrics was loaded
+        try:
+            yield
+        finally:
+            current_request_stats.reset(token)
+        self.record(request, stats, time.perf_counter() - start)
+
+    def record(self, request, stats, duration):
+        view = self.view_name(request)
+        registry.observe('api_request_duration_seconds', view, duration)
+        registry.observe('api_request_queries', view, stats['queries'])
+        registry.observe('api_request_db_seconds', view, stats['db_seconds'])
+        registry.observe('api_request_serializer_seconds', view, stats['serializer_seconds'])
+        self.check_budget(request, view, stats['queries'])
+
+    def view_name(self, request):
+        match = getattr(request, 'resolver_match', None)
+        return match.view_name if match is not None else '<unresolved>'
+
+    def check_budget(self, request, view, queries):
+        budgets = getattr(settings, 'QUERY_BUDGETS', {})
+        budget = budgets.get(view, budgets.get('default'))
+        if budget is None or queries <= budget:
+            return
+        message = f'{request.method} {request.path} ({view}) ran {queries} queries, budget is {budget}'
+        if getattr(settings, 'QUERY_BUDGET_ACTION', 'log') == 'raise':
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+##########################################################
+# 🔁 IDEMPOTENCY KEYS — retries don't write twice
+##########################################################
+# Mobile clients retry POSTs on timeouts; without this every retry runs the
+# full validate-and-INSERT path again and leaves a duplicate row behind.
+#
+# A client sends a unique `Idempotency-Key: <uuid>` header with a write
+# (methods in IDEMPOTENCY['METHODS']). The first response (anything but a
+# 5xx) is stored in the cache for IDEMPOTENCY['TTL'] seconds, keyed by
+# key + user + method + path + a hash of the body. A retry is answered from
+# that store — no serializer, no database — with `Idempotent-Replayed: true`.
+#
+# A duplicate that arrives while the first request is still running waits
+# for it (up to WAIT_SECONDS) instead of racing it, then gets its response;
+# if the first one is still busy after that, the duplicate gets 409 Conflict.
+# The in-flight marker is a cache.add() lock, so this works across worker
+# processes that share a cache (not with the per-process LocMemCache).
+#
+# Real-life analogy:
+# - A cloakroom ticket: show the same ticket twice and you get the same coat
+#   back, not a second coat.
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+
+class IdempotencyMiddleware(HybridMiddleware):
+    """Needs request.user, so it goes after AuthenticationMiddleware."""
+    poll_interval = 0.02  # seconds between checks while waiting on an in-flight duplicate
+
+    def handle(self, request):
+        key = self.idempotency_key(request)
+        if key is None:
+            return self.get_response(request)
+        if len(key) > 255:
+            return self.key_too_long()
+
+        options = self.options()
+        store_key = self.store_key(request, key, getattr(request, 'user', None))
+        lock_key = f'{store_key}:lock'
+        deadline = time.monotonic() + options.get('WAIT_SECONDS', 10)
+        while True:
+            stored = cache.get(store_key)
+            if stored is not None:
+                return self.replay(stored)
+            if cache.add(lock_key, 1, timeout=options.get('LOCK_SECONDS', 30)):
+                break  # we run it; duplicates now wait for us
+            if time.monotonic() >= deadline:
+                return self.in_progress()
+            time.sleep(self.poll_interval)
+
+        try:
+            response = self.get_response(request)
+            if self.storable(response):
+                cache.set(store_key, self.stored(response), timeout=options.get('TTL', 24 * 60 * 60))
+        finally:
+            cache.delete(lock_key)  # 5xx: not stored, so a retry runs again
+        return response
+
+    async def __acall__(self, request):
+        # Same steps as handle(), with the async cache API and no blocked thread while waiting.
+        key = self.idempotency_key(request)
+        if key is None:
+            return await self.get_response(request)
+        if len(key) > 255:
+            return self.key_too_long()
+
+        options = self.options()
+        user = await request.auser() if hasattr(request, 'auser') else None
+        store_key = self.store_key(request, key, user)
+        lock_key = f'{store_key}:lock'
+        deadline = time.monotonic() + options.get('WAIT_SECONDS', 10)
+        while True:
+            stored = await cache.aget(store_key)
+            if stored is not None:
+                return self.replay(stored)
+            if await cache.aadd(lock_key, 1, timeout=options.get('LOCK_SECONDS', 30)):
+                break
+            if time.monotonic() >= deadline:
+                return self.in_progress()
+            await asyncio.sleep(self.poll_interval)
+
+        try:
+            response = await self.get_response(request)
+            if self.storable(response):
+                await cache.aset(store_key, self.stored(response), timeout=options.get('TTL', 24 * 60 * 60))
+        finally:
+            await cache.adelete(lock_key)
+        return response
+
+    def options(self):
+        return getattr(settings, 'IDEMPOTENCY', {})
+
+    def idempotency_key(self, request):
+        """The request's key, or None when it doesn't take part."""
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if not key or request.method not in self.options().get('METHODS', ('POST', 'PUT', 'PATCH')):
+            return None
+        return key
+
+    def key_too_long(self):
+        return JsonResponse({'detail': f'{IDEMPOTENCY_HEADER} is too long.'}, status=400)
+
+    def in_progress(self):
+        response = JsonResponse(
+            {'detail': 'A request with this Idempotency-Key is still in progress.'}, status=409,
+        )
+        response['Retry-After'] = '1'
+        return response
+
+    def storable(self, response):
+        return response.status_code < 500 and not response.streaming
+
+    def stored(self, response):
+        return {
+            'status': response.status_code,
+            'headers': dict(response.items()),
+            'content': response.content,
+        }
+
+    def store_key(self, request, key, user):
+        if user is not None and user.is_authenticated:
+            scope = f'user:{user.pk}'
+        else:
+            # e.g. HTTP Basic credentials, checked later by DRF
+            scope = 'auth:' + hashlib.sha256(
+                request.headers.get('Authorization', '').encode()
+            ).hexdigest()
+        raw = '|'.join([
+            scope, request.method, request.get_full_path(), key,
+            hashlib.sha256(request.body).hexdigest(),
+        ])
+        return f'api:idem:{hashlib.sha256(raw.encode()).hexdigest()}'
+
+    def replay(self, stored):
+        response = HttpResponse(stored['content'], status=stored['status'])
+        for header, value in stored['headers'].items():
+            response[header] = value
+        response[REPLAYED_HEADER] = 'true'
+        return response
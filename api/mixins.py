@@ -0,0 +1,692 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db import router, transaction
+from django.db.models import F, Prefetch
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response, parse_etags, quote_etag
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import relations, serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from .group_commit import get_write_coordinator
+from .renderers import CSVRenderer, NDJSONRenderer
+from .serializers import CompiledReadSerializer, LatestListSerializer, compile_serializer
+
+# ------------------------------------------------------------------------------
+# api/mixins.py — reusable behaviour for the views in api/views.py
+# ------------------------------------------------------------------------------
+# Each mixin adds ONE capability and is combined with the DRF generics/viewsets
+# the same way DRF's own mixins are (see section 3️⃣ in api/views.py).
+# ------------------------------------------------------------------------------
+
+
+##########################################################
+# 🔍 QUERYSET OPTIMIZER — automatic select/prefetch planning
+##########################################################
+# The problem (the "N+1 queries" problem):
+# - BlogSerializer nests CommentSerializer(many=True) through `comments`.
+# - With a bare Blog.objects.all(), DRF runs 1 query for the blogs and then
+#   1 more query PER BLOG to fetch its comments.
+#
+# The fix:
+# - Forward relations (ForeignKey / OneToOne) -> select_related (one JOIN)
+# - Reverse / many-to-many relations          -> prefetch_related (one extra
+#   query for the whole page, no matter how many rows it has)
+#
+# Real-life analogy:
+# - Instead of walking to the archive once per blog post to fetch its
+#   comments, you bring back every comment for the page in one trip.
+
+def _nested_serializer(field):
+    """Return the ModelSerializer behind `field`, if it is a nested one."""
+    if isinstance(field, serializers.ListSerializer):
+        field = field.child
+    if isinstance(field, serializers.ModelSerializer):
+        return field
+    return None
+
+
+def plan_queryset(serializer, exclude=None):
+    """
+    Walk the serializer fields and work out which relations it will touch.
+
+    Returns `(select, prefetch)`: lists of lookups for `select_related()`
+    and lookups/Prefetch objects for `prefetch_related()`.
+    `exclude` is the name of the relation pointing back at the parent row,
+    which Django already caches while prefetching.
+    """
+    model = serializer.Meta.model
+    select, prefetch = [], []
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+        name = field.source.split('.')[0]
+        if name == exclude:
+            continue
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue  # plain method / property — nothing to join
+        if not model_field.is_relation:
+            continue
+
+        nested = _nested_serializer(field)
+
+        if model_field.many_to_one or model_field.one_to_one:
+            select.append(name)
+            if nested is not None:
+                sub_select, sub_prefetch = plan_queryset(nested)
+                select.extend(f'{name}__{lookup}' for lookup in sub_select)
+                prefetch.extend(_prefixed(name, lookup) for lookup in sub_prefetch)
+            continue
+
+        # one_to_many (reverse FK) or many_to_many
+        if nested is None:
+            prefetch.append(name)
+            continue
+        back_link = model_field.field.name if model_field.one_to_many else None
+        sub_select, sub_prefetch = plan_queryset(nested, exclude=back_link)
+        queryset = model_field.related_model._default_manager.all()
+        if sub_select:
+            queryset = queryset.select_related(*sub_select)
+        if sub_prefetch:
+            queryset = queryset.prefetch_related(*sub_prefetch)
+        if isinstance(field, LatestListSerializer):
+            # sliced prefetch = one ROW_NUMBER() window query for all parents
+            queryset = queryset.order_by(*field.ordering)[:field.limit]
+            prefetch.append(Prefetch(name, queryset=queryset, to_attr=field.prefetch_to_attr))
+            continue
+        prefetch.append(Prefetch(name, queryset=queryset))
+
+    return select, prefetch
+
+
+def plan_annotations(serializer):
+    """The serializer's `Meta.annotations` whose fields it still has."""
+    annotations = getattr(serializer.Meta, 'annotations', {})
+    return {name: expression for name, expression in annotations.items() if name in serializer.fields}
+
+
+def _prefixed(prefix, lookup):
+    if isinstance(lookup, Prefetch):
+        return Prefetch(
+            f'{prefix}__{lookup.prefetch_through}', queryset=lookup.queryset, to_attr=lookup.to_attr
+        )
+    return f'{prefix}__{lookup}'
+
+
+class QuerysetOptimizerMixin:
+    """
+    Apply select_related / prefetch_related based on the view's serializer.
+
+    Usage:
+        class BlogsView(QuerysetOptimizerMixin, generics.ListCreateAPIView):
+            queryset = Blog.objects.all()
+            serializer_class = BlogSerializer
+
+    Works for any GenericAPIView: list, retrieve, update and destroy all go
+    through get_queryset(), so they all get the optimized query.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        serializer = self.get_serializer()
+        select, prefetch = plan_queryset(serializer)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        annotations = plan_annotations(serializer)
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        return queryset
+
+
+##########################################################
+# ✂️ SPARSE FIELDSETS — ?fields= / ?omit= / ?expand=
+##########################################################
+# The serializer drops unwanted fields itself (SparseFieldsetMixin in
+# api/serializers.py). This view mixin makes the SQL follow suit: with
+# ?fields= or ?omit= the SELECT lists only the columns the trimmed serializer
+# reads (`only()` — the same thing as `defer()`-ing all the others).
+# A collapsed relation (e.g. a blog's `comments`) also drops out of the
+# prefetch plan, because QuerysetOptimizerMixin plans from the same serializer.
+#
+# Real-life analogy:
+# - Asking the librarian for just the book titles instead of the whole books.
+
+def plan_columns(serializer):
+    """
+    Return the model fields `serializer` reads, for `only()`, or None when it
+    can't tell (e.g. a method field that may read any attribute).
+    """
+    model = serializer.Meta.model
+    columns = [model._meta.pk.name]
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if isinstance(field, relations.HyperlinkedIdentityField):
+            columns.append(field.lookup_field)
+            continue
+        if field.source == '*':
+            return None
+        name = field.source.split('.')[0]
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            if hasattr(model, name):
+                return None  # a property or method may read any column
+            continue  # only set by the query itself (annotate / extra select)
+        if model_field.concrete:
+            columns.append(model_field.name)
+    return columns
+
+
+class SparseFieldsMixin:
+    """
+    ?fields= / ?omit= / ?expand= on GET. The serializer must use
+    SparseFieldsetMixin.
+
+    expandable_fields   left out unless the client sends ?expand=<name>
+    sparse_load_fields  columns read outside the serializer (e.g. keyset
+                        cursor fields), always loaded
+    """
+    expandable_fields = ()
+    sparse_load_fields = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        if self.request.method in ('GET', 'HEAD') and ('fields' in params or 'omit' in params):
+            columns = plan_columns(self.get_serializer())
+            if columns is not None:
+                queryset = queryset.only(*columns, *self.sparse_load_fields)
+        return queryset
+
+
+##########################################################
+# 🎯 MULTI-GET — ?ids=1,2,3 on list endpoints
+##########################################################
+# Hydrating N known items used to take N detail requests. Instead:
+#   GET /blogs/?ids=7,3,9            -> {"results": [blog 7, blog 3], "missing": [9]}
+#   GET /employees/?emp_id__in=E1,E2 (any param listed in `multi_get_params`)
+# One `WHERE pk IN (...)` query (plus the usual prefetches — a blog batch's
+# nested comments come in ONE extra query), results in the requested order,
+# no pagination, at most `multi_get_max` values. Items come back whole, like
+# on detail pages: `expandable_fields` are included (?fields= / ?omit= still
+# trim). The IN filter is applied in filter_queryset(), so ETags and
+# exports only look at the requested rows too.
+
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+
+class MultiGetMixin:
+    """
+    multi_get_params  query param -> model field it matches (unique fields only)
+    multi_get_max     most values per request
+    """
+    multi_get_params = {'ids': 'pk'}
+    multi_get_max = 100
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.multi_get = self.get_multi_get(request)
+        if self.multi_get is not None:
+            self.expandable_fields = ()
+
+    def get_multi_get(self, request):
+        """`(field, values)` from the query string, or None for a normal list."""
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        given = [param for param in self.multi_get_params if param in request.query_params]
+        if not given:
+            return None
+        if len(given) > 1:
+            raise serializers.ValidationError({given[1]: [f'Use only one of {", ".join(given)}.']})
+        param = given[0]
+        field = self.multi_get_params[param]
+        opts = self.queryset.model._meta
+        model_field = opts.pk if field == 'pk' else opts.get_field(field)
+        raw = [
+            value.strip() for item in request.query_params.getlist(param)
+            for value in item.split(',') if value.strip()
+        ]
+        try:
+            values = list(dict.fromkeys(model_field.to_python(value) for value in raw))
+        except DjangoValidationError:
+            raise serializers.ValidationError({param: ['Invalid value.']})
+        # IN () has no overflow handling: a huge int must not reach the driver
+        if any(isinstance(value, int) and not INT64_MIN <= value <= INT64_MAX for value in values):
+            raise serializers.ValidationError({param: ['Invalid value.']})
+        if len(values) > self.multi_get_max:
+            raise serializers.ValidationError({param: [f'At most {self.multi_get_max} values per request.']})
+        return field, values
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if getattr(self, 'multi_get', None) is not None:
+            field, values = self.multi_get
+            queryset = queryset.filter(**{f'{field}__in': values})
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        if self.multi_get is None:
+            return super().list(request, *args, **kwargs)
+        field, values = self.multi_get
+        queryset = self.filter_queryset(self.get_queryset())
+        key = 'pk'
+        if field != 'pk':
+            # annotated, so it is read even when ?fields= deferred the column
+            queryset, key = queryset.annotate(multi_get_key=F(field)), 'multi_get_key'
+        found = {getattr(obj, key): obj for obj in queryset}
+        serializer = self.get_serializer([found[value] for value in values if value in found], many=True)
+        return Response({
+            'results': serializer.data,
+            'missing': [value for value in values if value not in found],
+        })
+
+
+##########################################################
+# 🏷 CONDITIONAL REQUESTS — ETag / Last-Modified / If-Match
+##########################################################
+# Dashboards poll the same URLs over and over. With an ETag the client says
+# "I already have version X" (If-None-Match) and the server answers a bodyless
+# 304 Not Modified when nothing changed.
+#
+# The ETag is built from the rows the response was made of — each row's
+# (pk, updated_at), after pagination — plus the path + query params, the page
+# links/count, and (on views with CachedResponseMixin) the cache generations,
+# which move whenever a nested relation such as a blog's `comments` changes.
+# So it costs O(page), never a query over the whole table. It is computed
+# once the page is loaded and BEFORE it is serialized: a matching
+# If-None-Match skips serialization entirely. On cached views the ETag is
+# stored with the cached response: a HIT (or a 304 for one) runs no SQL at
+# all. List CachedResponseMixin BEFORE this mixin so it caches the response
+# with its validators (it turns the early 304 off: a MISS must build a body).
+#
+# Detail ETags look like "<row version>-<representation>". The row version is
+# the row's pk + updated_at only, so writes can check it: PUT/PATCH with
+# `If-Match: "<etag>"` (from ANY representation of the row — ?fields=,
+# ?expand=, new comments don't matter) gets 412 Precondition Failed if
+# someone else changed the row in between (optimistic concurrency — no locks
+# held while the user is editing). The check locks the row and runs in the
+# same transaction as the save, so no write can slip in between.
+#
+# Last-Modified is only sent for single objects with no nested relations:
+# deleting a nested row never moves the parent's updated_at forward.
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = 'The object was changed since you read it; fetch it again.'
+    default_code = 'precondition_failed'
+
+
+def row_version(obj):
+    """Opaque version of one row: changes whenever the row is saved."""
+    return hashlib.md5(f'{obj.pk}:{obj.updated_at.isoformat()}'.encode()).hexdigest()[:16]
+
+
+class NotModifiedSerializer:
+    """
+    Stand-in for the serializer when the client's copy is current: the 304
+    built from the response drops the body anyway, so nothing is serialized.
+    """
+
+    def __init__(self, many=False):
+        self.data = [] if many else {}
+
+
+class ConditionalGetMixin:
+    """
+    Answer GET/HEAD with 304 and honour If-Match / If-Unmodified-Since on PUT/PATCH.
+
+    Models need an `updated_at = DateTimeField(auto_now=True)`.
+    """
+    etag_related = ()  # reverse relations nested in the representation (no Last-Modified)
+
+    etag_short_circuit = True  # answer a matching If-None-Match before serializing
+
+    def list(self, request, *args, **kwargs):
+        self.etag_single = False
+        return self.with_validators(super().list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        self.etag_single = True
+        return self.with_validators(super().retrieve(request, *args, **kwargs))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        names, deferred = queryset.query.deferred_loading
+        if names and not deferred:  # only() from ?fields= — the ETag still needs updated_at
+            queryset = queryset.only(*names, 'updated_at')
+        return queryset
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        self.etag_paginated = page is not None
+        return page
+
+    def get_serializer(self, *args, **kwargs):
+        single = getattr(self, 'etag_single', None)
+        if not args or single is None or self.request.method not in ('GET', 'HEAD'):
+            return super().get_serializer(*args, **kwargs)
+        # The page / object is loaded but not serialized yet: that is enough
+        # for the validators, so a client whose copy is current costs no
+        # serialization at all.
+        self.etag_rows = args[0]
+        self.etag_validators = self.get_validators(single)
+        if self.etag_short_circuit and self.is_not_modified(*self.etag_validators):
+            return NotModifiedSerializer(many=kwargs.get('many', False))
+        return super().get_serializer(*args, **kwargs)
+
+    def get_validators(self, single):
+        """Return `(etag, last_modified)` for the rows in `self.etag_rows`."""
+        params = urlencode(sorted(self.request.query_params.lists()), doseq=True)
+        representation = f'{self.request.path}?{params}|{getattr(self, "cache_generations", "")}'
+        if single:
+            obj = self.etag_rows
+            variant = hashlib.md5(representation.encode()).hexdigest()[:16]
+            last_modified = None
+            if not self.etag_related:
+                last_modified = int(obj.updated_at.timestamp())
+            return quote_etag(f'{row_version(obj)}-{variant}'), last_modified
+
+        parts = [representation]
+        if getattr(self, 'etag_paginated', False):  # page links and count
+            paginator = self.paginator
+            parts += [
+                str(paginator.get_next_link()), str(paginator.get_previous_link()),
+                str(getattr(paginator, 'count', None)),
+            ]
+        # multi-get: `missing` follows from the requested ids and the rows found
+        parts += [f'{row.pk}:{row.updated_at.isoformat()}' for row in self.etag_rows]
+        return quote_etag(hashlib.md5('|'.join(parts).encode()).hexdigest()), None
+
+    def is_not_modified(self, etag, last_modified):
+        response = get_conditional_response(self.request._request, etag=etag, last_modified=last_modified)
+        return response is not None and response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def with_validators(self, response):
+        validators = getattr(self, 'etag_validators', None)
+        if response.status_code == 200 and validators is not None:
+            etag, last_modified = validators
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        # Runs for fresh AND cached responses: both carry their ETag by now.
+        if request.method in ('GET', 'HEAD') and response.status_code == 200 and response.has_header('ETag'):
+            not_modified = get_conditional_response(
+                request._request,
+                etag=response['ETag'],
+                last_modified=parse_http_date_safe(response.get('Last-Modified')),
+                response=response,
+            )
+            if not_modified is not None:
+                response = not_modified
+        return super().finalize_response(request, response, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        headers = self.request.headers
+        if 'If-Match' not in headers and 'If-Unmodified-Since' not in headers:
+            return super().perform_update(serializer)
+        model = type(serializer.instance)
+        with transaction.atomic(using=router.db_for_write(model)):
+            self.check_preconditions(serializer.instance)
+            return super().perform_update(serializer)
+
+    def check_preconditions(self, instance):
+        """Raise PreconditionFailed unless the STORED row still matches the client's copy."""
+        current = (
+            type(instance)._default_manager.select_for_update()
+            .filter(pk=instance.pk).only('pk', 'updated_at').first()
+        )
+        if current is None:
+            raise PreconditionFailed()
+        if_match = self.request.headers.get('If-Match')
+        if if_match is not None:
+            tags = parse_etags(if_match)
+            version = row_version(current)
+            if '*' not in tags and not any(tag.strip('"').split('-')[0] == version for tag in tags):
+                raise PreconditionFailed()
+            return
+        since = parse_http_date_safe(self.request.headers['If-Unmodified-Since'])
+        if since is not None and int(current.updated_at.timestamp()) > since:
+            raise PreconditionFailed()
+
+
+##########################################################
+# 📦 BULK WRITES — many rows per request
+##########################################################
+# One POST per row means thousands of HTTP round trips, serializer objects and
+# single-row INSERTs for an HR sync. These actions take a JSON LIST instead:
+#
+#   POST   /employees/bulk/              create every row
+#   POST   /employees/bulk/?upsert=true  update rows whose `upsert_field`
+#                                        (emp_id) exists, create the rest
+#   PUT    /employees/bulk/              full update, every row has an "id"
+#   PATCH  /employees/bulk/              partial update, every row has an "id"
+#   DELETE /employees/bulk/              body is a list of ids
+#
+# All rows are validated first; if ANY row is invalid nothing is written and
+# the response lists the errors per row index. Writes then happen in batches
+# (bulk_create / bulk_update) inside a single transaction.
+#
+# The serializer must use api.serializers.BulkListSerializer as its
+# `list_serializer_class`. bulk_create/bulk_update send no post_save; the
+# serializer sends one post_bulk_save (api/signals.py) per request instead.
+
+class BulkModelMixin:
+    upsert_field = None       # natural key used by ?upsert=true
+    bulk_max_rows = 5000
+
+    @action(detail=False, methods=['post', 'put', 'patch', 'delete'], url_path='bulk')
+    def bulk(self, request, *args, **kwargs):
+        rows = request.data
+        if not isinstance(rows, list):
+            return Response(
+                {'detail': 'Expected a list of items.'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(rows) > self.bulk_max_rows:
+            return Response(
+                {'detail': f'At most {self.bulk_max_rows} items per request.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if request.method == 'DELETE':
+            return self.bulk_destroy(rows)
+
+        upsert = self.upsert_field and request.query_params.get('upsert') == 'true'
+        if request.method != 'POST':
+            instances, errors = self.get_update_instances(rows)
+        elif upsert:
+            instances, errors = self.get_upsert_instances(rows)
+        else:
+            instances, errors = None, [{} for _ in rows]
+
+        serializer = self.get_serializer(
+            instance=instances, data=rows, many=True, partial=request.method == 'PATCH'
+        )
+        row_errors = [] if serializer.is_valid() else serializer.errors
+        if not row_errors:
+            row_errors = [{} for _ in rows]
+        elif isinstance(row_errors, dict):
+            # Newer DRF versions report list errors as {index: errors}
+            if any(not isinstance(key, int) for key in row_errors):
+                return Response(row_errors, status=status.HTTP_400_BAD_REQUEST)
+            row_errors = [row_errors.get(index, {}) for index in range(len(rows))]
+        errors = [{**lookup, **row} for lookup, row in zip(errors, row_errors)]
+        if any(errors):
+            return Response(
+                [{'index': index, 'errors': error} for index, error in enumerate(errors) if error],
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            serializer.save()
+        code = status.HTTP_201_CREATED if instances is None else status.HTTP_200_OK
+        return Response(serializer.data, status=code)
+
+    def get_update_instances(self, rows):
+        """Fetch every row's object in ONE query; missing ids become row errors."""
+        ids = [row.get('id') if isinstance(row, dict) else None for row in rows]
+        # raw JSON: a list or string id must not reach in_bulk() (TypeError / ValueError)
+        valid = [isinstance(pk, int) and not isinstance(pk, bool) for pk in ids]
+        found = self.get_queryset().in_bulk([pk for pk, ok in zip(ids, valid) if ok])
+        instances, errors, seen = [], [], set()
+        for pk, ok in zip(ids, valid):
+            instance = found.get(pk) if ok else None
+            instances.append(instance)
+            if pk is None:
+                errors.append({'id': ['This field is required.']})
+            elif not ok:
+                errors.append({'id': ['A valid integer is required.']})
+            elif instance is None:
+                errors.append({'id': [f'Object with id={pk} does not exist.']})
+            elif pk in seen:  # both rows would be applied and the last would win
+                errors.append({'id': [f'Duplicate id {pk} in this request.']})
+            else:
+                errors.append({})
+            if ok:
+                seen.add(pk)
+        return instances, errors
+
+    def get_upsert_instances(self, rows):
+        field = self.upsert_field
+        model_field = self.queryset.model._meta.get_field(field)
+        keys, valid = [], []
+        for row in rows:
+            key = row.get(field) if isinstance(row, dict) else None
+            # raw JSON again: a list or object key is unhashable, so check it here
+            try:
+                if isinstance(key, (bool, list, dict)):
+                    raise DjangoValidationError('invalid')
+                keys.append(None if key is None else model_field.to_python(key))
+                valid.append(True)
+            except DjangoValidationError:
+                keys.append(None)
+                valid.append(False)
+        existing = {
+            getattr(obj, field): obj
+            for obj in self.get_queryset().filter(**{f'{field}__in': [k for k in keys if k]})
+        }
+        instances, errors, seen = [], [], set()
+        for key, ok in zip(keys, valid):
+            instances.append(existing.get(key))
+            if not ok:
+                errors.append({field: ['Invalid value.']})
+            elif key is not None and key in seen:
+                errors.append({field: [f'Duplicate {field} {key!r} in this request.']})
+            else:
+                errors.append({})
+            seen.add(key)
+        return instances, errors
+
+    def bulk_destroy(self, ids):
+        if not all(isinstance(pk, int) and not isinstance(pk, bool) for pk in ids):
+            return Response(
+                {'detail': 'Expected a list of integer ids.'}, status=status.HTTP_400_BAD_REQUEST
+            )
+        queryset = self.get_queryset()
+        found = set(queryset.filter(pk__in=ids).values_list('pk', flat=True))
+        with transaction.atomic():
+            queryset.filter(pk__in=found).delete()
+        return Response({
+            'deleted': len(found),
+            'missing': [pk for pk in ids if pk not in found],
+        })
+
+
+##########################################################
+# 🚚 STREAMING EXPORT — full dumps with flat memory
+##########################################################
+# Paging through a whole table takes thousands of requests, and turning
+# pagination off builds the ENTIRE list in memory via `serializer.data`.
+#
+# export() instead streams rows straight from a server-side iterator:
+#   queryset.iterator(chunk_size=...)  -> fetch rows in chunks
+#   serializer.to_representation(obj)  -> serialize ONE row at a time
+#   StreamingHttpResponse              -> send each row as soon as it's ready
+# Memory stays flat no matter how big the table is.
+#
+# Format: ?format=ndjson (default) or ?format=csv, or the matching Accept header.
+# The view's normal filters (e.g. ?designation=Manager) still apply.
+
+class ExportMixin:
+    export_renderer_classes = [NDJSONRenderer, CSVRenderer]
+    export_chunk_size = 2000
+
+    def get_export_filename(self):
+        return self.get_queryset().model._meta.verbose_name_plural.replace(' ', '_')
+
+    def export(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset()).order_by('pk')
+        serializer = self.get_serializer()
+        to_representation = serializer.to_representation
+        if isinstance(self, FastReadMixin):
+            to_representation = compile_serializer(serializer)
+        rows = (
+            to_representation(obj)
+            for obj in queryset.iterator(chunk_size=self.export_chunk_size)
+        )
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(rows), content_type=f'{renderer.media_type}; charset=utf-8'
+        )
+        filename = f'{self.get_export_filename()}.{renderer.format}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+##########################################################
+# ⚡ FAST READS — compiled serializers for GET responses
+##########################################################
+# Opt-in: add FastReadMixin to a view and its GET responses are produced by a
+# function compiled once per request from the serializer's fields (see compile_serializer
+# in api/serializers.py) instead of DRF's per-field dispatch. The JSON is the
+# same; POST/PUT/PATCH still get the real serializer and its validation.
+# ExportMixin uses the compiled function too when both are on a view.
+
+class FastReadMixin:
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method not in ('GET', 'HEAD') or not args:
+            return super().get_serializer(*args, **kwargs)
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        return CompiledReadSerializer(
+            args[0], compile_serializer(serializer), many=kwargs.get('many', False)
+        )
+
+
+##########################################################
+# 🛗 GROUP COMMIT — share one COMMIT between concurrent writes
+##########################################################
+# Sends create/update/delete through the WriteCoordinator (api/group_commit.py)
+# so concurrent small writes are committed together by one writer thread.
+# Unless settings.WRITE_COORDINATOR['ENABLED'] is set (off by default) the
+# writes run as usual.
+# List it BEFORE ConditionalGetMixin: then the whole perform_update — the
+# If-Match check and the save — is one job in the writer's transaction.
+
+class GroupCommitMixin:
+
+    def perform_create(self, serializer):
+        self.group_commit(super().perform_create, serializer)
+
+    def perform_update(self, serializer):
+        self.group_commit(super().perform_update, serializer)
+
+    def perform_destroy(self, instance):
+        self.group_commit(super().perform_destroy, instance)
+
+    def group_commit(self, func, *args):
+        coordinator = get_write_coordinator()
+        if coordinator is None:
+            return func(*args)
+        return coordinator.submit(func, *args)
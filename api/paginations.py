@@ -1,7 +1,21 @@
 #
 
-from rest_framework.pagination import PageNumberPagination
+import base64
+import binascii
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination, LimitOffsetPagination, PageNumberPagination, _positive_int,
+)
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class CustomPagination(PageNumberPagination): #extend the methods
@@ -16,3 +30,331 @@ class CustomPagination(PageNumberPagination): #extend the methods
             'count': self.page.paginator.count
         })
 
+
+# ============================================================
+# 🔢 Counting helpers
+# ============================================================
+# COUNT(*) reads every matching row, so it is the slowest part of a page on
+# a big table. These helpers let paginators avoid running it on every request.
+
+COUNT_CACHE_TIMEOUT = 30  # seconds a cached count may be reused
+
+
+def cached_count(queryset, timeout=COUNT_CACHE_TIMEOUT):
+    """COUNT(*) for `queryset`, cached per SQL statement for `timeout` seconds."""
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:  # e.g. queryset.none()
+        return 0
+    digest = hashlib.md5(f'{queryset.db}:{sql}:{params!r}'.encode()).hexdigest()
+    key = f'api:count:{digest}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+def approximate_count(queryset, timeout=COUNT_CACHE_TIMEOUT):
+    """
+    A cheap, possibly slightly stale, row count.
+
+    - PostgreSQL + unfiltered queryset: the planner's estimate (pg_class.reltuples).
+    - Anything else: the exact count, cached for `timeout` seconds.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        if row and row[0] >= 0:
+            return row[0]
+    return cached_count(queryset, timeout)
+
+
+# ============================================================
+# 🔑 Keyset ("seek") Pagination
+# ============================================================
+# PageNumberPagination does: SELECT COUNT(*) ... then OFFSET (page-1)*size.
+# Both read every row BEFORE the page, so page 10,000 is far slower than page 1.
+#
+# Keyset pagination remembers the LAST row it returned and asks for rows that
+# come after it:
+#   WHERE (designation, id) > ('Manager', 42) ORDER BY designation, id LIMIT 20
+# With an index on the ordering columns, every page costs the same.
+#
+# Real-life analogy:
+# - A bookmark in a book: you open straight at the bookmark instead of
+#   counting pages from the cover each time.
+#
+# Query params:
+#   ?page_size=50             rows per page (capped at max_page_size)
+#   ?ordering=designation     one of the keys in `orderings`
+#   ?cursor=<opaque>          taken from the `next` / `previous` links
+#   ?count=approx             opt-in approximate total (no COUNT(*) by default)
+class KeysetPagination(BasePagination):
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering_query_param = 'ordering'
+    count_query_param = 'count'
+
+    # Every ordering must end with a unique column so positions are unambiguous.
+    orderings = {
+        'id': ('id',),
+        'designation': ('designation', 'id'),
+    }
+    default_ordering = 'id'
+
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.ordering_key = self.get_ordering_key(request)
+        fields = self.orderings[self.ordering_key]
+        values, self.reverse = self.decode_cursor(request, queryset.model)
+        self.has_cursor = values is not None
+
+        self.count = None
+        if request.query_params.get(self.count_query_param) == 'approx':
+            self.count = approximate_count(queryset.order_by())
+
+        if self.reverse:
+            queryset = queryset.order_by(*[f'-{field}' for field in fields])
+        else:
+            queryset = queryset.order_by(*fields)
+        if self.has_cursor:
+            queryset = queryset.filter(self.seek_filter(fields, values, self.reverse))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+        self.page = rows
+        self.fields = fields
+        return rows
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count is not None:
+            payload['count'] = self.count
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+    # ------------------------------------------------------------
+    # Request parsing
+    # ------------------------------------------------------------
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size,
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering_key(self, request):
+        key = request.query_params.get(self.ordering_query_param, self.default_ordering)
+        return key if key in self.orderings else self.default_ordering
+
+    def seek_filter(self, fields, values, reverse=False):
+        """
+        Row-value comparison spelled out with Q objects, e.g. for (a, b) > (x, y):
+            a > x  OR  (a = x AND b > y)
+        """
+        lookup = 'lt' if reverse else 'gt'
+        condition = Q()
+        for i, field in enumerate(fields):
+            equal = {fields[j]: values[j] for j in range(i)}
+            condition |= Q(**equal, **{f'{field}__{lookup}': values[i]})
+        return condition
+
+    # ------------------------------------------------------------
+    # Cursors: base64(JSON) so clients treat them as opaque tokens
+    # ------------------------------------------------------------
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        fields = self.orderings[self.ordering_key]
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            values, reverse = data['v'], bool(data['r'])
+            if data['o'] != self.ordering_key or len(values) != len(fields):
+                raise ValueError
+            # Cursors come from the client: a forged value of the wrong type
+            # must not reach the WHERE clause (ValueError -> 500 there).
+            values = [self.clean_cursor_value(model, field, value) for field, value in zip(fields, values)]
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def clean_cursor_value(self, model, field, value):
+        if value is None or isinstance(value, (bool, list, dict)):
+            raise ValueError
+        model_field = model._meta.get_field(field)
+        value = model_field.to_python(value)
+        model_field.get_prep_value(value)
+        return value
+
+    def encode_cursor(self, row, reverse):
+        values = [getattr(row, field) for field in self.fields]
+        data = json.dumps({'o': self.ordering_key, 'v': values, 'r': int(reverse)})
+        encoded = base64.urlsafe_b64encode(data.encode()).decode('ascii')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        # Going forwards there is a next page only if we over-fetched a row;
+        # going backwards we came from the page after this one.
+        if not self.page or (not self.reverse and not self.has_more):
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.page:
+            if self.has_cursor and not self.reverse:
+                return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+            return None
+        if self.reverse and not self.has_more:
+            return None
+        if not self.reverse and not self.has_cursor:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class CommentThreadPagination(KeysetPagination):
+    """
+    Keyset pages of ONE blog's comments (/blogs/<pk>/comments/), oldest first.
+    With `blog_id = ?` in the WHERE clause, ordering by id walks the
+    (blog, id) index: page 1000 costs the same as page 1.
+    """
+    orderings = {'id': ('id',)}
+
+
+# ============================================================
+# 🛡 Deep-offset-safe Limit/Offset Pagination (project default)
+# ============================================================
+# Plain LimitOffsetPagination lets a client send ?offset=5000000: the database
+# walks and throws away five million rows, and COUNT(*) runs on every request.
+#
+# This keeps the same response shape ({count, next, previous, results}) but:
+# - refuses raw offsets deeper than `max_offset`,
+# - past `seek_threshold`, the next/previous links also carry ?after=<pk> or
+#   ?before=<pk>, so deep pages are fetched with WHERE pk > ... (an index seek)
+#   instead of an OFFSET scan,
+# - caches the count per filtered queryset for `count_cache_timeout` seconds.
+#
+# Seeking needs a stable key, so it is only used when the queryset is ordered
+# by primary key (unordered querysets are ordered by pk for that reason).
+class SafeLimitOffsetPagination(LimitOffsetPagination):
+    max_limit = 100
+    max_offset = 10000
+    seek_threshold = 1000
+    after_query_param = 'after'
+    before_query_param = 'before'
+    count_cache_timeout = COUNT_CACHE_TIMEOUT
+
+    offset_too_deep_message = 'Offset too deep; follow the `next` link to page further.'
+    invalid_seek_message = 'Invalid seek position.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+
+        self.seekable = self.is_seekable(queryset)
+        if self.seekable and not queryset.ordered:
+            queryset = queryset.order_by('pk')
+        self.count = cached_count(queryset.order_by(), self.count_cache_timeout)
+
+        after = self.get_seek_value(request, self.after_query_param, queryset)
+        before = self.get_seek_value(request, self.before_query_param, queryset)
+        if self.seekable and after is not None:
+            rows = list(queryset.filter(pk__gt=after)[:self.limit])
+        elif self.seekable and before is not None:
+            rows = list(queryset.filter(pk__lt=before).order_by('-pk')[:self.limit])
+            rows.reverse()
+        else:
+            if self.offset > self.max_offset:
+                raise NotFound(self.offset_too_deep_message)
+            rows = list(queryset[self.offset:self.offset + self.limit])
+
+        self.page = rows
+        if self.count > self.limit and self.template is not None:
+            self.display_page_controls = True
+        return rows
+
+    def is_seekable(self, queryset):
+        if queryset.query.order_by:
+            ordering = tuple(queryset.query.order_by)
+        elif queryset.query.default_ordering:
+            ordering = tuple(queryset.model._meta.ordering)
+        else:
+            ordering = ()
+        return ordering in ((), ('pk',), (queryset.model._meta.pk.name,))
+
+    def get_seek_value(self, request, param, queryset):
+        raw = request.query_params.get(param)
+        if raw is None:
+            return None
+        try:
+            return queryset.model._meta.pk.to_python(raw)
+        except ValidationError:
+            raise NotFound(self.invalid_seek_message)
+
+    def get_next_link(self):
+        if self.offset + self.limit >= self.count or not self.page:
+            return None
+        offset = self.offset + self.limit
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        url = replace_query_param(url, self.offset_query_param, offset)
+        url = remove_query_param(url, self.before_query_param)
+        if self.seekable and offset > self.seek_threshold:
+            return replace_query_param(url, self.after_query_param, self.page[-1].pk)
+        return remove_query_param(url, self.after_query_param)
+
+    def get_previous_link(self):
+        if self.offset <= 0:
+            return None
+        offset = max(self.offset - self.limit, 0)
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        url = remove_query_param(url, self.after_query_param)
+        if self.seekable and offset > self.seek_threshold and self.page:
+            url = replace_query_param(url, self.offset_query_param, offset)
+            return replace_query_param(url, self.before_query_param, self.page[0].pk)
+        url = remove_query_param(url, self.before_query_param)
+        if offset == 0:
+            return remove_query_param(url, self.offset_query_param)
+        return replace_query_param(url, self.offset_query_param, offset)
@@ -0,0 +1,32 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.utils.mediatypes import parse_header_parameters
+
+from .renderers import FastJSONRenderer, orjson
+
+# ------------------------------------------------------------------------------
+# api/parsers.py — request body parsers
+# ------------------------------------------------------------------------------
+# A parser is the reverse of a renderer: request bytes -> Python data
+# (what you read from `request.data`).
+# ------------------------------------------------------------------------------
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser using orjson when it is installed.
+    orjson reads UTF-8 bytes directly (no text decoding step) and, like DRF's
+    STRICT_JSON mode, rejects NaN / Infinity. Other charsets use DRF's parser.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        charset = parse_header_parameters(media_type or '')[1].get('charset')
+        encoding = (charset or parser_context.get('encoding') or 'utf-8').lower()
+        if orjson is None or encoding not in ('utf-8', 'utf8') or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,149 @@
+import csv
+import decimal
+import io
+import json
+import math
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional speed-up: `pip install orjson`
+    orjson = None
+
+# ------------------------------------------------------------------------------
+# api/renderers.py — extra output formats
+# ------------------------------------------------------------------------------
+# A renderer turns Python data into response bytes. DRF picks one per request
+# from the Accept header or ?format=... (content negotiation).
+#
+# The export renderers below can also `stream()` rows one at a time, which is
+# what the /export/ endpoints use (see ExportMixin in api/mixins.py).
+# ------------------------------------------------------------------------------
+
+
+# ============================================================
+# 🚀 Fast JSON (orjson when installed, stdlib otherwise)
+# ============================================================
+# orjson is a JSON library written in Rust that encodes straight to bytes,
+# several times faster than the stdlib `json` module.
+#
+# To keep DRF's output byte-for-byte, datetimes are passed through to DRF's
+# own JSONEncoder (so UTC still ends in "Z"), as are Decimals, lazy
+# translation strings and anything else orjson doesn't know natively.
+#
+# orjson writes NaN/Infinity as `null` where DRF (allow_nan=False) raises
+# ValueError. Such a float can only hide behind a `null` in the output, so
+# the data is only searched for one when the output contains "null".
+
+def _has_non_finite(data):
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, decimal.Decimal):
+            if not value.is_finite():
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+    _default = JSONEncoder().default
+
+    def dumps(data):
+        """Compact, UTF-8 JSON as bytes."""
+        ret = orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS)
+        if b'null' in ret and _has_non_finite(data):
+            raise ValueError('Out of range float values are not JSON compliant')
+        return ret
+else:
+    def dumps(data):
+        """Compact, UTF-8 JSON as bytes."""
+        return json.dumps(
+            data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(',', ':')
+        ).encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in JSONRenderer that goes through `dumps()` above.
+    Pretty-printed output (?indent / the browsable API) and non-default
+    UNICODE_JSON / COMPACT_JSON settings use DRF's stdlib path.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact or not self.strict:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = dumps(data)
+        except (TypeError, ValueError):
+            # e.g. integers beyond 64 bits, which only the stdlib handles; NaN
+            # and Infinity end up here too, so they raise exactly like DRF
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same JavaScript-safety escaping as DRF's JSONRenderer.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline-delimited JSON: one JSON object per line.
+    Clients can process line N before line N+1 has even arrived.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return b''.join(self.stream(rows))
+
+    def stream(self, rows):
+        for row in rows:
+            yield dumps(row) + b'\n'
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Comma-separated values with a header row taken from the first row's keys.
+    Nested values (e.g. a blog's comments) are written as JSON in their cell.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        return b''.join(self.stream(rows))
+
+    def stream(self, rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        header = None
+        for row in rows:
+            if header is None:
+                header = list(row)
+                writer.writerow(header)
+            writer.writerow(self.cell(row.get(name)) for name in header)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+
+    def cell(self, value):
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, cls=JSONEncoder, ensure_ascii=False)
+        return '' if value is None else value
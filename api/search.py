@@ -0,0 +1,136 @@
+import re
+from html import escape
+
+from django.db import connections
+from django.db.models import Q
+from rest_framework import serializers
+from rest_framework.filters import BaseFilterBackend
+
+from blogs.models import Blog, Comment
+
+# ------------------------------------------------------------------------------
+# api/search.py — full-text search (?q=) backed by SQLite FTS5
+# ------------------------------------------------------------------------------
+# `?search=` style filters use `icontains`, i.e. LIKE '%word%': the database
+# reads EVERY row's text to answer it.
+#
+# FTS5 keeps an inverted index (word -> rows that contain it), like the index
+# at the back of a book. The index tables and the triggers that keep them in
+# sync on every INSERT/UPDATE/DELETE (bulk_create and QuerySet.update()
+# included) are created by blogs/migrations/0004_search_index.py;
+# `manage.py rebuild_search_index` (re)fills them in batches.
+#
+# GET /blogs/?q=django orm   -> blogs containing "django" AND "orm"
+# GET /comments/?q=serial*   -> prefix search
+# Results are ordered by relevance (BM25) and carry `search_rank` (higher is
+# better) and `search_snippet` (the best matching fragment as HTML, matches
+# wrapped in HIGHLIGHT). On databases without the FTS5 tables, ?q= falls back to
+# a plain icontains filter, without rank or snippet.
+#
+# The fragment is user text. snippet() only marks the matches with MARKERS
+# (control characters); SearchSnippetField HTML-escapes the text first and only
+# then turns the markers into HIGHLIGHT tags, so a comment like
+# `<img onerror=...>` comes back as `&lt;img onerror=...&gt;`.
+# ------------------------------------------------------------------------------
+
+HIGHLIGHT = ('<mark>', '</mark>')
+MARKERS = ('\x02', '\x03')
+SNIPPET_TOKENS = 12
+
+
+class SearchIndex:
+    def __init__(self, model, table, columns, weights):
+        self.model = model
+        self.table = table        # the FTS5 virtual table
+        self.columns = columns    # indexed model columns, in FTS5 column order
+        self.weights = weights    # BM25 weight per column
+
+
+SEARCH_INDEXES = {
+    Blog: SearchIndex(Blog, 'blogs_blog_fts', ('blog_title', 'blog_body'), (10.0, 1.0)),
+    Comment: SearchIndex(Comment, 'blogs_comment_fts', ('comment',), (1.0,)),
+}
+
+_available = {}  # database alias -> whether the FTS5 tables exist
+
+
+def fts_available(alias):
+    if alias not in _available:
+        connection = connections[alias]
+        tables = set()
+        if connection.vendor == 'sqlite':
+            tables = set(connection.introspection.table_names())
+        _available[alias] = all(index.table in tables for index in SEARCH_INDEXES.values())
+    return _available[alias]
+
+
+def to_match_expression(text):
+    """
+    Turn free text into a safe FTS5 query: every word must match, and a
+    trailing * makes it a prefix search. FTS5 operators in the input
+    (AND, NEAR, quotes, column filters...) are treated as plain words.
+    """
+    terms = []
+    for word, star in re.findall(r'(\w+)(\*?)', text):
+        terms.append(f'"{word}"{star}')
+    return ' '.join(terms)
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """`?q=` filter for models listed in SEARCH_INDEXES."""
+    search_param = 'q'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        index = SEARCH_INDEXES.get(queryset.model)
+        if not text or index is None:
+            return queryset
+        match = to_match_expression(text)
+        if not match:
+            return queryset.none()
+        if not fts_available(queryset.db):
+            return self.fallback(queryset, index, text)
+
+        table = index.table
+        opts = queryset.model._meta
+        weights = ', '.join(str(weight) for weight in index.weights)
+        # Django has no API for joining a virtual table, and bm25()/snippet()
+        # only work in the query that runs the MATCH, so join it with extra().
+        return queryset.extra(
+            select={
+                'search_rank': f'-bm25({table}, {weights})',
+                'search_snippet': (
+                    f"snippet({table}, -1, '{MARKERS[0]}', '{MARKERS[1]}', '…', {SNIPPET_TOKENS})"
+                ),
+            },
+            tables=[table],
+            where=[f'{table} MATCH %s', f'{table}.rowid = {opts.db_table}.{opts.pk.column}'],
+            params=[match],
+        ).order_by('-search_rank', 'pk')
+
+    def fallback(self, queryset, index, text):
+        for word in re.findall(r'\w+', text):
+            condition = Q()
+            for column in index.columns:
+                condition |= Q(**{f'{column}__icontains': word})
+            queryset = queryset.filter(condition)
+        return queryset
+
+
+def highlight(snippet):
+    """HTML-escape a raw snippet() fragment, then turn MARKERS into HIGHLIGHT tags."""
+    text = escape(snippet)
+    for marker, tag in zip(MARKERS, HIGHLIGHT):
+        text = text.replace(marker, tag)
+    return text
+
+
+class SearchSnippetField(serializers.CharField):
+    """Read-only `search_snippet`: safe to render as HTML."""
+
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return highlight(super().to_representation(value))
@@ -1,13 +1,342 @@
-from rest_framework import serializers
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Manager
+from rest_framework import relations, serializers
+from rest_framework.fields import SkipField
+from rest_framework.validators import UniqueValidator
 from students.models import Student
 from employees.models import Employee
+from .metrics import timed
+from .signals import post_bulk_save
 
 class StudentSerializer(serializers.ModelSerializer):  #same like forms.ModelForm
     class Meta:
         model = Student
         fields = "__all__"
 
-class EmployeeSerializer(serializers.ModelSerializer):
+class BulkListSerializer(serializers.ListSerializer):
+    """
+    many=True serializer that writes with bulk queries instead of one
+    INSERT/UPDATE per row. `instance` is a list aligned with the input rows
+    (None = new row), so every row is validated against its own object.
+    """
+    batch_size = 500
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # UniqueValidator runs one SELECT per row; check unique fields for the
+        # whole batch at once in check_unique() instead.
+        self.unique_fields = []
+        for field in self.child.fields.values():
+            validators = [v for v in field.validators if not isinstance(v, UniqueValidator)]
+            if len(validators) != len(field.validators):
+                field.validators = validators
+                self.unique_fields.append(field)
+
+    def to_internal_value(self, data):
+        self._row = 0
+        validated_data = super().to_internal_value(data)
+        errors = self.check_unique(validated_data)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return validated_data
+
+    def check_unique(self, validated_data):
+        model = self.child.Meta.model
+        instances = self.instance or [None] * len(validated_data)
+        errors = [{} for _ in validated_data]
+        for field in self.unique_fields:
+            values = [attrs.get(field.source) for attrs in validated_data]
+            taken = dict(
+                model._default_manager
+                .filter(**{f'{field.source}__in': {v for v in values if v is not None}})
+                .values_list(field.source, 'pk')
+            )
+            seen = set()
+            for index, (value, instance) in enumerate(zip(values, instances)):
+                if value is None:
+                    continue
+                own_pk = instance.pk if instance is not None else None
+                if value in seen or taken.get(value, own_pk) != own_pk:
+                    errors[index][field.field_name] = [
+                        f'{model._meta.verbose_name} with this {field.field_name} already exists.'
+                    ]
+                seen.add(value)
+        return errors
+
+    def run_child_validation(self, data):
+        instance = self.instance[self._row] if self.instance is not None else None
+        self._row += 1
+        self.child.instance = instance
+        self.child.initial_data = data
+        return self.child.run_validation(data)
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        objs = [model(**attrs) for attrs in validated_data]
+        objs = model._default_manager.bulk_create(objs, batch_size=self.batch_size)
+        post_bulk_save.send(sender=model, instances=objs, created=[True] * len(objs))
+        return objs
+
+    def update(self, instances, validated_data):
+        model = self.child.Meta.model
+        created, updated, fields = [], [], set()
+        for instance, attrs in zip(instances, validated_data):
+            if instance is None:
+                created.append(model(**attrs))
+                continue
+            for attr, value in attrs.items():
+                setattr(instance, attr, value)
+            fields.update(attrs)
+            updated.append(instance)
+        if created:
+            model._default_manager.bulk_create(created, batch_size=self.batch_size)
+        if updated and fields:
+            # auto_now fields are only set by save(), so bump them by hand
+            for field in model._meta.concrete_fields:
+                if getattr(field, 'auto_now', False):
+                    fields.add(field.name)
+                    for instance in updated:
+                        field.pre_save(instance, add=False)
+            model._default_manager.bulk_update(updated, fields, batch_size=self.batch_size)
+        post_bulk_save.send(
+            sender=model,
+            instances=created + updated,
+            created=[True] * len(created) + [False] * len(updated),
+        )
+        created = iter(created)
+        return [instance if instance is not None else next(created) for instance in instances]
+
+
+# ============================================================
+# ✂️ Sparse fieldsets — ?fields= / ?omit= / ?expand=
+# ============================================================
+# A listing UI that only shows titles shouldn't pay for every body and every
+# nested comment. On GET/HEAD the client picks the fields:
+#   ?fields=id,blog_title      only these
+#   ?omit=blog_body            everything except these
+#   ?expand=comments           include a field the view leaves out by default
+# The view names its "left out unless expanded" fields in `expandable_fields`
+# (BlogsView does that for `comments`). Trimmed fields are never serialized,
+# and SparseFieldsMixin (api/mixins.py) drops them from the SQL too.
+
+def _names(params, key):
+    return {name.strip() for value in params.getlist(key) for name in value.split(',') if name.strip()}
+
+
+def select_fields(available, params, expandable=()):
+    """Return the field names to keep; unknown names raise a ValidationError."""
+    wanted = {key: _names(params, key) for key in ('fields', 'omit', 'expand')}
+    errors = {
+        key: [f'Unknown field(s): {", ".join(sorted(names - set(available)))}.']
+        for key, names in wanted.items() if names - set(available)
+    }
+    if errors:
+        raise serializers.ValidationError(errors)
+
+    keep = {name for name in available if name not in expandable or name in wanted['expand']}
+    if wanted['fields']:
+        keep = wanted['fields'] | (wanted['expand'] & set(available))
+    return keep - wanted['omit']
+
+
+class SparseFieldsetMixin:
+    """Serializer side of sparse fieldsets: drops fields per the request's query string."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method not in ('GET', 'HEAD'):
+            return
+        keep = select_fields(
+            self.fields,
+            getattr(request, 'query_params', request.GET),
+            getattr(self.context.get('view'), 'expandable_fields', ()),
+        )
+        for name in list(self.fields):
+            if name not in keep:
+                self.fields.pop(name)
+
+
+# ============================================================
+# 🔝 Bounded nested lists + links to the full list
+# ============================================================
+# `CommentSerializer(many=True)` nests EVERY comment: a viral post with 50k
+# comments becomes a 50k-item response. LatestListSerializer nests only the
+# newest `limit` rows; the full list lives behind a paginated link.
+#
+#   comments = LatestListSerializer(child=CommentSerializer(), limit=5, read_only=True)
+#
+# plan_queryset() (api/mixins.py) turns it into a sliced Prefetch (stored in
+# `latest_<name>`), which Django runs as ONE window-function query
+# (ROW_NUMBER() per blog) for the whole page — never more than `limit`
+# comments per blog leave the database.
+#
+# Computed columns come from `Meta.annotations`: {field name: expression}. The
+# query planners add an expression to the queryset only while its field is part
+# of the (possibly ?fields=-trimmed) serializer. (Blog's `comment_count` used
+# to be one; it is a stored column now, see api/counters.py.)
+
+class LatestListSerializer(serializers.ListSerializer):
+    """Read-only nested list of the first `limit` related rows by `ordering`."""
+
+    def __init__(self, *args, limit=5, ordering=('-pk',), **kwargs):
+        self.limit = limit
+        self.ordering = ordering
+        super().__init__(*args, **kwargs)
+
+    @property
+    def prefetch_to_attr(self):
+        return f'latest_{self.source}'
+
+    def get_attribute(self, instance):
+        prefetched = getattr(instance, self.prefetch_to_attr, None)
+        if prefetched is not None:
+            return prefetched
+        return super().get_attribute(instance).order_by(*self.ordering)[:self.limit]
+
+
+class RelatedLinkField(serializers.HyperlinkedIdentityField):
+    """HyperlinkedIdentityField that falls back to a relative URL without a request."""
+
+    def to_representation(self, value):
+        if self.context.get('request') is None:
+            return self.reverse(
+                self.view_name, kwargs={self.lookup_url_kwarg: getattr(value, self.lookup_field)}
+            )
+        return super().to_representation(value)
+
+
+class EmployeeSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Employee
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+        list_serializer_class = BulkListSerializer
+
+
+# ============================================================
+# ⚡ Compiled read-only serializers
+# ============================================================
+# ModelSerializer.to_representation() loops over every field of every row and
+# calls get_attribute() -> to_representation() on each through several layers
+# of generic dispatch. On big list pages that dominates CPU time.
+#
+# compile_serializer() looks at the fields ONCE and picks the cheapest getter
+# for each (plain attribute read for ints/strings, `<fk>_id` for primary-key
+# relations, a compiled child for nested serializers). Anything unusual falls
+# back to the field's own methods, so the output is identical.
+#
+# Read paths only: writes keep using the normal serializer for validation.
+
+def _plain(source, cast, kind):
+    def get(obj):
+        value = getattr(obj, source)
+        if value is None or type(value) is kind:
+            return value
+        return cast(value)
+    return get
+
+
+def _column(source, to_representation):
+    def get(obj):
+        value = getattr(obj, source)
+        return None if value is None else to_representation(value)
+    return get
+
+
+def _primary_key(attname):
+    return lambda obj: getattr(obj, attname)
+
+
+def _nested_many(source, child):
+    def get(obj):
+        value = getattr(obj, source)
+        if isinstance(value, Manager):
+            value = value.all()
+        return [child(item) for item in value]
+    return get
+
+
+def _latest_many(field, child):
+    return lambda obj: [child(item) for item in field.get_attribute(obj)]
+
+
+def _nested_one(source, child):
+    def get(obj):
+        value = getattr(obj, source)
+        return None if value is None else child(value)
+    return get
+
+
+def _generic(field):
+    def get(obj):
+        attribute = field.get_attribute(obj)  # may raise SkipField
+        check = attribute.pk if isinstance(attribute, relations.PKOnlyObject) else attribute
+        return None if check is None else field.to_representation(attribute)
+    return get
+
+
+def _getter(field, model):
+    source = field.source
+    simple = '.' not in source and source != '*'
+    model_field = None
+    if simple and model is not None:
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            pass
+
+    if isinstance(field, LatestListSerializer) and simple:
+        return _latest_many(field, compile_serializer(field.child))
+    if isinstance(field, serializers.ListSerializer) and simple:
+        return _nested_many(source, compile_serializer(field.child))
+    if isinstance(field, serializers.ModelSerializer) and simple:
+        return _nested_one(source, compile_serializer(field))
+    if (isinstance(field, relations.PrimaryKeyRelatedField) and field.pk_field is None
+            and model_field is not None and model_field.many_to_one):
+        return _primary_key(model_field.attname)
+    if simple and model_field is not None and not model_field.is_relation:
+        if type(field) is serializers.CharField:
+            return _plain(source, str, str)
+        if type(field) is serializers.IntegerField:
+            return _plain(source, int, int)
+        return _column(source, field.to_representation)
+    return _generic(field)
+
+
+def compile_serializer(serializer):
+    """
+    Return a function `obj -> dict` producing the same output as
+    `serializer.to_representation(obj)`.
+    """
+    model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+    getters = [(field.field_name, _getter(field, model)) for field in serializer._readable_fields]
+
+    def to_representation(obj):
+        ret = {}
+        for name, get in getters:
+            try:
+                ret[name] = get(obj)
+            except SkipField:
+                continue
+        return ret
+    return to_representation
+
+
+class CompiledReadSerializer:
+    """
+    Stand-in for a serializer on GET requests: only offers `.data`.
+    Built by FastReadMixin (api/mixins.py).
+    """
+
+    def __init__(self, instance, to_representation, many=False):
+        self.instance = instance
+        self.to_representation = to_representation
+        self.many = many
+
+    @property
+    def data(self):
+        with timed('serializer_seconds'):
+            if not self.many:
+                return self.to_representation(self.instance)
+            items = self.instance.all() if isinstance(self.instance, Manager) else self.instance
+            return [self.to_representation(item) for item in items]
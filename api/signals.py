@@ -0,0 +1,64 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from blogs.models import Blog, Comment
+from .caching import bump_generations, generation_key, reset_generations
+
+# ------------------------------------------------------------------------------
+# api/signals.py — keep the response cache (api/caching.py) honest
+# ------------------------------------------------------------------------------
+# Every save/delete of a Blog or Comment bumps the generations its cached
+# responses depend on. Connected in ApiConfig.ready().
+#
+# Note: QuerySet.update() and bulk_create() do not send these signals; code
+# that bypasses them calls the helpers below itself (e.g. api/deletion.py).
+# ------------------------------------------------------------------------------
+
+# BulkListSerializer's bulk_create/bulk_update send this instead of one
+# post_save per row. (QuerySet.delete() still sends post_delete per row
+# whenever a receiver is connected.)
+post_bulk_save = Signal()  # sender=model, instances=[...], created=[bool per instance]
+
+BLOG = Blog._meta.label_lower
+COMMENT = Comment._meta.label_lower
+
+
+@receiver([post_save, post_delete], sender=Blog)
+def invalidate_blog(sender, instance, **kwargs):
+    bump_generations(generation_key(BLOG), generation_key(BLOG, instance.pk))
+
+
+@receiver(pre_save, sender=Comment)
+def remember_previous_blog(sender, instance, **kwargs):
+    # A comment moved to another blog must invalidate BOTH blog pages.
+    instance._previous_blog_id = None
+    if instance.pk is not None:
+        instance._previous_blog_id = (
+            Comment.objects.filter(pk=instance.pk).values_list('blog_id', flat=True).first()
+        )
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    # Blog responses nest their comments, so a comment change also makes the
+    # blog list and the parent blog's detail page stale.
+    keys = [
+        generation_key(COMMENT),
+        generation_key(COMMENT, instance.pk),
+        generation_key(BLOG),
+        generation_key(BLOG, instance.blog_id),
+    ]
+    previous = getattr(instance, '_previous_blog_id', None)
+    if previous is not None and previous != instance.blog_id:
+        keys.append(generation_key(BLOG, previous))
+    bump_generations(*keys)
+
+
+def invalidate_comments(pks, blog_ids):
+    """invalidate_comment() for many comments at once (set-based DELETEs)."""
+    reset_generations(generation_key(COMMENT, pk) for pk in pks)
+    bump_generations(
+        generation_key(COMMENT),
+        generation_key(BLOG),
+        *(generation_key(BLOG, blog_id) for blog_id in set(blog_ids)),
+    )
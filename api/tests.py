@@ -1,3 +1,1419 @@
-from django.test import TestCase
+import base64
+import datetime
+import decimal
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import iscoroutinefunction
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.db import connections
+from django.db.models import Count
+from django.db.models.signals import post_delete, pre_delete
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from blogs.models import Blog, Comment
+from blogs.serializers import BlogSerializer, CommentSerializer
+from employees.models import Employee, EmployeeChange
+from .caching import CachedResponseMixin, SingleFlight
+from .deletion import (
+    BULK_AWARE_RECEIVERS, comment_receivers_need_instances, delete_comments, live_receivers,
+)
+from .group_commit import WriteCoordinator, WriteTimeout
+from .management.commands.bench_api import percentile
+from .metrics import registry
+from .middleware import (
+    STICKY_HEADER, IdempotencyMiddleware, PrimaryStickinessMiddleware, QueryBudgetExceeded,
+    RequestMetricsMiddleware,
+)
+from .paginations import SafeLimitOffsetPagination
+from .parsers import FastJSONParser
+from .renderers import FastJSONRenderer
+from .serializers import EmployeeSerializer, compile_serializer
+from .batch import BatchView
+from .views import BlogDetailView, EmployeeViewset
+
+
+def make_blogs(count, comments_per_blog=3):
+    for i in range(count):
+        blog = Blog.objects.create(blog_title=f'Blog {i}', blog_body='body')
+        Comment.objects.bulk_create(
+            Comment(blog=blog, comment=f'Comment {j}') for j in range(comments_per_blog)
+        )
+
+
+class QuerysetOptimizerTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+
+    def test_blog_list_query_count_is_fixed(self):
+        # count + blogs + one prefetch for every comment on the page
+        make_blogs(2)
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/v1/blogs/?limit=50&expand=comments')
+        self.assertEqual(len(response.data['results']), 2)
+
+        make_blogs(20)
+        cache.clear()  # drop the cached page count
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/v1/blogs/?limit=50&expand=comments')
+        self.assertEqual(len(response.data['results']), 22)
+        self.assertEqual(len(response.data['results'][0]['comments']), 3)
+
+    def test_blog_detail_prefetches_latest_comments(self):
+        make_blogs(1, comments_per_blog=10)
+        blog = Blog.objects.get()
+        with self.assertNumQueries(2):  # blog (with count) + comments
+            response = self.client.get(f'/api/v1/blogs/{blog.pk}/')
+        self.assertEqual(response.data['comment_count'], 10)
+        self.assertEqual(
+            [row['comment'] for row in response.data['comments']],
+            [f'Comment {j}' for j in range(9, 4, -1)],
+        )
+
+    def test_comment_list_joins_blog(self):
+        make_blogs(5)
+        with self.assertNumQueries(2):  # count + comments JOIN blogs
+            response = self.client.get('/api/v1/comments/?limit=50')
+        self.assertEqual(len(response.data['results']), 15)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        Employee.objects.bulk_create(
+            Employee(emp_id=f'E{i:03}', emp_name=f'Name {i}', designation=['Dev', 'Manager'][i % 2])
+            for i in range(7)
+        )
+
+    def walk(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            pages.append([row['emp_id'] for row in response.data['results']])
+            url = response.data['next']
+        return pages
+
+    def test_follows_next_links_without_counting(self):
+        with self.assertNumQueries(1):  # one page (ETag built from its rows), no COUNT(*)
+            response = self.client.get('/api/v1/employees/?page_size=3')
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['previous'])
+
+        pages = self.walk('/api/v1/employees/?page_size=3')
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual(sum(pages, []), [f'E{i:03}' for i in range(7)])
+
+    def test_designation_ordering_and_previous_link(self):
+        pages = self.walk('/api/v1/employees/?page_size=2&ordering=designation')
+        rows = sum(pages, [])
+        self.assertEqual(rows, ['E000', 'E002', 'E004', 'E006', 'E001', 'E003', 'E005'])
+
+        second = self.client.get('/api/v1/employees/?page_size=2&ordering=designation')
+        second = self.client.get(second.data['next'])
+        first = self.client.get(second.data['previous'])
+        self.assertEqual([row['emp_id'] for row in first.data['results']], ['E000', 'E002'])
+
+    def test_opt_in_approximate_count(self):
+        response = self.client.get('/api/v1/employees/?count=approx&designation=Dev')
+        self.assertEqual(response.data['count'], 4)
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get('/api/v1/employees/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+    def test_cursor_with_wrong_value_types_is_404(self):
+        for values in (['abc'], [[1]], [{'a': 1}], [None], [True]):
+            data = json.dumps({'o': 'id', 'v': values, 'r': 0}).encode()
+            cursor = base64.urlsafe_b64encode(data).decode()
+            response = self.client.get('/api/v1/employees/', {'cursor': cursor})
+            self.assertEqual(response.status_code, 404, values)
+        data = json.dumps({'o': 'designation', 'v': [{'a': 1}, 'x'], 'r': 0}).encode()
+        cursor = base64.urlsafe_b64encode(data).decode()
+        response = self.client.get('/api/v1/employees/', {'cursor': cursor, 'ordering': 'designation'})
+        self.assertEqual(response.status_code, 404)
+
+
+@mock.patch.object(SafeLimitOffsetPagination, 'seek_threshold', 4)
+@mock.patch.object(SafeLimitOffsetPagination, 'max_offset', 6)
+class SafeLimitOffsetPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        make_blogs(12, comments_per_blog=0)
+
+    def test_response_shape_matches_limit_offset(self):
+        response = self.client.get('/api/v1/blogs/')
+        self.assertEqual(set(response.data), {'count', 'next', 'previous', 'results'})
+        self.assertEqual(response.data['count'], 12)
+        self.assertIn('offset=2', response.data['next'])
+
+    def test_deep_pages_switch_to_pk_seek(self):
+        titles, url = [], '/api/v1/blogs/?limit=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            titles += [row['blog_title'] for row in response.data['results']]
+            url = response.data['next']
+            if url and 'offset=9' in url:
+                self.assertIn('after=', url)
+        self.assertEqual(titles, [f'Blog {i}' for i in range(12)])
+
+        previous = self.client.get(response.data['previous'])
+        self.assertEqual(
+            [row['blog_title'] for row in previous.data['results']],
+            ['Blog 6', 'Blog 7', 'Blog 8'],
+        )
+
+    def test_raw_offset_is_capped(self):
+        self.assertEqual(self.client.get('/api/v1/blogs/?offset=6').status_code, 200)
+        self.assertEqual(self.client.get('/api/v1/blogs/?offset=7').status_code, 404)
+
+    def test_count_is_cached(self):
+        self.client.get('/api/v1/blogs/?limit=2')
+        with self.assertNumQueries(1):  # blogs only, no COUNT(*)
+            self.client.get('/api/v1/blogs/?limit=3')
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        make_blogs(2, comments_per_blog=1)
+        self.blog = Blog.objects.first()
+
+    def test_repeat_get_is_served_from_cache(self):
+        url = f'/api/v1/blogs/{self.blog.pk}/'
+        self.assertEqual(self.client.get(url)['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):  # data and ETag both come from the cache
+            response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(len(response.data['comments']), 1)
+
+    def test_query_param_order_does_not_matter(self):
+        self.client.get('/api/v1/blogs/?limit=1&offset=1')
+        self.assertEqual(self.client.get('/api/v1/blogs/?offset=1&limit=1')['X-Cache'], 'HIT')
+
+    def test_new_comment_invalidates_parent_blog_and_lists(self):
+        detail = f'/api/v1/blogs/{self.blog.pk}/'
+        other = f'/api/v1/blogs/{Blog.objects.last().pk}/'
+        for url in (detail, other, '/api/v1/blogs/', '/api/v1/comments/'):
+            self.client.get(url)
+
+        response = self.client.post('/api/v1/comments/', {'blog': self.blog.pk, 'comment': 'new'})
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.get(detail)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['comments']), 2)
+        self.assertEqual(self.client.get('/api/v1/blogs/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/api/v1/comments/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get(other)['X-Cache'], 'HIT')
+
+    def test_blog_update_invalidates_detail(self):
+        url = f'/api/v1/blogs/{self.blog.pk}/'
+        self.client.get(url)
+        self.client.patch(url, {'blog_title': 'Edited'}, format='json')
+        response = self.client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['blog_title'], 'Edited')
+
+
+class ConditionalRequestTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        make_blogs(1, comments_per_blog=1)
+        self.blog = Blog.objects.get()
+        self.employee = Employee.objects.create(emp_id='E1', emp_name='Ann', designation='Dev')
+
+    def test_list_not_modified(self):
+        etag = self.client.get('/api/v1/employees/')['ETag']
+        response = self.client.get('/api/v1/employees/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Employee.objects.create(emp_id='E2', emp_name='Bob', designation='Dev')
+        response = self.client.get('/api/v1/employees/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_not_modified_skips_serialization(self):
+        for url in ('/api/v1/employees/', f'/api/v1/employees/{self.employee.pk}/'):
+            etag = self.client.get(url)['ETag']
+            with mock.patch('api.mixins.compile_serializer', wraps=compile_serializer) as compile:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+                compile.assert_not_called()
+                self.assertEqual(self.client.get(url).status_code, 200)
+                compile.assert_called_once()
+
+    def test_etag_depends_on_query_params(self):
+        first = self.client.get('/api/v1/employees/')['ETag']
+        other = self.client.get('/api/v1/employees/?designation=Dev')['ETag']
+        self.assertNotEqual(first, other)
+
+    def test_detail_last_modified(self):
+        url = f'/api/v1/employees/{self.employee.pk}/'
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_nested_comment_changes_blog_etag(self):
+        url = f'/api/v1/blogs/{self.blog.pk}/'
+        response = self.client.get(url)
+        self.assertNotIn('Last-Modified', response)
+        etag = response['ETag']
+        self.blog.comments.get().delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_if_match_on_update(self):
+        url = f'/api/v1/employees/{self.employee.pk}/'
+        etag = self.client.get(url)['ETag']
+        response = self.client.patch(url, {'emp_name': 'Ann B'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.patch(url, {'emp_name': 'Stale'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.employee.refresh_from_db()
+        self.assertEqual(self.employee.emp_name, 'Ann B')
+
+    def test_if_match_ignores_representation_and_nested_rows(self):
+        url = f'/api/v1/employees/{self.employee.pk}/'
+        etag = self.client.get(f'{url}?fields=id')['ETag']
+        response = self.client.put(
+            url, {'emp_id': 'E1', 'emp_name': 'Ann C', 'designation': 'Dev'},
+            format='json', HTTP_IF_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 200)
+
+        blog_url = f'/api/v1/blogs/{self.blog.pk}/'
+        etag = self.client.get(blog_url)['ETag']
+        self.client.post('/api/v1/comments/', {'blog': self.blog.pk, 'comment': 'meanwhile'})
+        self.assertNotEqual(self.client.get(blog_url)['ETag'], etag)
+        response = self.client.patch(blog_url, {'blog_title': 'New'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_cached_page_is_not_modified_without_sql(self):
+        etag = self.client.get('/api/v1/blogs/?expand=comments')['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/blogs/?expand=comments', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_missing_object_is_still_404(self):
+        self.assertEqual(self.client.get('/api/v1/employees/999/').status_code, 404)
+
+
+class BulkEmployeeTests(TestCase):
+    url = '/api/v1/employees/bulk/'
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def rows(self, count, start=0):
+        return [
+            {'emp_id': f'E{i}', 'emp_name': f'Name {i}', 'designation': 'Dev'}
+            for i in range(start, start + count)
+        ]
+
+    def test_bulk_create_in_few_queries(self):
+        # emp_id uniqueness + SAVEPOINT + INSERT + changelog INSERT + RELEASE
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url, self.rows(50), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 50)
+        self.assertEqual(Employee.objects.count(), 50)
+
+    def test_errors_are_reported_per_row_and_nothing_is_written(self):
+        rows = self.rows(3)
+        rows[1]['emp_name'] = ''
+        response = self.client.post(self.url, rows, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([item['index'] for item in response.data], [1])
+        self.assertIn('emp_name', response.data[0]['errors'])
+        self.assertFalse(Employee.objects.exists())
+
+    def test_bulk_partial_update(self):
+        self.client.post(self.url, self.rows(3), format='json')
+        ids = list(Employee.objects.order_by('id').values_list('id', flat=True))
+        payload = [{'id': pk, 'designation': 'Manager'} for pk in ids] + [{'id': 999}]
+        response = self.client.patch(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0]['index'], 3)
+
+        response = self.client.patch(self.url, payload[:-1], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Employee.objects.filter(designation='Manager').count(), 3)
+
+    def test_malformed_ids_are_row_errors(self):
+        self.client.post(self.url, self.rows(1), format='json')
+        pk = Employee.objects.get().pk
+        payload = [{'id': pk, 'designation': 'Manager'}, {'id': [1]}, {'id': 'abc'}, {'id': True}, {}]
+        response = self.client.patch(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([item['index'] for item in response.data], [1, 2, 3, 4])
+        self.assertEqual(response.data[1]['errors']['id'], ['A valid integer is required.'])
+        self.assertEqual(Employee.objects.get().designation, 'Dev')
+
+    def test_upsert_on_emp_id(self):
+        self.client.post(self.url, self.rows(2), format='json')
+        rows = self.rows(3)
+        rows[0]['designation'] = 'Manager'
+        response = self.client.post(self.url + '?upsert=true', rows, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Employee.objects.count(), 3)
+        self.assertEqual(Employee.objects.get(emp_id='E0').designation, 'Manager')
+
+        rows = self.rows(4, start=10)
+        rows[1]['emp_id'], rows[2]['emp_id'], rows[3]['emp_id'] = [1], {'a': 1}, True
+        response = self.client.post(self.url + '?upsert=true', rows, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([item['index'] for item in response.data], [1, 2, 3])
+        self.assertIn('emp_id', response.data[0]['errors'])
+        self.assertEqual(Employee.objects.count(), 3)
+
+    def test_repeated_ids_are_row_errors(self):
+        self.client.post(self.url, self.rows(1), format='json')
+        pk = Employee.objects.get().pk
+        payload = [{'id': pk, 'designation': 'Manager'}, {'id': pk, 'designation': 'QA'}]
+        response = self.client.patch(self.url, payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([item['index'] for item in response.data], [1])
+        self.assertEqual(Employee.objects.get().designation, 'Dev')
+
+    def test_bulk_delete_reports_missing(self):
+        self.client.post(self.url, self.rows(3), format='json')
+        ids = list(Employee.objects.values_list('id', flat=True))
+        response = self.client.delete(self.url, ids[:2] + [999], format='json')
+        self.assertEqual(response.data, {'deleted': 2, 'missing': [999]})
+        self.assertEqual(Employee.objects.count(), 1)
+
+        response = self.client.delete(self.url, [True], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Employee.objects.count(), 1)
+
+
+class EmployeeLookupTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.employee = Employee.objects.create(emp_id='E042', emp_name='Ann', designation='Dev')
+
+    def test_lookup_by_emp_id(self):
+        url = '/api/v1/employees/by-emp-id/E042/'
+        response = self.client.get(url)
+        self.assertEqual(response.data['id'], self.employee.pk)
+        self.assertIn('ETag', response)
+
+        response = self.client.patch(url, {'designation': 'Manager'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/api/v1/employees/by-emp-id/E999/').status_code, 404)
+
+    def test_emp_id_is_unique(self):
+        response = self.client.post(
+            '/api/v1/employees/', {'emp_id': 'E042', 'emp_name': 'Bob', 'designation': 'Dev'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_unique_check_is_one_query(self):
+        rows = [
+            {'emp_id': f'E{i:03}', 'emp_name': 'x', 'designation': 'Dev'} for i in range(40, 50)
+        ] + [{'emp_id': 'E040', 'emp_name': 'dup', 'designation': 'Dev'}]
+        with self.assertNumQueries(1):
+            response = self.client.post('/api/v1/employees/bulk/', rows, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([item['index'] for item in response.data], [2, 10])
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        make_blogs(3, comments_per_blog=2)
+        Employee.objects.bulk_create(
+            Employee(emp_id=f'E{i}', emp_name=f'Name {i}', designation=['Dev', 'Manager'][i % 2])
+            for i in range(5)
+        )
+
+    def read(self, response):
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_employee_ndjson_export_applies_filters(self):
+        response = self.client.get('/api/v1/employees/export/?designation=Dev')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([row['emp_id'] for row in rows], ['E0', 'E2', 'E4'])
+
+    def test_employee_csv_export(self):
+        lines = self.read(self.client.get('/api/v1/employees/export/?format=csv')).splitlines()
+        self.assertEqual(lines[0], 'id,emp_id,emp_name,designation,updated_at')
+        self.assertEqual(len(lines), 6)
+
+    def test_blog_export_streams_nested_comments(self):
+        with self.assertNumQueries(2):  # blogs + one comment prefetch per chunk
+            body = self.read(self.client.get('/api/v1/blogs/export/'))
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(len(rows[0]['comments']), 2)
+
+    def test_blog_export_is_not_limited_to_the_newest_comments(self):
+        blog = Blog.objects.first()
+        Comment.objects.bulk_create(Comment(blog=blog, comment=f'More {j}') for j in range(6))
+        rows = [json.loads(line) for line in self.read(self.client.get('/api/v1/blogs/export/')).splitlines()]
+        exported = next(row for row in rows if row['id'] == blog.pk)
+        self.assertEqual(exported['comment_count'], 8)
+        self.assertEqual(len(exported['comments']), 8)
+
+    def test_comment_csv_export(self):
+        lines = self.read(self.client.get('/api/v1/comments/export/?format=csv')).splitlines()
+        self.assertEqual(len(lines), 7)
+
+
+class CompiledSerializerTests(TestCase):
+    def setUp(self):
+        make_blogs(3, comments_per_blog=2)
+        Employee.objects.create(emp_id='E1', emp_name='Ann', designation='Dev')
+
+    def test_output_matches_drf(self):
+        cases = [
+            (EmployeeSerializer, Employee.objects.all()),
+            (CommentSerializer, Comment.objects.all()),
+            (BlogSerializer, Blog.objects.prefetch_related('comments')),
+        ]
+        for serializer_class, queryset in cases:
+            compiled = compile_serializer(serializer_class())
+            self.assertEqual(
+                [compiled(obj) for obj in queryset],
+                serializer_class(queryset, many=True).data,
+            )
+
+    def test_views_return_the_same_json(self):
+        client = APIClient()
+        blog = Blog.objects.first()
+        response = client.get(f'/api/v1/blogs/{blog.pk}/')
+        request = response.wsgi_request
+        blog = BlogDetailView.queryset.get(pk=blog.pk)
+        self.assertEqual(response.json(), BlogSerializer(blog, context={'request': request}).data)
+
+        response = client.post('/api/v1/blogs/', {'blog_title': ''})
+        self.assertEqual(response.status_code, 400)  # writes still validate
+
+
+class FastJSONTests(TestCase):
+    def test_renderer_matches_drf_output(self):
+        data = {
+            'when': timezone.now(),
+            'day': datetime.date(2024, 1, 2),
+            'price': decimal.Decimal('1.50'),
+            'label': gettext_lazy('Name'),
+            'text': 'caf\u00e9 \u2028',
+            'nested': [{'n': 1, 'none': None, 'ok': True}],
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+        for value in (float('nan'), float('inf'), decimal.Decimal('NaN')):
+            data = {'results': [{'score': value, 'next': None}]}
+            for renderer in (JSONRenderer(), FastJSONRenderer()):
+                with self.assertRaises(ValueError):
+                    renderer.render(data)
+
+    def test_indent_falls_back_to_stdlib(self):
+        rendered = FastJSONRenderer().render({'a': 1}, 'application/json; indent=2')
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+
+    def test_parser(self):
+        parser = FastJSONParser()
+        self.assertEqual(parser.parse(io.BytesIO(b'{"a": [1, 2]}')), {'a': [1, 2]})
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(b'{"a": NaN}'))
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        make_blogs(3, comments_per_blog=2)
+
+    async def test_async_list_matches_sync_list(self):
+        sync_response = await self.async_client.get('/api/v1/blogs/?limit=2&offset=1')
+        async_response = await self.async_client.get('/api/v1/async/blogs/?limit=2&offset=1')
+        self.assertEqual(async_response.json()['results'], sync_response.json()['results'])
+        self.assertEqual(async_response.json()['count'], 3)
+
+    async def test_async_pages_match_the_sync_paginators(self):
+        await Employee.objects.abulk_create(
+            Employee(emp_id=f'E{i}', emp_name='x', designation=['Dev', 'Manager'][i % 2]) for i in range(5)
+        )
+        url = '/api/v1/employees/?designation=Dev&page_size=2&fields=emp_id'
+        sync_response = (await self.async_client.get(url)).json()
+        async_response = (await self.async_client.get(url.replace('/employees/', '/async/employees/'))).json()
+        self.assertEqual(set(async_response), {'next', 'previous', 'results'})  # keyset, no count
+        self.assertEqual(async_response['results'], sync_response['results'])
+        following = (await self.async_client.get(async_response['next'])).json()
+        self.assertEqual(following['results'], [{'emp_id': 'E4'}])  # filters kept
+
+        response = await self.async_client.get('/api/v1/async/blogs/?limit=1&fields=id')
+        self.assertIn('fields=id', response.json()['next'])
+        response = await self.async_client.get('/api/v1/async/blogs/?offset=999999')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_async_crud(self):
+        blog = await Blog.objects.afirst()
+        response = await self.async_client.post(
+            '/api/v1/async/comments/', {'blog': blog.pk, 'comment': 'hi'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 201)
+        pk = response.json()['id']
+
+        response = await self.async_client.patch(
+            f'/api/v1/async/comments/{pk}/', {'comment': 'edited'},
+            content_type='application/json',
+        )
+        self.assertEqual(response.json()['comment'], 'edited')
+
+        response = await self.async_client.get(f'/api/v1/async/blogs/{blog.pk}/')
+        self.assertEqual(len(response.json()['comments']), 3)
+
+        response = await self.async_client.delete(f'/api/v1/async/comments/{pk}/')
+        self.assertEqual(response.status_code, 204)
+        response = await self.async_client.get(f'/api/v1/async/comments/{pk}/')
+        self.assertEqual(response.status_code, 404)
+
+    async def test_async_validation_errors(self):
+        response = await self.async_client.post(
+            '/api/v1/async/employees/', {'emp_id': 'E1'}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('emp_name', response.json())
+
+
+class WriteCoordinatorTests(TransactionTestCase):
+    def test_results_and_errors_reach_their_callers(self):
+        coordinator = WriteCoordinator(max_batch=8, max_wait_ms=5)
+        blog = coordinator.submit(Blog.objects.create, blog_title='t', blog_body='b')
+        self.assertEqual(Blog.objects.get().pk, blog.pk)
+
+        def fail():
+            Blog.objects.create(blog_title='rolled back', blog_body='b')
+            raise ValueError('boom')
+
+        with self.assertRaises(ValueError):
+            coordinator.submit(fail)
+        self.assertEqual(Blog.objects.count(), 1)
+
+    def test_wedged_writer_times_out_and_queued_job_is_dropped(self):
+        coordinator = WriteCoordinator(max_wait_ms=0, timeout=0.2)
+        release = threading.Event()
+        with self.assertRaises(WriteTimeout):
+            coordinator.submit(release.wait)  # holds the writer
+        with self.assertRaises(WriteTimeout):
+            coordinator.submit(Blog.objects.create, blog_title='late', blog_body='b')
+        release.set()
+        self.assertEqual(coordinator.submit(Blog.objects.count), 0)  # the timed-out job never ran
+
+    def test_dead_writer_is_restarted(self):
+        coordinator = WriteCoordinator()
+        with mock.patch.object(coordinator, 'next_batch', side_effect=SystemExit):
+            coordinator.start()
+            coordinator.thread.join()
+        blog = coordinator.submit(Blog.objects.create, blog_title='t', blog_body='b')
+        self.assertEqual(Blog.objects.get().pk, blog.pk)
+
+    @override_settings(QUERY_BUDGETS={'default': 50}, WRITE_COORDINATOR={'ENABLED': True})
+    def test_if_match_is_checked_on_the_writer_thread_and_measured(self):
+        registry.clear()
+        employee = Employee.objects.create(emp_id='E1', emp_name='Ann', designation='Dev')
+        url = f'/api/v1/employees/{employee.pk}/'
+        client = APIClient()
+        etag = client.get(url)['ETag']
+        threads = []
+        check = EmployeeViewset.check_preconditions
+
+        def record_thread(view, instance):
+            threads.append(threading.current_thread().name)
+            return check(view, instance)
+
+        with mock.patch.object(EmployeeViewset, 'check_preconditions', record_thread):
+            response = client.patch(url, {'emp_name': 'B'}, format='json', HTTP_IF_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            response = client.patch(url, {'emp_name': 'C'}, format='json', HTTP_IF_MATCH=etag)
+            self.assertEqual(response.status_code, 412)
+        self.assertEqual(threads, ['write-coordinator'] * 2)
+        self.assertEqual(Employee.objects.get().emp_name, 'B')
+        body = client.get('/metrics').content.decode()
+        # GET: 1 query. Each PATCH runs only its lookup on the request thread; the
+        # savepoint, check, UPDATE and changelog INSERT on the writer count too.
+        self.assertIn('api_request_queries_bucket{view="employee-detail",le="1"} 1', body)
+        self.assertIn('api_request_queries_bucket{view="employee-detail",le="3"} 1', body)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], READ_YOUR_WRITES_SECONDS=60)
+class ReplicaRouterTests(TransactionTestCase):
+    """A second SQLite file plays a replica that hasn't caught up yet."""
+
+    databases = '__all__'  # resolved in setUpClass, after 'replica' is added
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        connections.settings['replica'] = {
+            **connections.settings['default'],
+            'NAME': os.path.join(cls.tmpdir.name, 'replica.sqlite3'),
+        }
+        call_command('migrate', database='replica', verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        cls.tmpdir.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def test_reads_use_replica_until_client_writes(self):
+        blog = Blog.objects.create(blog_title='primary only', blog_body='b')
+        Blog.objects.using('replica').create(pk=blog.pk, blog_title='stale', blog_body='b')
+        url = f'/api/v1/blogs/{blog.pk}/'
+
+        self.assertEqual(self.client.get(url).data['blog_title'], 'stale')
+
+        response = self.client.patch(url, {'blog_title': 'edited'}, format='json')
+        self.assertIn('X-Read-Primary-Until', response)
+        self.assertEqual(self.client.get(url).data['blog_title'], 'edited')
+
+        # another client without the cookie still reads the lagging replica
+        other = APIClient()
+        self.assertEqual(other.get(url).data['blog_title'], 'stale')
+
+    def test_header_pins_reads_to_primary(self):
+        blog = Blog.objects.create(blog_title='new', blog_body='b')
+        url = f'/api/v1/blogs/{blog.pk}/'
+        self.assertEqual(self.client.get(url).status_code, 404)  # not replicated yet
+        response = self.client.get(url, HTTP_X_READ_PRIMARY_UNTIL='9999999999')
+        self.assertEqual(response.status_code, 200)
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        self.client = APIClient()
+        make_blogs(3)
+
+    def test_metrics_endpoint_reports_per_view_histograms(self):
+        self.client.get('/api/v1/blogs/')
+        self.client.get('/api/v1/blogs/')
+        body = self.client.get('/metrics').content.decode()
+        self.assertIn('# TYPE api_request_duration_seconds histogram', body)
+        self.assertIn('api_request_duration_seconds_count{view="api.views.BlogsView"} 2', body)
+        # miss: count + blogs; hit: no SQL at all
+        self.assertIn('api_request_queries_bucket{view="api.views.BlogsView",le="0"} 1', body)
+        self.assertIn('api_request_queries_bucket{view="api.views.BlogsView",le="2"} 2', body)
+        self.assertIn('api_request_serializer_seconds_count{view="api.views.BlogsView"} 2', body)
+
+    @override_settings(QUERY_BUDGETS={'default': 50, 'api.views.BlogsView': 1},
+                       QUERY_BUDGET_ACTION='raise')
+    def test_query_budget_raises_when_configured(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get('/api/v1/blogs/')
+        self.assertEqual(self.client.get('/api/v1/comments/').status_code, 200)
+
+    @override_settings(QUERY_BUDGETS={'default': 1})
+    def test_query_budget_logs_by_default(self):
+        with self.assertLogs('api.middleware', 'WARNING') as logs:
+            self.assertEqual(self.client.get('/api/v1/blogs/').status_code, 200)
+        self.assertIn('budget is 1', logs.output[0])
+
+
+class GenerateDataTests(TestCase):
+    def test_generates_skewed_synthetic_rows_and_clears_them(self):
+        call_command('generate_data', employees=50, blogs=40, comments_per_blog=4,
+                     batch_size=16, stdout=io.StringIO())
+        self.assertEqual(Employee.objects.filter(emp_id__startswith='SYN').count(), 50)
+        self.assertEqual(Blog.objects.count(), 40)
+        counts = sorted(Blog.objects.annotate(n=Count('comments')).values_list('n', flat=True))
+        self.assertGreater(counts[-1], 3 * counts[len(counts) // 2])  # long tail
+
+        with CaptureQueriesContext(connections['default']) as queries:
+            call_command('generate_data', employees=5, blogs=0, clear=True, stdout=io.StringIO())
+        self.assertEqual(Employee.objects.count(), 5)
+        self.assertFalse(Blog.all_objects.exists())
+        self.assertFalse(Comment.objects.exists())
+        sql = [q['sql'] for q in queries]
+        deletes = [i for i, q in enumerate(sql) if q.startswith('DELETE FROM "blogs_comment"')]
+        loads = [i for i, q in enumerate(sql) if '"blogs_comment"."comment"' in q]
+        self.assertEqual(len(deletes), 1)
+        # set-based: only the blogs' Collector looks for comments, after they are gone
+        self.assertTrue(all(i > deletes[0] for i in loads))
+
+    def test_percentile_is_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        make_blogs(3, comments_per_blog=2)
+        self.blog = Blog.objects.first()
+        Employee.objects.create(emp_id='E1', emp_name='Asha', designation='Manager')
+
+    def test_blog_list_collapses_comments_unless_expanded(self):
+        with self.assertNumQueries(2):  # count + blogs, no comment prefetch
+            response = self.client.get('/api/v1/blogs/')
+        self.assertNotIn('comments', response.data['results'][0])
+
+        response = self.client.get('/api/v1/blogs/?expand=comments')
+        self.assertEqual(len(response.data['results'][0]['comments']), 2)
+        # detail pages keep their nested comments
+        response = self.client.get(f'/api/v1/blogs/{self.blog.pk}/')
+        self.assertEqual(len(response.data['comments']), 2)
+
+    def test_fields_and_omit_trim_json_and_select(self):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.get('/api/v1/blogs/?fields=id,blog_title')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'blog_title'})
+        self.assertNotIn('blog_body', queries.captured_queries[-1]['sql'])
+
+        response = self.client.get(f'/api/v1/blogs/{self.blog.pk}/?omit=blog_body,comments')
+        self.assertEqual(
+            set(response.data), {
+                'id', 'blog_title', 'updated_at', 'comment_count', 'last_comment_id',
+                'last_comment_at', 'comments_url',
+            }
+        )
+
+        response = self.client.get('/api/v1/employees/?fields=emp_name&ordering=designation')
+        self.assertEqual(response.data['results'], [{'emp_name': 'Asha'}])
+
+    def test_unknown_field_is_a_bad_request(self):
+        response = self.client.get('/api/v1/comments/?fields=id,nope')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', response.data)
+
+    def test_writes_ignore_sparse_params(self):
+        response = self.client.post(
+            '/api/v1/comments/?fields=id', {'blog': self.blog.pk, 'comment': 'hi'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['comment'], 'hi')
+
+    async def test_async_list_honours_sparse_params(self):
+        response = await self.async_client.get('/api/v1/async/blogs/?fields=blog_title')
+        self.assertEqual(response.json()['results'][0], {'blog_title': 'Blog 0'})
+        response = await self.async_client.get('/api/v1/async/blogs/?expand=comments')
+        self.assertEqual(len(response.json()['results'][0]['comments']), 2)
+        response = await self.async_client.get('/api/v1/async/blogs/?omit=nope')
+        self.assertEqual(response.status_code, 400)
+
+
+class BoundedCommentsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        make_blogs(3, comments_per_blog=8)
+        self.blog = Blog.objects.first()
+
+    def test_list_counts_and_previews_with_fixed_queries(self):
+        with self.assertNumQueries(3):  # count + blogs + ONE window query
+            response = self.client.get('/api/v1/blogs/?limit=10&expand=comments')
+        for row in response.data['results']:
+            self.assertEqual(row['comment_count'], 8)
+            self.assertEqual(len(row['comments']), 5)
+        self.assertTrue(response.data['results'][0]['comments_url'].endswith(
+            f'/api/v1/blogs/{self.blog.pk}/comments/'
+        ))
+
+    def test_new_blog_response_has_zero_count(self):
+        response = self.client.post('/api/v1/blogs/', {'blog_title': 't', 'blog_body': 'b'})
+        self.assertEqual(response.data['comment_count'], 0)
+        self.assertEqual(response.data['comments'], [])
+
+    def test_comments_sub_resource_pages_through_one_blog(self):
+        url = f'/api/v1/blogs/{self.blog.pk}/comments/?page_size=3'
+        seen = []
+        while url:
+            response = self.client.get(url)
+            seen += [row['comment'] for row in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(seen, [f'Comment {j}' for j in range(8)])
+
+        Comment.objects.create(blog=self.blog, comment='new')
+        response = self.client.get(f'/api/v1/blogs/{self.blog.pk}/comments/?page_size=100')
+        self.assertEqual(len(response.data['results']), 9)  # cache invalidated by the write
+
+        self.assertEqual(self.client.get('/api/v1/blogs/999/comments/').status_code, 404)
+
+
+class FullTextSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.orm = Blog.objects.create(blog_title='Django ORM tips', blog_body='Use select_related.')
+        self.body = Blog.objects.create(blog_title='Weekly notes', blog_body='A note on the Django ORM.')
+        Blog.objects.create(blog_title='Gardening', blog_body='Tomatoes and basil.')
+        Comment.objects.create(blog=self.orm, comment='Serializers are slow here')
+
+    def search(self, url):
+        return [row['id'] for row in self.client.get(url).data['results']]
+
+    def test_ranked_results_with_snippets(self):
+        response = self.client.get('/api/v1/blogs/?q=django orm')
+        results = response.data['results']
+        self.assertEqual([row['id'] for row in results], [self.orm.pk, self.body.pk])  # title weighs more
+        self.assertGreater(results[0]['search_rank'], results[1]['search_rank'])
+        self.assertIn('<mark>Django</mark>', results[0]['search_snippet'])
+        self.assertEqual(response.data['count'], 2)
+
+    def test_snippet_escapes_user_text(self):
+        Comment.objects.create(blog=self.orm, comment='<img src=x onerror=alert(1)> painfully slow')
+        results = self.client.get('/api/v1/comments/?q=painfully').data['results']
+        snippet = results[0]['search_snippet']
+        self.assertNotIn('<img', snippet)
+        self.assertIn('&lt;img src=x onerror=alert(1)&gt;', snippet)
+        self.assertIn('<mark>painfully</mark>', snippet)
+
+    def test_index_follows_writes(self):
+        Blog.objects.filter(pk=self.orm.pk).update(blog_title='Renamed')  # no signals sent
+        self.assertEqual(self.search('/api/v1/blogs/?q=tips'), [])
+        self.assertEqual(self.search('/api/v1/blogs/?q=renamed'), [self.orm.pk])
+        self.body.delete()
+        self.assertEqual(self.search('/api/v1/blogs/?q=note'), [])
+
+    def test_comment_prefix_search_and_operators_are_plain_words(self):
+        self.assertEqual(len(self.search('/api/v1/comments/?q=serial*')), 1)
+        self.assertEqual(self.search('/api/v1/comments/?q=slow NEAR( "'), [])
+        self.assertEqual(self.search('/api/v1/blogs/?q=*'), [])
+
+    def test_rebuild_command(self):
+        with connections['default'].cursor() as cursor:
+            cursor.execute("INSERT INTO blogs_blog_fts(blogs_blog_fts) VALUES ('delete-all')")
+        self.assertEqual(self.search('/api/v1/blogs/?q=tomatoes'), [])
+        call_command('rebuild_search_index', batch_size=2, stdout=io.StringIO())
+        self.assertEqual(len(self.search('/api/v1/blogs/?q=tomatoes')), 1)
+        self.assertEqual(len(self.search('/api/v1/comments/?q=slow')), 1)
+
+
+class BlogDeleteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        make_blogs(2, comments_per_blog=6)
+        self.blog, self.other = Blog.objects.order_by('pk')
+        self.comment = self.blog.comments.first()
+
+    def test_fast_delete_removes_comments_and_their_cached_pages(self):
+        comment_url = f'/api/v1/comments/{self.comment.pk}/'
+        self.assertEqual(self.client.get(comment_url).status_code, 200)  # now cached
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.delete(f'/api/v1/blogs/{self.blog.pk}/')
+        self.assertEqual(response.status_code, 204)
+        deletes = [q['sql'] for q in queries if q['sql'].startswith('DELETE FROM "blogs_comment"')]
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(Comment.objects.filter(blog_id=self.blog.pk).count(), 0)
+        self.assertEqual(self.other.comments.count(), 6)
+        self.assertEqual(self.client.get(comment_url).status_code, 404)
+
+    def test_other_delete_receivers_still_see_every_comment(self):
+        seen = []
+
+        def receiver(sender, instance, **kwargs):
+            seen.append(instance.pk)
+
+        post_delete.connect(receiver, sender=Comment)
+        self.addCleanup(post_delete.disconnect, receiver, sender=Comment)
+        response = self.client.delete(f'/api/v1/blogs/{self.blog.pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(len(seen), 6)
+
+    def test_private_django_apis(self):
+        # delete_comments() depends on both; if this fails after a Django
+        # upgrade, fix api/deletion.py before trusting its fast path.
+        for signal in (pre_delete, post_delete):
+            sync_receivers, async_receivers = signal._live_receivers(Comment)
+            self.assertIsInstance(sync_receivers, list)
+            self.assertIsInstance(async_receivers, list)
+        self.assertLessEqual(BULK_AWARE_RECEIVERS, set(live_receivers(post_delete, Comment)))
+        self.assertFalse(comment_receivers_need_instances())
+        with CaptureQueriesContext(connections['default']) as queries:
+            deleted = Comment.objects.filter(blog_id=self.blog.pk)._raw_delete('default')
+        self.assertEqual(deleted, 6)
+        self.assertEqual(len(queries), 1)
+
+    @override_settings(BLOG_DELETE={'MODE': 'purge', 'PURGE_BATCH_SIZE': 4})
+    def test_purge_mode_hides_the_blog_then_reclaims_comments_in_batches(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.delete(f'/api/v1/blogs/{self.blog.pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(len(callbacks), 1)  # hands the blog to the background purger
+        self.assertEqual(self.client.get(f'/api/v1/blogs/{self.blog.pk}/').status_code, 404)
+        self.assertEqual(self.client.get('/api/v1/blogs/').data['count'], 1)
+        self.assertEqual(Comment.objects.filter(blog_id=self.blog.pk).count(), 6)
+
+        call_command('purge_deleted_blogs', batch_size=4, stdout=io.StringIO())
+        self.assertFalse(Blog.all_objects.filter(pk=self.blog.pk).exists())
+        self.assertEqual(Comment.objects.filter(blog_id=self.blog.pk).count(), 0)
+        self.assertEqual(self.other.comments.count(), 6)
+
+    async def test_async_delete_uses_the_fast_path(self):
+        response = await self.async_client.delete(f'/api/v1/async/blogs/{self.blog.pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(await Comment.objects.filter(blog_id=self.blog.pk).acount(), 0)
+
+
+class EmployeeChangesTests(TestCase):
+    url = '/api/v1/employees/changes/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.kept = Employee.objects.create(emp_id='E1', emp_name='Kept', designation='Dev')
+        self.token = self.client.get(self.url).data['next']
+
+    def sync(self, token, **params):
+        response = self.client.get(self.url, {'since': token, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_creates_updates_and_tombstones_since_a_token(self):
+        gone = Employee.objects.create(emp_id='E2', emp_name='Gone', designation='Dev')
+        self.client.patch(f'/api/v1/employees/{self.kept.pk}/', {'emp_name': 'Renamed'}, format='json')
+        self.client.post('/api/v1/employees/bulk/', [
+            {'emp_id': 'E3', 'emp_name': 'Bulk', 'designation': 'QA'},
+        ], format='json')
+        self.client.delete(f'/api/v1/employees/{gone.pk}/')
+
+        with self.assertNumQueries(3):  # oldest entry + entries after the token + employees
+            page = self.sync(self.token)
+        self.assertFalse(page['has_more'])
+        self.assertEqual(
+            [(item['op'], item['id']) for item in page['changes']],
+            [('update', self.kept.pk), ('create', Employee.objects.get(emp_id='E3').pk),
+             ('delete', gone.pk)],  # E2's create collapsed into its tombstone
+        )
+        self.assertEqual(page['changes'][0]['data']['emp_name'], 'Renamed')
+        self.assertIsNone(page['changes'][2]['data'])
+
+        self.assertEqual(self.sync(page['next'])['changes'], [])
+
+    def test_generated_and_cleared_employees_are_logged(self):
+        call_command('generate_data', employees=3, blogs=0, batch_size=2, stdout=io.StringIO())
+        generated = list(Employee.objects.filter(emp_id__startswith='SYN').values_list('pk', flat=True))
+        page = self.sync(self.token)
+        self.assertEqual([(item['op'], item['id']) for item in page['changes']],
+                         [('create', pk) for pk in generated])
+
+        call_command('generate_data', employees=0, blogs=0, clear=True, stdout=io.StringIO())
+        self.assertCountEqual([(item['op'], item['id']) for item in self.sync(page['next'])['changes']],
+                              [('delete', pk) for pk in generated])
+
+    def test_pages_follow_the_log_order(self):
+        for i in range(5):
+            Employee.objects.create(emp_id=f'P{i}', emp_name='n', designation='d')
+        token, seen = self.token, []
+        while True:
+            page = self.sync(token, page_size=2)
+            seen += [item['data']['emp_id'] for item in page['changes']]
+            token = page['next']
+            if not page['has_more']:
+                break
+        self.assertEqual(seen, [f'P{i}' for i in range(5)])
+
+    def test_bad_and_expired_tokens(self):
+        self.assertEqual(self.client.get(self.url, {'since': 'nope'}).status_code, 400)
+        Employee.objects.create(emp_id='E9', emp_name='n', designation='d')
+        EmployeeChange.objects.update(changed_at=timezone.now() - datetime.timedelta(days=60))
+        call_command('prune_employee_changes', days=30, stdout=io.StringIO())
+        self.assertEqual(EmployeeChange.objects.count(), 1)  # the newest is kept
+        self.assertEqual(self.client.get(self.url, {'since': self.token}).status_code, 200)
+        expired = self.client.get(self.url).data['next']
+        Employee.objects.create(emp_id='E10', emp_name='n', designation='d')
+        Employee.objects.create(emp_id='E11', emp_name='n', designation='d')
+        EmployeeChange.objects.exclude(pk=EmployeeChange.objects.latest('pk').pk).update(
+            changed_at=timezone.now() - datetime.timedelta(days=60)
+        )
+        call_command('prune_employee_changes', days=30, stdout=io.StringIO())
+        self.assertEqual(self.client.get(self.url, {'since': expired}).status_code, 410)
+
+
+class IdempotencyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.blog = Blog.objects.create(blog_title='t', blog_body='b')
+
+    def post(self, body, key='k-1'):
+        return self.client.post('/api/v1/comments/', body, format='json', HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_is_replayed_without_touching_the_database(self):
+        body = {'blog': self.blog.pk, 'comment': 'once'}
+        first = self.post(body)
+        self.assertEqual(first.status_code, 201)
+        with self.assertNumQueries(0):
+            retry = self.post(body)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(Comment.objects.count(), 1)
+
+        self.assertEqual(self.post({'blog': self.blog.pk, 'comment': 'other body'}).status_code, 201)
+        self.client.post('/api/v1/comments/', body, format='json')  # no key: not deduplicated
+        self.assertEqual(Comment.objects.count(), 3)
+
+    def test_duplicate_waits_for_the_in_flight_request(self):
+        stored = {'status': 201, 'headers': {'Content-Type': 'application/json'}, 'content': b'{"id": 7}'}
+        cache.add('api:idem:test:lock', 1)  # the "first" request is still running
+
+        def first_request_finishes(seconds):
+            cache.set('api:idem:test', stored)
+
+        with mock.patch.object(IdempotencyMiddleware, 'store_key', return_value='api:idem:test'), \
+                mock.patch('api.middleware.time.sleep', side_effect=first_request_finishes) as sleep:
+            response = self.post({'blog': self.blog.pk, 'comment': 'dup'})
+        sleep.assert_called_once()
+        self.assertEqual(response.json(), {'id': 7})
+        self.assertEqual(Comment.objects.count(), 0)
+
+    @override_settings(IDEMPOTENCY={'WAIT_SECONDS': 0})
+    def test_duplicate_gives_up_with_409(self):
+        with mock.patch.object(IdempotencyMiddleware, 'store_key', return_value='api:idem:test'):
+            cache.add('api:idem:test:lock', 1)
+            response = self.post({'blog': self.blog.pk, 'comment': 'dup'})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Comment.objects.count(), 0)
+
+
+class AsyncMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.clear()
+        self.blog = Blog.objects.create(blog_title='t', blog_body='b')
+
+    def test_asgi_chain_is_not_adapted_to_sync(self):
+        with self.assertNoLogs('django.request', 'DEBUG'):
+            ASGIHandler()
+        async def view(request):
+            pass
+
+        for middleware in (PrimaryStickinessMiddleware, RequestMetricsMiddleware, IdempotencyMiddleware):
+            self.assertTrue(iscoroutinefunction(middleware(view)))
+
+    async def test_async_write_is_measured_and_replayed(self):
+        client = AsyncClient()
+        body = json.dumps({'blog': self.blog.pk, 'comment': 'once'})
+        first = await client.post('/api/v1/async/comments/', body, content_type='application/json',
+                                  headers={'Idempotency-Key': 'a-1'})
+        self.assertEqual(first.status_code, 201)
+        self.assertIn(STICKY_HEADER, first)
+        retry = await client.post('/api/v1/async/comments/', body, content_type='application/json',
+                                  headers={'Idempotency-Key': 'a-1'})
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(await Comment.objects.acount(), 1)
+        queries, requests = registry.totals('api_request_queries')
+        self.assertEqual(requests, 2)
+        self.assertGreater(queries, 0)  # the async view's ORM calls were counted
+
+
+class BatchTests(TestCase):
+    url = '/api/v1/batch/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        make_blogs(2, comments_per_blog=1)
+        self.blog = Blog.objects.first()
+        Employee.objects.create(emp_id='E1', emp_name='Ann', designation='Dev')
+
+    def test_items_come_back_in_order(self):
+        response = self.client.post(self.url, [
+            {'method': 'GET', 'path': '/api/v1/employees/?page_size=5'},
+            {'method': 'GET', 'path': f'/api/v1/blogs/{self.blog.pk}/?fields=blog_title'},
+            {'method': 'POST', 'path': '/api/v1/comments/', 'body': {'blog': self.blog.pk, 'comment': 'hi'}},
+            {'method': 'GET', 'path': f'/api/v1/blogs/{self.blog.pk}/comments/'},
+            {'method': 'GET', 'path': f'/api/v1/async/blogs/{self.blog.pk}/?fields=id'},
+            {'method': 'GET', 'path': '/api/v1/blogs/999/'},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        items = response.json()
+        self.assertEqual([item['status'] for item in items], [200, 200, 201, 200, 200, 404])
+        self.assertEqual(items[0]['body']['results'][0]['emp_name'], 'Ann')
+        self.assertEqual(items[1]['body'], {'blog_title': self.blog.blog_title})
+        self.assertIn('ETag', items[1]['headers'])
+        self.assertEqual(items[2]['body']['comment'], 'hi')
+        self.assertEqual(len(items[3]['body']['results']), 2)  # sees the POST before it
+        self.assertEqual(items[4]['body'], {'id': self.blog.pk})
+
+    def test_bad_items_fail_alone(self):
+        response = self.client.post(self.url, [
+            {'path': '/admin/'},
+            {'path': '/api/v1/batch/'},
+            {'method': 'GET'},
+            {'path': '/api/v1/nope/'},
+            {'path': '/api/v1/blogs/export/'},
+            {'path': '/api/v1/employees/'},
+        ], format='json')
+        self.assertEqual(
+            [item['status'] for item in response.json()], [400, 400, 400, 404, 400, 200]
+        )
+        self.assertEqual(self.client.post(self.url, {'path': '/'}, format='json').status_code, 400)
+
+    def test_write_items_honour_their_own_idempotency_key(self):
+        items = [
+            {'method': 'POST', 'path': '/api/v1/comments/', 'body': {'blog': self.blog.pk, 'comment': 'once'},
+             'headers': {'Idempotency-Key': 'item-1'}},
+            {'method': 'POST', 'path': '/api/v1/comments/', 'body': {'blog': self.blog.pk, 'comment': 'each'}},
+        ]
+        items.append(items[-1])  # identical: would be deduplicated if the batch's key were passed down
+        first = self.client.post(self.url, items, format='json', HTTP_IDEMPOTENCY_KEY='batch-1').json()
+        retry = self.client.post(self.url, items, format='json').json()
+        self.assertEqual([item['status'] for item in retry], [201, 201, 201])
+        self.assertEqual(retry[0]['headers']['Idempotent-Replayed'], 'true')
+        self.assertEqual(retry[0]['body'], first[0]['body'])
+        self.assertNotIn('Idempotent-Replayed', first[2]['headers'])
+        # 2 from setUp + 'once' once + 'each' four times
+        self.assertEqual(Comment.objects.count(), 7)
+
+        bad = self.client.post(self.url, [{'path': '/api/v1/blogs/', 'headers': {'X': 1}}], format='json')
+        self.assertEqual(bad.json()[0]['status'], 400)
+
+    @override_settings(BATCH={'MAX_REQUESTS': 1})
+    def test_batch_size_is_capped(self):
+        response = self.client.post(self.url, [{'path': '/api/v1/blogs/'}] * 2, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class ConcurrentBatchTests(TransactionTestCase):
+    def post(self, blogs):
+        return APIClient().post('/api/v1/batch/', [
+            {'path': f'/api/v1/blogs/{blog.pk}/'} for blog in blogs
+        ], format='json')
+
+    def test_consecutive_gets_run_on_the_pool_within_the_query_budget(self):
+        cache.clear()
+        registry.clear()
+        make_blogs(3, comments_per_blog=1)
+        blogs = list(Blog.objects.order_by('pk'))
+        threads = set()
+        run = BatchView.run
+
+        def record_thread(view, sub):
+            threads.add(threading.current_thread().name)
+            return run(view, sub)
+
+        with mock.patch.object(BatchView, 'run', record_thread):
+            response = self.post(blogs)
+        self.assertEqual([item['body']['id'] for item in response.json()], [b.pk for b in blogs])
+        self.assertTrue(all(name.startswith('api-batch') for name in threads), threads)
+        queries, requests = registry.totals('api_request_queries')
+        self.assertEqual((queries, requests), (6, 1))  # blog + comments per item, on the pool
+
+        cache.clear()
+        with override_settings(QUERY_BUDGETS={'default': 50, 'api.batch.BatchView': 5},
+                               QUERY_BUDGET_ACTION='raise'):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.post(blogs)
+
+
+class MultiGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        make_blogs(3, comments_per_blog=7)
+        self.blogs = list(Blog.objects.order_by('pk'))
+        for i in range(3):
+            Employee.objects.create(emp_id=f'E{i}', emp_name=f'Name {i}', designation='Dev')
+
+    def test_blogs_in_requested_order_with_missing_ids(self):
+        third, first = self.blogs[2].pk, self.blogs[0].pk
+        with self.assertNumQueries(2):  # blogs IN (...) + ONE comments query
+            response = self.client.get(f'/api/v1/blogs/?ids={third},999,{first},{third}')
+        self.assertEqual([row['id'] for row in response.data['results']], [third, first])
+        self.assertEqual(response.data['missing'], [999])
+        self.assertEqual(len(response.data['results'][0]['comments']), 5)  # nested, like detail pages
+        self.assertEqual(response.data['results'][0]['comment_count'], 7)
+
+    def test_employees_by_natural_key(self):
+        with self.assertNumQueries(1):  # employees IN (...)
+            response = self.client.get('/api/v1/employees/?emp_id__in=E2,E0,E9&fields=emp_name')
+        self.assertEqual(response.data['results'], [{'emp_name': 'Name 2'}, {'emp_name': 'Name 0'}])
+        self.assertEqual(response.data['missing'], ['E9'])
+
+        comment = Comment.objects.first()
+        response = self.client.get(f'/api/v1/comments/?ids={comment.pk}')
+        self.assertEqual(response.data['results'][0]['comment'], comment.comment)
+
+    def test_bad_requests(self):
+        self.assertEqual(self.client.get('/api/v1/blogs/?ids=1,x').status_code, 400)
+        for url in ('/api/v1/blogs/', '/api/v1/comments/', '/api/v1/employees/'):
+            response = self.client.get(f'{url}?ids=1,1000000000000000000000000000000')
+            self.assertEqual(response.status_code, 400, url)
+            self.assertIn('ids', response.data)
+        self.assertEqual(self.client.get('/api/v1/employees/?ids=1&emp_id__in=E1').status_code, 400)
+        ids = ','.join(str(i) for i in range(101))
+        response = self.client.get(f'/api/v1/blogs/?ids={ids}')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ids', response.data)
+
+
+class StampedeProtectionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        make_blogs(1)
+        self.url = f'/api/v1/blogs/{Blog.objects.get().pk}/'
+        patcher = mock.patch.object(CachedResponseMixin, 'get_response_cache_key', return_value='api:resp:t')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_single_flight_runs_once_for_concurrent_callers(self):
+        flights, calls, release = SingleFlight(), [], threading.Event()
+
+        def build():
+            calls.append(1)
+            release.wait(5)
+            return 'payload'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flights.do('k', build)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(shared for _, shared in results), [False, True, True, True, True])
+        self.assertTrue(all(result == 'payload' for result, _ in results))
+
+    def test_expired_entry_is_served_stale_while_someone_rebuilds(self):
+        cache.set('api:resp:t', {'data': {'old': True}, 'delta': 0.01, 'expires': time.time() - 1})
+        cache.add('api:resp:t:lock', 1)  # another request is rebuilding
+        with self.assertNumQueries(0):  # no rebuild
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'STALE')
+        self.assertEqual(response.json(), {'old': True})
+
+        cache.delete('api:resp:t:lock')
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')  # this one rebuilt it
+        self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+        self.assertIsNone(cache.get('api:resp:t:lock'))
+
+    def test_early_expiry_refreshes_before_the_entry_expires(self):
+        cache.set('api:resp:t', {'data': {'old': True}, 'delta': 1.0, 'expires': time.time() + 2})
+        with mock.patch('api.caching.random.random', return_value=0.5):  # -log(0.5) ~ 0.7s < 2s left
+            self.assertEqual(self.client.get(self.url)['X-Cache'], 'HIT')
+        with mock.patch('api.caching.random.random', return_value=0.99):  # -log(0.01) ~ 4.6s
+            self.assertEqual(self.client.get(self.url)['X-Cache'], 'MISS')
+
+
+class CommentCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        make_blogs(3, comments_per_blog=4)
+        self.blog, self.other, self.quiet = Blog.objects.order_by('pk')
+
+    def stats(self, blog):
+        blog = Blog.all_objects.get(pk=blog.pk)
+        return blog.comment_count, blog.last_comment_id
+
+    def newest(self, blog):
+        return Comment.objects.filter(blog=blog).order_by('-pk').first()
+
+    def test_bulk_create_counts_and_points_at_the_newest(self):
+        newest = self.newest(self.blog)
+        self.assertEqual(self.stats(self.blog), (4, newest.pk))
+        self.assertEqual(Blog.all_objects.get(pk=self.blog.pk).last_comment_at, newest.updated_at)
+
+    def test_create_edit_move_and_delete_keep_counts_exact(self):
+        response = self.client.post('/api/v1/comments/', {'blog': self.blog.pk, 'comment': 'new'})
+        self.assertEqual(response.status_code, 201)
+        created = Comment.objects.get(pk=response.data['id'])
+        self.assertEqual(self.stats(self.blog), (5, created.pk))
+
+        response = self.client.patch(f'/api/v1/comments/{created.pk}/', {'comment': 'edited'})
+        created.refresh_from_db()
+        self.assertEqual(Blog.all_objects.get(pk=self.blog.pk).last_comment_at, created.updated_at)
+
+        response = self.client.patch(f'/api/v1/comments/{created.pk}/', {'blog': self.other.pk})
+        self.assertEqual(self.stats(self.blog), (4, self.newest(self.blog).pk))
+        self.assertEqual(self.stats(self.other), (5, created.pk))
+
+        self.client.delete(f'/api/v1/comments/{created.pk}/')
+        self.assertEqual(self.stats(self.other), (4, self.newest(self.other).pk))
+        for comment in Comment.objects.filter(blog=self.quiet):
+            comment.delete()
+        self.assertEqual(self.stats(self.quiet), (0, None))
+
+    def test_editing_the_blog_does_not_overwrite_the_counter(self):
+        stale = Blog.objects.get(pk=self.blog.pk)
+        Comment.objects.create(blog=self.blog, comment='meanwhile')
+        stale.blog_title = 'Renamed'
+        stale.save()
+        self.assertEqual(self.stats(self.blog)[0], 5)
+
+    def test_set_based_deletes_recount(self):
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.delete(f'/api/v1/blogs/{self.blog.pk}/')
+        self.assertEqual(response.status_code, 204)
+        deletes = [q['sql'] for q in queries if q['sql'].startswith('DELETE FROM "blogs_comment"')]
+        self.assertEqual(len(deletes), 1)
+
+        delete_comments(Comment.objects.filter(pk=self.newest(self.other).pk))
+        self.assertEqual(self.stats(self.other), (3, self.newest(self.other).pk))
+
+    def test_reconcile_repairs_drift(self):
+        Blog.all_objects.filter(pk=self.blog.pk).update(comment_count=99, last_comment_id=None)
+        Comment.objects.filter(blog=self.other).update(blog=self.quiet)  # sends no signals
+        out = io.StringIO()
+        call_command('reconcile_comment_counts', batch_size=2, dry_run=True, stdout=out)
+        self.assertIn('would fix 3', out.getvalue())
+        self.assertEqual(self.stats(self.blog)[0], 99)
+
+        call_command('reconcile_comment_counts', batch_size=2, stdout=io.StringIO())
+        self.assertEqual(self.stats(self.blog), (4, self.newest(self.blog).pk))
+        self.assertEqual(self.stats(self.other), (0, None))
+        self.assertEqual(self.stats(self.quiet), (8, self.newest(self.quiet).pk))
+
+    def test_ordering_by_counter_uses_its_index(self):
+        Comment.objects.create(blog=self.other, comment='one more')
+        with CaptureQueriesContext(connections['default']) as queries:
+            response = self.client.get('/api/v1/blogs/?ordering=-comment_count&fields=id&limit=10')
+        self.assertEqual(
+            [row['id'] for row in response.data['results']], [self.other.pk, self.quiet.pk, self.blog.pk]
+        )
+        sql = queries.captured_queries[-1]['sql']
+        self.assertIn('ORDER BY "blogs_blog"."comment_count" DESC, "blogs_blog"."id" DESC', sql)
+        with connections['default'].cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn('blog_comment_count_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+        response = self.client.get('/api/v1/blogs/?ordering=-last_comment_at&fields=id')
+        self.assertEqual(response.data['results'][0]['id'], self.other.pk)
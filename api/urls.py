@@ -1,5 +1,5 @@
 from django.urls import path, include
-from . import views
+from . import async_views, batch, views
 from rest_framework.routers import DefaultRouter  # 🚦 DRF tool that auto-generates URL patterns for ViewSets
 
 """
@@ -72,6 +72,12 @@ urlpatterns = [
     path('blogs/<int:pk>/', views.BlogDetailView.as_view()),  
     # GET, PUT, DELETE one specific blog (by ID)
 
+    path('blogs/export/', views.BlogsExportView.as_view()),
+    # GET every blog as a streamed NDJSON/CSV download (?format=csv)
+
+    path('blogs/<int:blog_pk>/comments/', views.BlogCommentsView.as_view(), name='blog-comments'),
+    # GET all comments of one blog, in keyset pages (blogs only nest the newest few)
+
     # ============================================================
     # 💬 Comment Endpoints
     # ============================================================
@@ -80,4 +86,24 @@ urlpatterns = [
 
     path('comments/<int:pk>/', views.CommentDetailView.as_view()),  
     # GET, PUT, DELETE one specific comment (by ID)
+
+    path('comments/export/', views.CommentsExportView.as_view()),
+    # GET every comment as a streamed NDJSON/CSV download (?format=csv)
+
+    # ============================================================
+    # 📬 Batch: several of the calls above in one round trip (api/batch.py)
+    # ============================================================
+    path('batch/', batch.BatchView.as_view()),
+    # POST a list of {method, path, body}; GETs in a row run concurrently
+
+    # ============================================================
+    # ⚡ Native async endpoints (for ASGI servers, see api/async_views.py)
+    # ============================================================
+    # Same resources and JSON as above, served by `async def` views.
+    path('async/blogs/', async_views.AsyncBlogsView.as_view()),
+    path('async/blogs/<int:pk>/', async_views.AsyncBlogDetailView.as_view()),
+    path('async/comments/', async_views.AsyncCommentsView.as_view()),
+    path('async/comments/<int:pk>/', async_views.AsyncCommentDetailView.as_view()),
+    path('async/employees/', async_views.AsyncEmployeesView.as_view()),
+    path('async/employees/<int:pk>/', async_views.AsyncEmployeeDetailView.as_view()),
 ]
@@ -4,14 +4,25 @@ from students.models import Student
 from .serializers import StudentSerializer, EmployeeSerializer
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.decorators import api_view
+from rest_framework.decorators import action, api_view
+from rest_framework.exceptions import NotFound
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from employees.models import Employee
 from django.http import Http404
 from rest_framework import mixins, generics, viewsets
 from blogs.models import Blog, Comment
-from blogs.serializers import BlogSerializer, CommentSerializer
-from .paginations import CustomPagination
+from blogs.serializers import BlogExportSerializer, BlogSerializer, CommentSerializer
+from .paginations import CommentThreadPagination, CustomPagination, KeysetPagination
+from .mixins import (
+    BulkModelMixin, ConditionalGetMixin, ExportMixin, FastReadMixin, GroupCommitMixin,
+    MultiGetMixin, QuerysetOptimizerMixin, SparseFieldsMixin,
+)
+from .caching import CachedResponseMixin, generation_key
+from .filters import IndexedOrderingFilter
+from .search import FullTextSearchFilter
+from .changelog import read_changes
+from .deletion import delete_blog
 
 # ------------------------------------------------------------------------------
 # api/views.py — a compact DRF learning reference + working views
@@ -337,11 +348,61 @@ from .paginations import CustomPagination
 # - An admin can browse pages of employees (pagination),
 # - filter by designation (filtering),
 # - and open/edit a specific employee profile (retrieve + update).
-class EmployeeViewset(viewsets.ModelViewSet):
+#
+# ConditionalGetMixin: pollers get `304 Not Modified` via ETags, and editors can
+# send `If-Match` on PUT/PATCH to avoid overwriting someone else's change.
+# BulkModelMixin adds /employees/bulk/ for HR syncs (thousands of rows per request).
+# ExportMixin adds /employees/export/ — a streamed NDJSON/CSV dump of every row.
+# FastReadMixin renders GET responses with a compiled serializer (same JSON, less CPU).
+# GroupCommitMixin lets concurrent single-row writes share one SQLite COMMIT
+# (If-Match checks included: they run on the writer thread with the save).
+# SparseFieldsMixin: ?fields=emp_id,emp_name / ?omit=... trim the JSON and the SELECT.
+# MultiGetMixin: ?ids=1,2,3 or ?emp_id__in=E1,E2 fetch exactly those rows in one query.
+class EmployeeViewset(GroupCommitMixin, ConditionalGetMixin, SparseFieldsMixin, MultiGetMixin,
+                      BulkModelMixin, ExportMixin, FastReadMixin, viewsets.ModelViewSet):
     queryset = Employee.objects.all()              # the DB table we expose
     serializer_class = EmployeeSerializer          # how to convert to/from JSON
-    pagination_class = CustomPagination            # custom per-view pagination
+    pagination_class = KeysetPagination            # cursor pages: no COUNT(*), no OFFSET scan
     filterset_fields = ['designation']             # simple filtering: ?designation=Manager
+    upsert_field = 'emp_id'                        # POST /employees/bulk/?upsert=true matches on this
+    sparse_load_fields = ('designation',)          # keyset cursors read it even if it's trimmed
+    multi_get_params = {'ids': 'pk', 'emp_id__in': 'emp_id'}  # ?ids=1,2 or ?emp_id__in=E1,E2
+
+    # Alternate lookup on the HR system's natural key (unique index on emp_id):
+    #   GET/PUT/PATCH/DELETE /employees/by-emp-id/E042/
+    # so clients don't have to filter first and then fetch by pk.
+    @action(detail=False, methods=['get', 'put', 'patch', 'delete'],
+            url_path=r'by-emp-id/(?P<emp_id>[^/]+)')
+    def by_emp_id(self, request, emp_id=None):
+        self.lookup_field = self.lookup_url_kwarg = 'emp_id'
+        handler = {
+            'GET': self.retrieve,
+            'PUT': self.update,
+            'PATCH': self.partial_update,
+            'DELETE': self.destroy,
+        }[request.method]
+        return handler(request, emp_id=emp_id)
+
+    @action(detail=False, methods=['get'], renderer_classes=ExportMixin.export_renderer_classes)
+    def export(self, request):
+        return super().export(request)
+
+    # Delta sync: GET /employees/changes/?since=<token> -> the creates, updates
+    # and deletes (tombstones) since the token, plus the next token. Downstream
+    # systems poll this instead of re-pulling the list (see api/changelog.py).
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        changes, next_token, has_more = read_changes(request.query_params)
+        employees = [employee for _, _, employee in changes if employee is not None]
+        data = iter(self.get_serializer(employees, many=True).data)
+        return Response({
+            'changes': [
+                {'op': op, 'id': pk, 'data': next(data) if employee is not None else None}
+                for op, pk, employee in changes
+            ],
+            'next': next_token,
+            'has_more': has_more,
+        })
 
 
 # -----------------------------
@@ -352,9 +413,40 @@ class EmployeeViewset(viewsets.ModelViewSet):
 # - POST /blogs/ -> create a new blog
 #
 # Real-life: like a blog homepage (readers see posts) + a "new post" form for authors.
-class BlogsView(generics.ListCreateAPIView):
+#
+# QuerysetOptimizerMixin reads BlogSerializer and prefetches the nested
+# `comments` in one query for the whole page (no N+1, see api/mixins.py) —
+# only the newest 5 per blog, next to the blog row's own `comment_count` /
+# `last_comment_at` (kept up to date on write, see api/counters.py) and a
+# `comments_url` for the full, paginated list (BlogCommentsView below).
+# CachedResponseMixin serves repeat GETs from the cache until a Blog or
+# Comment is written (see api/caching.py and api/signals.py).
+# FastReadMixin builds the GET JSON with a compiled serializer (api/serializers.py).
+# ConditionalGetMixin stamps each page with an ETag that CachedResponseMixin
+# caches along with it, so a repeat poll gets `304 Not Modified` straight from
+# the cache; the cache generations in the ETag move when a nested comment changes.
+# SparseFieldsMixin: the list leaves out nested `comments` unless the client asks
+# for them with ?expand=comments — no prefetch, much smaller pages. ?fields= and
+# ?omit= trim the rest (e.g. ?fields=id,blog_title for a list of titles).
+# FullTextSearchFilter: ?q=django orm -> ranked matches with highlighted snippets
+# from the FTS5 index (api/search.py) instead of a LIKE '%...%' table scan.
+# MultiGetMixin: ?ids=7,3,9 -> those blogs (with their newest comments) in one
+# round trip, in that order, plus the ids that don't exist.
+# IndexedOrderingFilter: ?ordering=-comment_count (most discussed) or
+# ?ordering=-last_comment_at (recently active), read straight off an index
+# (api/filters.py). ?q= results stay ordered by rank.
+class BlogsView(CachedResponseMixin, ConditionalGetMixin, SparseFieldsMixin, MultiGetMixin,
+                QuerysetOptimizerMixin, FastReadMixin, generics.ListCreateAPIView):
     queryset = Blog.objects.all()
     serializer_class = BlogSerializer
+    etag_related = ('comments',)
+    expandable_fields = ('comments',)
+    filter_backends = [
+        *api_settings.DEFAULT_FILTER_BACKENDS,
+        IndexedOrderingFilter,  # ?ordering=
+        FullTextSearchFilter,   # ?q=
+    ]
+    ordering_fields = ('id', 'comment_count', 'last_comment_at')
 
 
 # -----------------------------
@@ -365,9 +457,15 @@ class BlogsView(generics.ListCreateAPIView):
 # - POST /comments/ -> create a comment
 #
 # Real-life: the comment thread under a blog post or video.
-class CommentsView(generics.ListCreateAPIView):
+# QuerysetOptimizerMixin joins each comment's `blog` (select_related).
+# GroupCommitMixin batches bursts of new comments into one COMMIT.
+# ?q=... searches comment text through the FTS5 index (see BlogsView).
+class CommentsView(CachedResponseMixin, ConditionalGetMixin, SparseFieldsMixin, MultiGetMixin,
+                   QuerysetOptimizerMixin, FastReadMixin, GroupCommitMixin,
+                   generics.ListCreateAPIView):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    filter_backends = [*api_settings.DEFAULT_FILTER_BACKENDS, FullTextSearchFilter]  # ?q=
 
 
 # -----------------------------
@@ -380,28 +478,92 @@ class CommentsView(generics.ListCreateAPIView):
 # - DELETE /blogs/{pk}/ -> delete blog
 #
 # Real-life: opening a blog post page and editing/deleting from admin tools.
-class BlogDetailView(generics.RetrieveUpdateDestroyAPIView):
+class BlogDetailView(CachedResponseMixin, ConditionalGetMixin, SparseFieldsMixin,
+                     QuerysetOptimizerMixin, FastReadMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Blog.objects.all()
     serializer_class = BlogSerializer
     lookup_field = 'pk'
+    etag_related = ('comments',)
+
+    def perform_destroy(self, instance):
+        # no per-comment Collector work; see api/deletion.py
+        delete_blog(instance)
 
 
 # -----------------------------
 # COMMENT DETAIL - single object CRUD
 # -----------------------------
 # Same CRUD behavior but for comments.
-class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CommentDetailView(CachedResponseMixin, ConditionalGetMixin, SparseFieldsMixin,
+                        QuerysetOptimizerMixin, FastReadMixin,
+                        generics.RetrieveUpdateDestroyAPIView):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     lookup_field = 'pk'
 
 
+# -----------------------------
+# A BLOG'S COMMENTS - paginated sub-resource
+# -----------------------------
+# GET /blogs/{pk}/comments/ -> every comment of one blog, in keyset pages.
+#
+# Blog responses only nest the newest few comments (plus `comment_count`);
+# their `comments_url` points here for the rest.
+# Real-life: "View all 50,000 comments" under a viral post.
+class BlogCommentsView(CachedResponseMixin, ConditionalGetMixin, SparseFieldsMixin,
+                       QuerysetOptimizerMixin, FastReadMixin, generics.ListAPIView):
+    queryset = Comment.objects.all()
+    serializer_class = CommentSerializer
+    pagination_class = CommentThreadPagination
+
+    def get_queryset(self):
+        return super().get_queryset().filter(blog_id=self.kwargs['blog_pk'])
+
+    def get_cache_generation_keys(self):
+        # bumped by the blog's own writes and by writes to any of its comments
+        return [generation_key(Blog._meta.label_lower, self.kwargs['blog_pk'])]
+
+    def list(self, request, *args, **kwargs):
+        if not Blog.objects.filter(pk=kwargs['blog_pk']).exists():
+            raise NotFound('No Blog matches the given query.')
+        return super().list(request, *args, **kwargs)
+
+
+# -----------------------------
+# EXPORTS - streamed full dumps
+# -----------------------------
+# GET /blogs/export/ and /comments/export/ stream every row as NDJSON or CSV
+# (?format=csv) without paginating or holding the whole list in memory.
+# GenericAPIView gives them the same queryset/serializer plumbing as above,
+# including ?fields= / ?omit= (exports keep the nested comments by default).
+class BlogsExportView(SparseFieldsMixin, QuerysetOptimizerMixin, ExportMixin, FastReadMixin,
+                      generics.GenericAPIView):
+    queryset = Blog.objects.all()
+    serializer_class = BlogExportSerializer  # every comment, not just the newest 5
+    renderer_classes = ExportMixin.export_renderer_classes
+
+    def get(self, request):
+        return self.export(request)
+
+
+class CommentsExportView(SparseFieldsMixin, QuerysetOptimizerMixin, ExportMixin, FastReadMixin,
+                         generics.GenericAPIView):
+    queryset = Comment.objects.all()
+    serializer_class = CommentSerializer
+    renderer_classes = ExportMixin.export_renderer_classes
+
+    def get(self, request):
+        return self.export(request)
+
+
 # ------------------------------------------------------------------------------
 # PAGINATION & FILTERING NOTES (short, practical)
 # ------------------------------------------------------------------------------
 # - Pagination: splits large result sets into pages (helps performance & UX).
 #   You configured a CustomPagination class (see .paginations.py). That class
 #   controls page size, next/previous links and the JSON structure returned.
+#   EmployeeViewset now uses KeysetPagination from the same file: it follows
+#   opaque `next`/`previous` cursors, so page N costs the same as page 1.
 #
 # - filterset_fields = ['designation'] above enables simple field filtering:
 #   e.g., GET /employees/?designation=Software%20Engineer
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0002_blog_updated_at_comment_updated_at'),
+    ]
+
+    operations = [
+        # build the composite index before dropping the old blog_id one
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['blog', 'id'], name='comment_blog_id_idx'),
+        ),
+        migrations.AlterField(
+            model_name='comment',
+            name='blog',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='blogs.blog'),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Full-text search index for blogs and comments (see api/search.py).
+#
+# SQLite only: FTS5 "external content" tables that store just the index (the
+# text stays in blogs_blog / blogs_comment), plus triggers that keep them in
+# sync with every INSERT, DELETE and text UPDATE. Other databases (and SQLite
+# builds without FTS5) skip this and ?q= falls back to icontains.
+# Existing rows are indexed at the end; `manage.py rebuild_search_index` can
+# redo that in batches at any time.
+
+from django.db import migrations
+
+INDEXES = [
+    # (FTS table, content table, indexed columns)
+    ('blogs_blog_fts', 'blogs_blog', ('blog_title', 'blog_body')),
+    ('blogs_comment_fts', 'blogs_comment', ('comment',)),
+]
+
+
+def create_sql(fts, table, columns):
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{col}' for col in columns)
+    old = ', '.join(f'old.{col}' for col in columns)
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{table}', "
+        f"content_rowid='id', tokenize='porter unicode61')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        # only when the indexed text changes, not on every updated_at bump
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def drop_sql(fts):
+    return [f'DROP TRIGGER IF EXISTS {fts}_{suffix}' for suffix in ('ai', 'ad', 'au')] + [
+        f'DROP TABLE IF EXISTS {fts}',
+    ]
+
+
+def has_fts5(connection):
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA compile_options')
+        return 'ENABLE_FTS5' in {row[0] for row in cursor.fetchall()}
+
+
+def forwards(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite' or not has_fts5(connection):
+        return
+    for fts, table, columns in INDEXES:
+        for sql in create_sql(fts, table, columns):
+            schema_editor.execute(sql)
+
+
+def backwards(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for fts, _, _ in INDEXES:
+        for sql in drop_sql(fts):
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0003_comment_blog_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(forwards, backwards),
+    ]
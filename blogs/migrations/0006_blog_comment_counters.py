@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:08
+
+from importlib import import_module
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+search_index = import_module('blogs.migrations.0004_search_index')
+
+
+def restore_search_triggers(apps, schema_editor):
+    # SQLite cannot ADD a NOT NULL column in place (nor always DROP one), so
+    # Django rebuilds blogs_blog — and the full-text triggers from 0004 go
+    # with the old table.
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite' or not search_index.has_fts5(connection):
+        return
+    for fts, table, columns in search_index.INDEXES:
+        if table == 'blogs_blog':
+            for sql in search_index.create_sql(fts, table, columns):
+                if sql.startswith('CREATE TRIGGER '):
+                    schema_editor.execute(sql.replace('CREATE TRIGGER ', 'CREATE TRIGGER IF NOT EXISTS ', 1))
+
+
+def backfill(apps, schema_editor):
+    # one UPDATE with correlated subqueries, like Blog.refresh_comment_stats()
+    Blog = apps.get_model('blogs', 'Blog')
+    Comment = apps.get_model('blogs', 'Comment')
+    comments = Comment.objects.using(schema_editor.connection.alias).filter(blog=OuterRef('pk'))
+    newest = comments.order_by('-pk')
+    Blog.objects.using(schema_editor.connection.alias).update(
+        comment_count=Coalesce(Subquery(
+            comments.order_by().values('blog').annotate(count=Count('pk')).values('count')
+        ), 0),
+        last_comment_id=Subquery(newest.values('pk')[:1]),
+        last_comment_at=Subquery(newest.values('updated_at')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blogs', '0005_blog_deleted_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_search_triggers),
+        migrations.AddField(
+            model_name='blog',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='last_comment_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='last_comment_id',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['comment_count', 'id'], name='blog_comment_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['last_comment_at', 'id'], name='blog_last_comment_at_idx'),
+        ),
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
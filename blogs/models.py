@@ -1,18 +1,147 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
 
 # Create your models here.
 
+class LiveBlogManager(models.Manager):
+    """Hides blogs that are deleted but still being purged (see api/deletion.py)."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Blog(models.Model):
     blog_title = models.CharField(max_length=100)
     blog_body = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # set when the blog is deleted in 'purge' mode; the row goes once its comments are gone
+    deleted_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # Denormalized from the blog's comments, kept exact on every comment write
+    # (see the counter helpers below and api/counters.py), so listings can
+    # show and sort by them without a COUNT per blog.
+    # `manage.py reconcile_comment_counts` repairs drift.
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    last_comment_id = models.BigIntegerField(null=True, blank=True, editable=False)  # newest comment
+    last_comment_at = models.DateTimeField(null=True, blank=True, editable=False)   # its updated_at
+
+    objects = LiveBlogManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            # ?ordering=-comment_count / -last_comment_at on /blogs/ (id breaks ties)
+            models.Index(fields=['comment_count', 'id'], name='blog_comment_count_idx'),
+            models.Index(fields=['last_comment_at', 'id'], name='blog_last_comment_at_idx'),
+        ]
 
     def __str__(self):
         return self.blog_title
-    
+
+    def save(self, *args, **kwargs):
+        # Editing a blog must not write back the counters this instance loaded:
+        # a comment added meanwhile would be lost. Only the counter helpers set them.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in COUNTER_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    # ------------------------------------------------------------
+    # Counter maintenance: each is ONE UPDATE, relative to the stored
+    # values (F() / CASE), so concurrent writers can't lose increments.
+    # ------------------------------------------------------------
+    @classmethod
+    def comments_added(cls, blog_id, comments, using=None):
+        """`comments` (saved, all of blog `blog_id`) were just inserted."""
+        newest = max(comments, key=lambda comment: comment.pk)
+        newer = Q(last_comment_id__isnull=True) | Q(last_comment_id__lt=newest.pk)
+        cls.all_objects.using(using).filter(pk=blog_id).update(
+            comment_count=F('comment_count') + len(comments),
+            last_comment_id=Case(
+                When(newer, then=Value(newest.pk)), default=F('last_comment_id'),
+                output_field=models.BigIntegerField(),
+            ),
+            last_comment_at=Case(
+                When(newer, then=Value(newest.updated_at)), default=F('last_comment_at'),
+                output_field=models.DateTimeField(),
+            ),
+        )
+
+    @classmethod
+    def comment_removed(cls, blog_id, comment_pk, using=None):
+        """Comment `comment_pk` of blog `blog_id` was just deleted."""
+        was_newest = Q(last_comment_id=comment_pk)
+        cls.all_objects.using(using).filter(pk=blog_id).update(
+            comment_count=F('comment_count') - 1,
+            last_comment_id=Case(
+                When(was_newest, then=_newest_comment('pk')), default=F('last_comment_id'),
+                output_field=models.BigIntegerField(),
+            ),
+            last_comment_at=Case(
+                When(was_newest, then=_newest_comment('updated_at')), default=F('last_comment_at'),
+                output_field=models.DateTimeField(),
+            ),
+        )
+
+    @classmethod
+    def refresh_comment_stats(cls, blog_ids, using=None):
+        """Recount from the comments table (after set-based changes, or to repair drift)."""
+        cls.all_objects.using(using).filter(pk__in=blog_ids).update(**actual_comment_stats())
+
+
+COUNTER_FIELDS = ('comment_count', 'last_comment_id', 'last_comment_at')
+
+
+def _newest_comment(field):
+    return Subquery(Comment.objects.filter(blog=OuterRef('pk')).order_by('-pk').values(field)[:1])
+
+
+def actual_comment_stats():
+    """Expressions for what the counter columns should hold, per blog row."""
+    return {
+        'comment_count': Coalesce(Subquery(
+            Comment.objects.filter(blog=OuterRef('pk')).order_by()
+            .values('blog').annotate(count=Count('pk')).values('count')
+        ), 0),
+        'last_comment_id': _newest_comment('pk'),
+        'last_comment_at': _newest_comment('updated_at'),
+    }
+
+
+class CommentQuerySet(models.QuerySet):
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create sends no post_save, so keep the blog counters here
+        with transaction.atomic(using=self.db, savepoint=False):
+            objs = super().bulk_create(objs, *args, **kwargs)
+            by_blog = {}
+            for comment in objs:
+                by_blog.setdefault(comment.blog_id, []).append(comment)
+            if any(comment.pk is None for comment in objs):  # e.g. ignore_conflicts
+                Blog.refresh_comment_stats(list(by_blog), using=self.db)
+            else:
+                for blog_id, comments in by_blog.items():
+                    Blog.comments_added(blog_id, comments, using=self.db)
+        return objs
+
 
 class Comment(models.Model):
-    blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='comments')
+    # no separate index on blog_id: the (blog, id) index below starts with it
+    blog = models.ForeignKey(Blog, on_delete=models.CASCADE, related_name='comments', db_index=False)
     comment = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # A blog's comments in id order (/blogs/<pk>/comments/ pages, the
+            # newest-N preview, comment counts) straight from the index.
+            models.Index(fields=['blog', 'id'], name='comment_blog_id_idx'),
+        ]
 
     def __str__(self):
-        return self.comment
\ No newline at end of file
+        return self.comment
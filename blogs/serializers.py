@@ -1,15 +1,34 @@
 from rest_framework import serializers
+from api.search import SearchSnippetField
+from api.serializers import LatestListSerializer, RelatedLinkField, SparseFieldsetMixin
 from .models import Blog, Comment
 
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # only present in ?q= search results (see api/search.py)
+    search_rank = serializers.FloatField(read_only=True)
+    search_snippet = SearchSnippetField()
+
     class Meta:
         model = Comment
         fields = '__all__'
 
-class BlogSerializer(serializers.ModelSerializer):
-    comments = CommentSerializer(many=True, read_only=True) #should be the related name from models
+class BlogSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    # Only the newest comments are nested; `comments_url` pages through all of them
+    # and `comment_count` (kept on the Blog row, see blogs/models.py) says how
+    # many there are.
+    comments = LatestListSerializer(child=CommentSerializer(), limit=5, read_only=True) #should be the related name from models
+    comments_url = RelatedLinkField(view_name='blog-comments', lookup_url_kwarg='blog_pk')
+    # only present in ?q= search results (see api/search.py)
+    search_rank = serializers.FloatField(read_only=True)
+    search_snippet = SearchSnippetField()
+
     class Meta:
         model = Blog
-        fields = '__all__'
\ No newline at end of file
+        exclude = ('deleted_at',)
+
+
+class BlogExportSerializer(BlogSerializer):
+    # Exports are full dumps (ExportMixin in api/mixins.py): EVERY comment is nested.
+    comments = CommentSerializer(many=True, read_only=True)
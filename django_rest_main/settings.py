@@ -47,10 +47,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.RequestMetricsMiddleware',
+    'api.middleware.PrimaryStickinessMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api.middleware.IdempotencyMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -83,6 +86,103 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Wait up to 20s for the write lock instead of failing with
+            # "database is locked" straight away (SQLite's busy timeout).
+            'timeout': 20,
+            # Take the write lock when a transaction starts, so two
+            # transactions never deadlock upgrading from read to write.
+            'transaction_mode': 'IMMEDIATE',
+            # Run on every new connection:
+            # - WAL: readers no longer block behind a writer (and vice versa)
+            # - synchronous=NORMAL: safe with WAL, far fewer fsyncs per commit
+            # - 256 MB memory-mapped reads, ~64 MB page cache, temp tables in RAM
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA mmap_size=268435456;'
+                'PRAGMA cache_size=-65536;'
+                'PRAGMA temp_store=MEMORY;'
+            ),
+        },
+    }
+}
+
+# Read replicas: extra DATABASES aliases that receive safe-method reads
+# (api/db_routers.py). Locally these can be copies of db.sqlite3, e.g.
+#   DATABASES['replica1'] = {**DATABASES['default'], 'NAME': BASE_DIR / 'db_replica1.sqlite3'}
+#   DATABASE_REPLICAS = ['replica1']
+# After a write, the same client reads from the primary for
+# READ_YOUR_WRITES_SECONDS so it never sees its own change missing.
+DATABASE_ROUTERS = ['api.db_routers.ReplicaRouter']
+DATABASE_REPLICAS = []
+READ_YOUR_WRITES_SECONDS = 5
+
+# Batch concurrent small writes from CommentsView / EmployeeViewset into one
+# COMMIT through a single writer thread (api/group_commit.py).
+# Off by default: with WAL journaling a COMMIT is cheap, and `manage.py
+# bench_writes` shows no gain here, while every write would pay the thread
+# hand-off plus MAX_WAIT_MS. Turn it on when commits are expensive (rollback
+# journal, synchronous=FULL, slow disks) AND many clients write at once, and
+# compare both modes with bench_writes first.
+# MAX_WAIT_MS is how long the writer lingers for more writes to join a batch;
+# a request gives up with 503 after waiting TIMEOUT_SECONDS for its write.
+WRITE_COORDINATOR = {
+    'ENABLED': False,
+    'MAX_BATCH': 64,
+    'MAX_WAIT_MS': 2,
+    'TIMEOUT_SECONDS': 10,
+}
+
+# Per-view SQL query budgets checked by RequestMetricsMiddleware. Keys are
+# resolved view names ("employee-list", "api.views.BlogsView", ...) or
+# 'default'. Over budget: 'log' a warning, or 'raise' QueryBudgetExceeded
+# (handy in tests). Latency/query histograms are served at GET /metrics.
+QUERY_BUDGETS = {
+    'default': 20,
+}
+QUERY_BUDGET_ACTION = 'log'
+
+# `Idempotency-Key` handling (api/middleware.py): stored responses live TTL
+# seconds; a duplicate waits up to WAIT_SECONDS for an in-flight original;
+# LOCK_SECONDS frees the in-flight marker if its worker died.
+IDEMPOTENCY = {
+    'METHODS': ('POST', 'PUT', 'PATCH'),
+    'TTL': 24 * 60 * 60,
+    'WAIT_SECONDS': 10,
+    'LOCK_SECONDS': 30,
+}
+
+# POST /api/v1/batch/ (api/batch.py): at most MAX_REQUESTS sub-requests per
+# batch; consecutive GETs share a pool of MAX_WORKERS threads (1 = run every
+# sub-request in order on the request's own thread and connection).
+BATCH = {
+    'MAX_REQUESTS': 25,
+    'MAX_WORKERS': 4,
+}
+
+# How DELETE /blogs/<pk>/ removes the blog's comments (api/deletion.py):
+# 'fast' = one set-based DELETE in the request; 'purge' = hide the blog now
+# and delete its comments PURGE_BATCH_SIZE at a time in a background thread.
+BLOG_DELETE = {
+    'MODE': 'fast',
+    'PURGE_BATCH_SIZE': 1000,
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Holds cached API responses and page counts (api/caching.py, api/paginations.py).
+# LocMemCache evicts least-recently-used entries once MAX_ENTRIES is reached;
+# point this at Redis/Memcached when running more than one process.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 5000,
+        },
     }
 }
 
@@ -130,8 +230,19 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 #IMPLEMENTON OF GLOBAL PAGINATION
 REST_FRAMEWORK ={
-    'DEFAULT_PAGINATION_CLASS' : 'rest_framework.pagination.LimitOffsetPagination',
+    # LimitOffsetPagination + a cap on ?offset, pk seeks for deep pages and cached counts
+    'DEFAULT_PAGINATION_CLASS' : 'api.paginations.SafeLimitOffsetPagination',
     'PAGE_SIZE' : 2, #only 2 data in a single page
-    'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend']
+    'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    # JSON in/out through orjson when it's installed (stdlib json otherwise)
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
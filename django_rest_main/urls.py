@@ -16,6 +16,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from api.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -25,5 +26,8 @@ urlpatterns = [
     path('students/', include('students.urls')),
 
     # API Endpoints
-    path('api/v1/', include('api.urls'))
+    path('api/v1/', include('api.urls')),
+
+    # Prometheus scrape endpoint (request latency / query histograms)
+    path('metrics', metrics_view, name='metrics'),
 ]
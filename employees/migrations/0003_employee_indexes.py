@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0002_employee_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='employee',
+            name='emp_id',
+            field=models.CharField(max_length=20, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='employee',
+            index=models.Index(fields=['designation', 'id'], name='employee_designation_id_idx'),
+        ),
+    ]
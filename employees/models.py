@@ -2,9 +2,33 @@ from django.db import models
 
 # Create your models here.
 class Employee(models.Model):
-    emp_id = models.CharField(max_length=20)
+    emp_id = models.CharField(max_length=20, unique=True)  # natural key from the HR system
     emp_name = models.CharField(max_length=50)
     designation = models.CharField(max_length=50)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Serves ?designation=... filters AND keyset pages ordered by
+            # (designation, id) or filtered by designation and ordered by id.
+            models.Index(fields=['designation', 'id'], name='employee_designation_id_idx'),
+        ]
+
+    def __str__(self):
+        return self.emp_name
+
+class EmployeeChange(models.Model):
+    """
+    Append-only log of Employee writes; the id is the sequence number that
+    /employees/changes/?since= tokens point into (see api/changelog.py).
+    """
+    CREATE, UPDATE, DELETE = 'create', 'update', 'delete'
+    OPS = [(CREATE, 'Create'), (UPDATE, 'Update'), (DELETE, 'Delete')]
+
+    # no ForeignKey: tombstones must outlive the employee row
+    employee_id = models.BigIntegerField()
+    op = models.CharField(max_length=6, choices=OPS)
+    changed_at = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def __str__(self):
-        return self.emp_name
\ No newline at end of file
+        return f'#{self.pk} {self.op} employee {self.employee_id}'